@@ -1,10 +1,73 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from rest_framework.exceptions import ParseError, ValidationError
 
-from myapp.models import Teacher
+from myapp import nutrition_kb
+from myapp.models import NutritionFact, Teacher, Translation, Verification, VerifyJob
+from myapp.parsers import CSVParser
 
 class TeacherAdmin(admin.ModelAdmin):
     list_display = ('id', 'username_en', 'username_gu')
 
+class VerifyJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'status', 'lang', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status', 'lang')
+    exclude = ('image',)
+
+class VerificationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'school', 'date', 'lang', 'missing_items', 'created_at')
+    list_filter = ('lang', 'date')
+    search_fields = ('school',)
+    raw_id_fields = ('teacher',)
+
+class NutritionFactAdmin(admin.ModelAdmin):
+    list_display = ('name_en', 'name_gu', 'calories', 'protein', 'fat', 'carbs', 'updated_at')
+    search_fields = ('name_en', 'name_gu', 'aliases')
+
+    def get_urls(self):
+        return [
+            path('import-csv/', self.admin_site.admin_view(self.import_csv), name='myapp_nutritionfact_import'),
+        ] + super().get_urls()
+
+    def import_csv(self, request):
+        """Same upsert as ``manage.py import_nutrition``, from an uploaded file."""
+        errors = {}
+        if request.method == 'POST' and 'csv_file' in request.FILES:
+            try:
+                imported = nutrition_kb.import_rows(CSVParser().parse(request.FILES['csv_file']))
+            except ParseError as e:
+                errors = {1: e.detail}
+            except ValidationError as e:
+                errors = {index + 2: error for index, error in enumerate(e.detail) if error}
+            else:
+                messages.success(request, f'Imported {imported} nutrition entries.')
+                return redirect('admin:myapp_nutritionfact_changelist')
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Import nutrition CSV',
+            'fields': nutrition_kb.CSV_FIELDS,
+            'errors': errors,
+        }
+        return TemplateResponse(request, 'admin/myapp/nutritionfact/import_csv.html', context)
+
+class TranslationAdmin(admin.ModelAdmin):
+    list_display = ('name_en', 'name', 'kind', 'lang', 'source', 'updated_at')
+    list_filter = ('kind', 'lang', 'source')
+    search_fields = ('name_en', 'name')
+
+    def save_model(self, request, obj, form, change):
+        # A reviewed entry is no longer the model's guess.
+        obj.source = Translation.ADMIN
+        super().save_model(request, obj, form, change)
+
 # Register your models here.
 admin.site.register(Teacher, TeacherAdmin)
+admin.site.register(VerifyJob, VerifyJobAdmin)
+admin.site.register(NutritionFact, NutritionFactAdmin)
+admin.site.register(Verification, VerificationAdmin)
+admin.site.register(Translation, TranslationAdmin)
 
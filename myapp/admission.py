@@ -0,0 +1,269 @@
+"""
+Admission control for the verify-menu views.
+
+Each verification holds a worker and one or two vision calls for seconds,
+so without a limit a spike of uploads queues everywhere at once and every
+client times out.  ``admission_controlled`` wraps those views:
+
+* each client (``REMOTE_ADDR``, or the ``CLIENT_HEADER`` request header set
+  by a trusted proxy) has a token bucket of ``BURST`` requests refilled at
+  ``RATE`` per second; over it the request gets a 429;
+* at most ``MAX_IN_FLIGHT`` requests are verified at once.  The next
+  ``MAX_QUEUE`` (per process) wait up to ``QUEUE_TIMEOUT`` seconds for a
+  turn; beyond that, or after waiting, the request gets a 503.
+
+Both rejections carry ``Retry-After`` and happen before the upload is read,
+so they are cheap, and the teacher and survey views are not affected at all.
+
+The state lives in the ``CACHE`` alias.  A local-memory cache keeps it per
+process; a cache shared by every worker (Redis, Memcached -- or, as a local
+stand-in, the database cache) makes the in-flight cap global.  Only atomic
+cache operations are used: a slot per in-flight request taken with ``add``
+(expiring after ``SLOT_TIMEOUT`` in case a worker dies holding it), and the
+bucket kept as a GCRA "theoretical arrival time" moved with ``incr``.  The
+database cache's ``incr`` is not atomic, so there concurrent requests from
+one client may occasionally both pass.  Async views go through the cache's
+async methods, so a database cache never runs queries on the event loop.
+"""
+import asyncio
+import functools
+import hashlib
+import math
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+
+from . import metrics
+from .renderers import JSONResponse
+
+DEFAULTS = {
+    "ENABLED": True,
+    "CACHE": "default",
+    "CLIENT_HEADER": None,
+    "RATE": 1.0,
+    "BURST": 10,
+    "MAX_IN_FLIGHT": 8,
+    "MAX_QUEUE": 8,
+    "QUEUE_TIMEOUT": 2.0,
+    "POLL_INTERVAL": 0.05,
+    "SLOT_TIMEOUT": 300,
+    "RETRY_AFTER": 5,
+}
+
+# Per-client buckets are dropped after an hour idle.
+BUCKET_TIMEOUT = 60 * 60
+
+
+def options():
+    return {**DEFAULTS, **getattr(settings, "VERIFY_MENU_ADMISSION", {})}
+
+
+class Rejected(Exception):
+    def __init__(self, message, status, retry_after, reason):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class Admission:
+    """Per-client buckets, in-flight slots and the local wait queue."""
+
+    def __init__(self, opts):
+        self.opts = opts
+        self.cache = caches[opts["CACHE"]]
+        self.slots = [f"admission:slot:{index}" for index in range(opts["MAX_IN_FLIGHT"])]
+        self.lock = threading.Lock()
+        self.waiting = 0
+        self.in_flight = 0
+
+    def client(self, request):
+        header = self.opts["CLIENT_HEADER"]
+        value = request.META.get(header, "") if header else ""
+        return value.split(",")[0].strip() or request.META.get("REMOTE_ADDR", "")
+
+    def take_token(self, client):
+        """Take one of ``client``'s tokens (GCRA), or raise a 429."""
+        if not self.opts["RATE"]:
+            return
+        key = "admission:bucket:" + hashlib.sha1(client.encode()).hexdigest()
+        interval = math.ceil(1000 / self.opts["RATE"])
+        now = int(time.time() * 1000)
+        self.cache.add(key, now, BUCKET_TIMEOUT)
+        arrival = self.cache.incr(key, interval)
+        if arrival < now + interval:
+            # Idle for a while: the bucket is full again.
+            arrival = self.cache.incr(key, now + interval - arrival)
+        excess = arrival - now - interval * self.opts["BURST"]
+        if excess > 0:
+            self.cache.decr(key, interval)
+            raise Rejected("Too many verify requests from this client", 429, excess / 1000, "rate_limited")
+
+    async def atake_token(self, client):
+        """``take_token`` through the cache's async API (the database cache must not be used on the event loop)."""
+        if not self.opts["RATE"]:
+            return
+        key = "admission:bucket:" + hashlib.sha1(client.encode()).hexdigest()
+        interval = math.ceil(1000 / self.opts["RATE"])
+        now = int(time.time() * 1000)
+        await self.cache.aadd(key, now, BUCKET_TIMEOUT)
+        arrival = await self.cache.aincr(key, interval)
+        if arrival < now + interval:
+            arrival = await self.cache.aincr(key, now + interval - arrival)
+        excess = arrival - now - interval * self.opts["BURST"]
+        if excess > 0:
+            await self.cache.adecr(key, interval)
+            raise Rejected("Too many verify requests from this client", 429, excess / 1000, "rate_limited")
+
+    def try_acquire(self):
+        """Take a free in-flight slot; returns its key, or ``None`` when all are taken."""
+        start = random.randrange(len(self.slots)) if self.slots else 0
+        for key in self.slots[start:] + self.slots[:start]:
+            if self.cache.add(key, 1, self.opts["SLOT_TIMEOUT"]):
+                with self.lock:
+                    self.in_flight += 1
+                return key
+        return None
+
+    async def atry_acquire(self):
+        start = random.randrange(len(self.slots)) if self.slots else 0
+        for key in self.slots[start:] + self.slots[:start]:
+            if await self.cache.aadd(key, 1, self.opts["SLOT_TIMEOUT"]):
+                with self.lock:
+                    self.in_flight += 1
+                return key
+        return None
+
+    def release(self, slot):
+        self.cache.delete(slot)
+        with self.lock:
+            self.in_flight -= 1
+
+    async def arelease(self, slot):
+        await self.cache.adelete(slot)
+        with self.lock:
+            self.in_flight -= 1
+
+    def join_queue(self):
+        with self.lock:
+            if self.waiting >= self.opts["MAX_QUEUE"]:
+                raise Rejected("Verification queue is full", 503, self.opts["RETRY_AFTER"], "queue_full")
+            self.waiting += 1
+
+    def leave_queue(self):
+        with self.lock:
+            self.waiting -= 1
+
+    def timed_out(self):
+        return Rejected("Timed out waiting for a verification slot", 503, self.opts["RETRY_AFTER"], "timed_out")
+
+    def admit(self, request):
+        """A slot for ``request`` (release it when done), waiting for one if needed; raises ``Rejected``."""
+        self.take_token(self.client(request))
+        slot = self.try_acquire()
+        if slot is not None:
+            return slot
+        self.join_queue()
+        try:
+            deadline = time.monotonic() + self.opts["QUEUE_TIMEOUT"]
+            while time.monotonic() < deadline:
+                time.sleep(min(self.opts["POLL_INTERVAL"], max(deadline - time.monotonic(), 0)))
+                slot = self.try_acquire()
+                if slot is not None:
+                    return slot
+        finally:
+            self.leave_queue()
+        raise self.timed_out()
+
+    async def aadmit(self, request):
+        await self.atake_token(self.client(request))
+        slot = await self.atry_acquire()
+        if slot is not None:
+            return slot
+        self.join_queue()
+        try:
+            deadline = time.monotonic() + self.opts["QUEUE_TIMEOUT"]
+            while time.monotonic() < deadline:
+                await asyncio.sleep(min(self.opts["POLL_INTERVAL"], max(deadline - time.monotonic(), 0)))
+                slot = await self.atry_acquire()
+                if slot is not None:
+                    return slot
+        finally:
+            self.leave_queue()
+        raise self.timed_out()
+
+    def stats(self):
+        with self.lock:
+            return {"in_flight": self.in_flight, "waiting": self.waiting}
+
+
+_admission = None
+_lock = threading.Lock()
+
+
+def admission():
+    global _admission
+    if _admission is None:
+        with _lock:
+            if _admission is None:
+                _admission = Admission(options())
+    return _admission
+
+
+def reset():
+    """Forget the controller, e.g. after the settings changed; the next request builds a new one."""
+    global _admission
+    with _lock:
+        _admission = None
+
+
+def stats():
+    return admission().stats() if _admission is not None else {"in_flight": 0, "waiting": 0}
+
+
+def rejected(error):
+    metrics.increment("admission_decisions_total", (("decision", error.reason),))
+    response = JSONResponse({"error": str(error)}, status=error.status)
+    response["Retry-After"] = str(max(1, math.ceil(error.retry_after)))
+    return response
+
+
+def admission_controlled(view):
+    """Wrap a sync or async view function (``View.as_view()``) in admission control."""
+    if iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def wrapped(request, *args, **kwargs):
+            if not options()["ENABLED"]:
+                return await view(request, *args, **kwargs)
+            controller = admission()
+            try:
+                with metrics.stage("admission"):
+                    slot = await controller.aadmit(request)
+            except Rejected as error:
+                return rejected(error)
+            metrics.increment("admission_decisions_total", (("decision", "admitted"),))
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                await controller.arelease(slot)
+    else:
+        @functools.wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if not options()["ENABLED"]:
+                return view(request, *args, **kwargs)
+            controller = admission()
+            try:
+                with metrics.stage("admission"):
+                    slot = controller.admit(request)
+            except Rejected as error:
+                return rejected(error)
+            metrics.increment("admission_decisions_total", (("decision", "admitted"),))
+            try:
+                return view(request, *args, **kwargs)
+            finally:
+                controller.release(slot)
+    return wrapped
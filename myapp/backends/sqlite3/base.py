@@ -0,0 +1,40 @@
+"""
+SQLite backend with Django 5.1's ``OPTIONS['transaction_mode']`` on Django 4.2.
+
+Stock 4.2 opens every ``atomic()`` block with a deferred ``BEGIN``.  When such
+a transaction has read and then writes after another connection committed,
+SQLite fails it at once with "database is locked" (SQLITE_BUSY_SNAPSHOT) and
+the busy timeout never applies, so concurrent imports under ASGI collide.
+With ``'transaction_mode': 'IMMEDIATE'`` the write lock is taken at ``BEGIN``
+and writers queue on the timeout instead.  After upgrading to Django 5.1 the
+ENGINE can go back to ``django.db.backends.sqlite3`` unchanged.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = {None, 'DEFERRED', 'EXCLUSIVE', 'IMMEDIATE'}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.transaction_mode = self.settings_dict['OPTIONS'].get('transaction_mode')
+        if self.transaction_mode is not None:
+            self.transaction_mode = self.transaction_mode.upper()
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"settings.DATABASES[{self.alias!r}]['OPTIONS']['transaction_mode'] "
+                f"must be one of {', '.join(sorted(TRANSACTION_MODES - {None}))}"
+            )
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('transaction_mode', None)
+        return params
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode is None:
+            super()._start_transaction_under_autocommit()
+        else:
+            self.cursor().execute(f'BEGIN {self.transaction_mode}')
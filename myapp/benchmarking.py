@@ -0,0 +1,29 @@
+"""Small helpers shared by the ``bench_*`` management commands."""
+import math
+import statistics
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summarize(samples):
+    """Latency summary in milliseconds for a list of durations in seconds."""
+    return {
+        "count": len(samples),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 2) if samples else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+    }
+
+
+def format_row(label, summary):
+    return (
+        f"{label:<24} n={summary['count']:<6} mean={summary['mean_ms']:>9.2f}ms "
+        f"p50={summary['p50_ms']:>9.2f}ms p95={summary['p95_ms']:>9.2f}ms p99={summary['p99_ms']:>9.2f}ms"
+    )
@@ -0,0 +1,239 @@
+"""
+Local stand-in for the OpenAI chat completions API.
+
+Used by the benchmarks (and handy for manual testing) so latency can be
+measured without network access or API spend.  The server answers
+``POST /v1/chat/completions`` with a canned food list, nutrition reply
+(structured JSON, or text for plain prompts) or combined JSON reply, after
+sleeping ``latency`` seconds plus ``token_latency`` seconds per generated
+token.  ``error_rate`` injects 500s and ``quota`` (requests per second)
+answers the excess with 429 and ``Retry-After``, like the real API.
+``reply_shape="text"`` answers structured nutrition requests with free text,
+as a model ignoring ``response_format`` would.
+
+Prompts written in Gujarati get dish names in Gujarati, and translation
+requests get the Gujarati names from ``GUJARATI``.  Token counts are
+estimated as four ASCII characters or one other character per token, close
+to how Gujarati script tokenizes, so the per-token latency and the reported
+usage grow with Gujarati output as they do on the real API.
+"""
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FOOD_ITEMS = ["rice", "dal", "roti", "sabzi"]
+
+NUTRITION = {
+    "rice": {"calories": "200 kcal", "protein": "4 g", "fat": "0.5 g", "carbs": "45 g"},
+    "dal": {"calories": "150 kcal", "protein": "9 g", "fat": "3 g", "carbs": "20 g"},
+    "roti": {"calories": "120 kcal", "protein": "3 g", "fat": "3.5 g", "carbs": "18 g"},
+    "sabzi": {"calories": "90 kcal", "protein": "2 g", "fat": "5 g", "carbs": "10 g"},
+}
+
+
+GUJARATI = {"rice": "ભાત", "dal": "દાળ", "roti": "રોટલી", "sabzi": "શાક"}
+ENGLISH = {local: name for name, local in GUJARATI.items()}
+
+
+def is_gujarati(text):
+    return any("\u0a80" <= char <= "\u0aff" for char in text)
+
+
+def estimate_tokens(text):
+    ascii_chars = sum(char.isascii() for char in text)
+    return max(1, ascii_chars // 4 + len(text) - ascii_chars)
+
+
+def food_reply(gujarati=False):
+    return "\n".join(f"- {GUJARATI[item] if gujarati else item}" for item in FOOD_ITEMS)
+
+
+def nutrition_reply():
+    lines = []
+    for index, (item, values) in enumerate(NUTRITION.items(), start=1):
+        lines.append(f"{index}. **{item.title()}**")
+        lines.extend(f"   - **{key.title()}**: {value}" for key, value in values.items())
+    return "\n".join(lines)
+
+
+def nutrition_json_reply(items=None):
+    """Structured nutrition for ``items`` (default: the canned plate)."""
+    return json.dumps({"items": [
+        {"name": item, **{
+            key: json.loads(value.split()[0])
+            for key, value in NUTRITION.get(ENGLISH.get(item, item), NUTRITION["sabzi"]).items()
+        }}
+        for item in (items or NUTRITION)
+    ]}, separators=(",", ":"), ensure_ascii=False)
+
+
+def translation_json_reply(names):
+    return json.dumps({"items": [
+        {"name": name, "translation": GUJARATI.get(name, name)} for name in names
+    ]}, separators=(",", ":"), ensure_ascii=False)
+
+
+def combined_reply():
+    nutrition = json.loads(nutrition_json_reply())["items"]
+    return json.dumps({"items": FOOD_ITEMS, "nutrition": nutrition}, separators=(",", ":"))
+
+
+REPLY_SHAPES = ("json", "text")
+
+
+def choose_reply(payload, shape="json"):
+    """
+    Pick a canned reply that matches the shape the request asks for (or ``text`` for nutrition).
+
+    Raises ``ValueError`` when the payload has no message to answer.
+    """
+    response_format = payload.get("response_format") or {}
+    messages = payload.get("messages") or []
+    content = messages[-1].get("content") if messages and isinstance(messages[-1], dict) else None
+    if not content:
+        raise ValueError("'messages' must end with a message that has content")
+    schema = (response_format.get("json_schema") or {}).get("name")
+    if isinstance(content, str):
+        # Text-only request naming the items, one per "- " line.
+        items = [line[2:] for line in content.splitlines() if line.startswith("- ")]
+        if schema == "translation":
+            return translation_json_reply(items)
+        if shape == "text":
+            return nutrition_reply()
+        return nutrition_json_reply(items)
+    prompt = content[0]["text"].lower()
+    if schema == "combined":
+        return combined_reply()
+    if schema:
+        if shape != "json":
+            return nutrition_reply()
+        return nutrition_json_reply([GUJARATI[item] for item in NUTRITION] if is_gujarati(prompt) else None)
+    if response_format:
+        return combined_reply()
+    if "nutrition" in prompt or "પોષણ" in prompt:
+        return nutrition_reply()
+    return food_reply(is_gujarati(prompt))
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        server = self.server
+
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self.send_json(404, {"error": {"message": "Not found"}})
+
+        # An empty or cut-off body (a client that gave up on the call) is a 400, as upstream.
+        try:
+            payload = json.loads(body or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("the body must be a JSON object")
+            reply = choose_reply(payload, server.reply_shape)
+        except ValueError as error:
+            return self.send_json(400, {"error": {"message": str(error), "type": "invalid_request_error"}})
+
+        with server.lock:
+            server.request_count += 1
+            over_quota = server.over_quota()
+            server.throttled_count += over_quota
+
+        if over_quota:
+            return self.send_json(
+                429, {"error": {"message": "Rate limit reached", "type": "requests"}}, {"Retry-After": "1"},
+            )
+
+        completion_tokens = estimate_tokens(reply)
+        with server.lock:
+            server.completion_tokens += completion_tokens
+        time.sleep(server.latency + server.token_latency * completion_tokens)
+
+        if server.error_rate and random.random() < server.error_rate:
+            return self.send_json(500, {"error": {"message": "Injected failure", "type": "server_error"}})
+
+        prompt_tokens = 85 + len(json.dumps(payload)) // 400
+        self.send_json(200, {
+            "id": f"chatcmpl-fake-{server.request_count}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "gpt-4o"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    def send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(
+        self, host="127.0.0.1", port=0, latency=0.5, token_latency=0.0, error_rate=0.0, quota=0, reply_shape="json",
+    ):
+        super().__init__((host, port), FakeOpenAIHandler)
+        self.latency = latency
+        self.token_latency = token_latency
+        self.error_rate = error_rate
+        self.quota = quota
+        self.reply_shape = reply_shape
+        self.request_count = 0
+        self.throttled_count = 0
+        self.completion_tokens = 0
+        self.window = (0, 0)
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def handle_error(self, request, client_address):
+        # Clients hang up on calls they no longer need (a dropped nutrition call).
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+    def over_quota(self):
+        """Count a request against the current one-second window (call with ``lock`` held)."""
+        if not self.quota:
+            return False
+        second, count = self.window
+        now = int(time.monotonic())
+        count = count + 1 if now == second else 1
+        self.window = (now, count)
+        return count > self.quota
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        """Serve from a background thread; returns ``self`` for chaining."""
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,214 @@
+"""
+Verification history and the compliance reports built from it.
+
+Every verify-menu result is stored as a ``Verification`` row and folded
+into two rollup tables in the same transaction: ``VerificationDailyCount``
+(verifications, menu items and missing items per school and day) and
+``MissingItemCount`` (how often each menu item was missing, per school and
+day).  ``report`` only aggregates the rollups in SQL, so a term of history
+costs one row per school and day, not one per plate.
+
+Views call ``record``/``arecord``, which only put the entry on a queue; a
+background thread writes what has queued up in batches of ``BATCH_SIZE``.
+When the queue is full the caller writes its own entry instead of dropping
+it.  With ``ASYNC`` off entries are written straight away.  A failed write
+is logged and its entries dropped; it never fails the request.
+"""
+import atexit
+import logging
+import queue
+import threading
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, FloatField, Sum
+from django.db.models.functions import Cast, NullIf
+from django.utils import timezone
+
+from .models import MissingItemCount, Verification, VerificationDailyCount
+from .rollups import upsert_sql
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": True,
+    "ASYNC": True,
+    "BATCH_SIZE": 200,
+    "MAX_QUEUE": 10000,
+    "REPORT_MAX_DAYS": 366,
+}
+
+GROUPS = ("day", "school", "item")
+
+
+def options():
+    return {**DEFAULTS, **getattr(settings, "VERIFY_MENU_HISTORY", {})}
+
+
+def entry(result, lang, school="", teacher_id=None):
+    """What is kept of a verify-menu ``result``."""
+    return {
+        "school": school,
+        "teacher_id": teacher_id,
+        "date": timezone.localdate(),
+        "lang": lang,
+        "menu": result["input_menu"],
+        "detected_items": result["items_food"],
+        "found_items": result["found_items"],
+        "missing_items": result["missing_items"],
+        "nutritions": result["nutritions"],
+    }
+
+
+def write(entries):
+    """Store ``entries`` and add them to the rollups in one transaction; returns how many were stored."""
+    daily = {}
+    missing = Counter()
+    for item in entries:
+        totals = daily.setdefault((item["school"], item["date"]), [0, 0, 0])
+        totals[0] += 1
+        totals[1] += len(item["menu"])
+        totals[2] += len(item["missing_items"])
+        for name in set(item["missing_items"]):
+            missing[(item["school"], item["date"], name[:100])] += 1
+
+    adapt = connection.ops.adapt_datefield_value
+    with transaction.atomic():
+        Verification.objects.bulk_create([Verification(**item) for item in entries], batch_size=500)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                upsert_sql(VerificationDailyCount, ("school", "date"), ("verifications", "menu_items", "missing_items")),
+                [(school, adapt(day), *totals) for (school, day), totals in daily.items()],
+            )
+            if missing:
+                cursor.executemany(
+                    upsert_sql(MissingItemCount, ("school", "date", "item"), ("count",)),
+                    [(school, adapt(day), name, count) for (school, day, name), count in missing.items()],
+                )
+    return len(entries)
+
+
+class Writer:
+    """A daemon thread draining a bounded queue of entries into ``write``."""
+
+    def __init__(self, max_queue, batch_size):
+        self.queue = queue.Queue(max_queue)
+        self.batch_size = batch_size
+        self.thread = threading.Thread(target=self.run, name="verification-history", daemon=True)
+        self.thread.start()
+
+    def put(self, item):
+        """Queue ``item``; returns ``False`` when the queue is full."""
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            return False
+        return True
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                close_old_connections()
+                write(batch)
+            except Exception:
+                logger.exception("Could not store %d verifications", len(batch))
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def flush(self):
+        self.queue.join()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                opts = options()
+                _writer = Writer(opts["MAX_QUEUE"], opts["BATCH_SIZE"])
+    return _writer
+
+
+def write_now(item):
+    """Store ``item`` in the caller's thread; logs and drops it when that fails."""
+    try:
+        write([item])
+    except Exception:
+        logger.exception("Could not store a verification")
+
+
+def record(item):
+    """Store ``item`` (see ``entry``) in the background, or now when ``ASYNC`` is off or the queue is full."""
+    opts = options()
+    if not opts["ENABLED"]:
+        return
+    if not opts["ASYNC"] or not writer().put(item):
+        write_now(item)
+
+
+async def arecord(item):
+    opts = options()
+    if not opts["ENABLED"]:
+        return
+    if not opts["ASYNC"] or not writer().put(item):
+        await sync_to_async(write_now)(item)
+
+
+def flush():
+    """Wait until everything queued so far is written."""
+    if _writer is not None:
+        _writer.flush()
+
+
+atexit.register(flush)
+
+
+def report(group, date_from, date_to, school=None, limit=None):
+    """
+    Missing-item figures between two dates (inclusive), aggregated from the
+    rollups: per ``day`` or per ``school`` (highest missing rate first), or
+    the most often missing ``item``\\ s.
+    """
+    if group == "item":
+        rows = MissingItemCount.objects.filter(date__range=(date_from, date_to))
+        if school is not None:
+            rows = rows.filter(school=school)
+        rows = rows.values("item").annotate(missing=Sum("count")).order_by("-missing", "item")
+        return [{"item": row["item"], "missing": row["missing"]} for row in rows[:limit]]
+
+    rows = VerificationDailyCount.objects.filter(date__range=(date_from, date_to))
+    if school is not None:
+        rows = rows.filter(school=school)
+    field = "date" if group == "day" else "school"
+    rows = rows.values(field).annotate(
+        verifications=Sum("verifications"),
+        menu_items=Sum("menu_items"),
+        missing_items=Sum("missing_items"),
+    ).annotate(missing_rate=Cast("missing_items", FloatField()) / NullIf("menu_items", 0))
+    if group == "day":
+        rows = rows.order_by("date")
+    else:
+        rows = rows.order_by(F("missing_rate").desc(nulls_last=True), "school")
+    return [
+        {
+            field: row[field].isoformat() if group == "day" else row[field],
+            "verifications": row["verifications"],
+            "menu_items": row["menu_items"],
+            "missing_items": row["missing_items"],
+            "missing_rate": round(row["missing_rate"] or 0.0, 4),
+        }
+        for row in rows[:limit]
+    ]
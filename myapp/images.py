@@ -0,0 +1,103 @@
+"""
+Downscale and re-encode verify-menu uploads before the vision call.
+
+Every GPT call asks for ``"detail": "low"``, so the model only ever looks at
+a 512px version of the photo.  Sending the phone's full-size JPEG just costs
+upload bandwidth and request serialization time.  ``prepare`` decodes the
+upload, applies its EXIF orientation, shrinks it to ``MAX_SIDE`` and
+re-encodes it as a JPEG at ``QUALITY`` without any metadata.
+
+The work runs on a small dedicated thread pool (Pillow releases the GIL while
+decoding and resizing), which also bounds how many full-size images are
+decoded at once.  Without Pillow installed, or with ``ENABLED`` off, uploads
+are sent as they are.
+"""
+import asyncio
+import base64
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+try:
+    from PIL import Image, ImageOps, UnidentifiedImageError
+except ImportError:  # pragma: no cover - Pillow is optional
+    Image = None
+
+# Low-detail vision input is a 512x512 image.
+LOW_DETAIL_SIDE = 512
+
+DEFAULTS = {
+    "ENABLED": True,
+    "MAX_SIDE": LOW_DETAIL_SIDE,
+    "QUALITY": 80,
+    "WORKERS": 4,
+}
+
+
+class ImageRejected(Exception):
+    pass
+
+
+def options():
+    return {**DEFAULTS, **getattr(settings, "VERIFY_MENU_IMAGE", {})}
+
+
+def enabled():
+    return Image is not None and options()["ENABLED"]
+
+
+def signature():
+    """Short tag for the preprocessing settings, part of the result cache key."""
+    if not enabled():
+        return "original"
+    opts = options()
+    return f"{opts['MAX_SIDE']}px-q{opts['QUALITY']}"
+
+
+def downscale(raw, max_side=LOW_DETAIL_SIDE, quality=80):
+    """Return JPEG bytes of ``raw`` fitted inside ``max_side`` with no EXIF."""
+    try:
+        with Image.open(io.BytesIO(raw)) as img:
+            # Let the JPEG decoder do most of the shrinking (DCT scaling).
+            img.draft("RGB", (max_side, max_side))
+            img = ImageOps.exif_transpose(img)
+            if img.mode != "RGB":
+                img = img.convert("RGB")
+            img.thumbnail((max_side, max_side), Image.LANCZOS, reducing_gap=3.0)
+            out = io.BytesIO()
+            img.save(out, "JPEG", quality=quality, optimize=True)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise ImageRejected(f"Could not read image: {e}") from e
+    return out.getvalue()
+
+
+def prepare(image):
+    """Set and return ``image.data_url``, downscaling the raw upload if enabled."""
+    if image.data_url is None:
+        if enabled():
+            opts = options()
+            data, content_type = downscale(image.raw, opts["MAX_SIDE"], opts["QUALITY"]), "image/jpeg"
+        else:
+            data, content_type = image.raw, image.content_type
+        image.data_url = f"data:{content_type};base64," + base64.b64encode(data).decode("ascii")
+        image.raw = None
+    return image.data_url
+
+
+_executor = None
+
+
+def executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=options()["WORKERS"], thread_name_prefix="image-prep")
+    return _executor
+
+
+def prepare_in_pool(image):
+    return executor().submit(prepare, image).result()
+
+
+async def aprepare(image):
+    return await asyncio.get_running_loop().run_in_executor(executor(), prepare, image)
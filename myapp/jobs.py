@@ -0,0 +1,168 @@
+"""
+Database-backed job queue for verify-menu.
+
+``POST /api/verify-menu/jobs/`` stores the upload as a ``VerifyJob`` row and
+returns 202 straight away; ``manage.py verify_menu_worker`` processes claim
+queued rows and run the usual cache -> preprocess -> GPT pipeline, and
+clients poll (or long-poll with ``?wait=``) the job's status URL.
+
+There is no broker: claiming is a compare-and-set ``UPDATE`` on the status
+column, so any number of worker processes can share the table.  Jobs left
+``running`` for longer than ``TIMEOUT`` (a crashed worker) are put back on
+the queue, up to ``MAX_ATTEMPTS`` tries.  A failed job is retried after
+``RETRY_BACKOFF`` seconds, doubling with each attempt; when the OpenAI client
+refuses the call (quota, open circuit breaker) the job waits out
+``retry_after`` instead, and the attempt is not counted.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import history, images, llm, nutrition_kb, pipeline, translations
+from .models import VerifyJob
+from .result_cache import result_cache
+from .uploads import EncodedImage
+from .verify import verify
+
+DEFAULTS = {
+    "POLL_INTERVAL": 0.5,
+    "LONG_POLL_MAX": 30,
+    "TIMEOUT": 300,
+    "MAX_ATTEMPTS": 3,
+    "RETRY_BACKOFF": 5,
+}
+
+
+def options():
+    return {**DEFAULTS, **getattr(settings, "VERIFY_MENU_JOBS", {})}
+
+
+def submit(image, lang, menu_list, school="", teacher_id=None):
+    """Queue ``image`` for verification; images already in the result cache are answered at once."""
+    nutrition_kb.refresh()
+    translations.refresh()
+    cached = result_cache.get(result_cache.make_key(image.digest))
+    if cached is not None:
+        result = pipeline.build_result(menu_list, cached["items_food"], cached["nutritions"], lang)
+        history.record(history.entry(result, lang, school, teacher_id))
+        return VerifyJob.objects.create(
+            status=VerifyJob.DONE,
+            lang=lang,
+            menu=menu_list,
+            content_type=image.content_type,
+            digest=image.digest,
+            school=school,
+            teacher_id=teacher_id,
+            result=result,
+            finished_at=timezone.now(),
+        )
+    return VerifyJob.objects.create(
+        lang=lang,
+        menu=menu_list,
+        image=bytes(image.raw),
+        content_type=image.content_type,
+        digest=image.digest,
+        school=school,
+        teacher_id=teacher_id,
+    )
+
+
+def claim():
+    """Move the oldest queued job to ``running`` and return it, or ``None`` if the queue is empty."""
+    while True:
+        due = Q(not_before__isnull=True) | Q(not_before__lte=timezone.now())
+        job_id = (
+            VerifyJob.objects.filter(due, status=VerifyJob.QUEUED)
+            .order_by("created_at")
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+        claimed = VerifyJob.objects.filter(pk=job_id, status=VerifyJob.QUEUED).update(
+            status=VerifyJob.RUNNING,
+            started_at=timezone.now(),
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return VerifyJob.objects.get(pk=job_id)
+
+
+def requeue_stale():
+    """Give jobs abandoned by a dead worker another try, or fail them after ``MAX_ATTEMPTS``."""
+    opts = options()
+    now = timezone.now()
+    stale = VerifyJob.objects.filter(status=VerifyJob.RUNNING, started_at__lt=now - timedelta(seconds=opts["TIMEOUT"]))
+    stale.filter(attempts__gte=opts["MAX_ATTEMPTS"]).update(
+        status=VerifyJob.FAILED, error="Timed out", image=b"", finished_at=now,
+    )
+    stale.update(status=VerifyJob.QUEUED)
+
+
+def run_job(client, job):
+    image = EncodedImage("upload", job.content_type, len(job.image), job.digest, raw=bytes(job.image))
+    try:
+        result, _ = verify(client, image, job.lang, job.menu)
+    except images.ImageRejected as e:
+        return finish(job, VerifyJob.FAILED, error=str(e))
+    except llm.Unavailable as e:
+        # Nothing was sent: a short outage must not use up the job's attempts.
+        return retry_later(job, str(e), e.retry_after, attempts=F("attempts") - 1)
+    except Exception as e:
+        opts = options()
+        if job.attempts < opts["MAX_ATTEMPTS"]:
+            return retry_later(job, str(e), opts["RETRY_BACKOFF"] * 2 ** (job.attempts - 1))
+        return finish(job, VerifyJob.FAILED, error=str(e))
+    history.record(history.entry(result, job.lang, job.school, job.teacher_id))
+    return finish(job, VerifyJob.DONE, result=result)
+
+
+def retry_later(job, error, delay, **fields):
+    VerifyJob.objects.filter(pk=job.pk).update(
+        status=VerifyJob.QUEUED, error=error, not_before=timezone.now() + timedelta(seconds=delay), **fields,
+    )
+    return None
+
+
+def finish(job, status, result=None, error=""):
+    VerifyJob.objects.filter(pk=job.pk).update(
+        status=status, result=result, error=error, image=b"", finished_at=timezone.now(),
+    )
+    return status
+
+
+def work(client=None, once=False):
+    """Worker loop: claim and run jobs until stopped (or, with ``once``, until the queue is empty)."""
+    client = client or llm.sync_client()
+    poll_interval = options()["POLL_INTERVAL"]
+    last_requeue = 0.0
+    while True:
+        close_old_connections()
+        if time.monotonic() - last_requeue > poll_interval * 20:
+            requeue_stale()
+            last_requeue = time.monotonic()
+        job = claim()
+        if job is not None:
+            run_job(client, job)
+        elif once:
+            return
+        else:
+            time.sleep(poll_interval)
+
+
+def job_payload(job):
+    payload = {
+        "id": str(job.id),
+        "status": job.status,
+        "created_at": job.created_at.isoformat(),
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if job.status == VerifyJob.DONE:
+        payload["result"] = job.result
+    elif job.status == VerifyJob.FAILED:
+        payload["error"] = job.error
+    return payload
@@ -0,0 +1,390 @@
+"""
+OpenAI client layer used by the verify-menu pipeline.
+
+Every chat completion goes through one process-wide ``Guard``:
+
+* a token bucket sized to the API quota (``RATE_PER_MINUTE``/``BURST``)
+  plus a cap on calls in flight (``MAX_CONCURRENCY``), so a burst of
+  uploads queues briefly here instead of collecting 429s -- or, when the
+  queue is longer than ``MAX_WAIT`` seconds, fails fast;
+* retries with full-jitter exponential backoff (honouring ``Retry-After``)
+  for connection errors, timeouts, 429s and 5xx responses;
+* a circuit breaker that opens after ``BREAKER_THRESHOLD`` consecutive
+  upstream failures and rejects calls for ``BREAKER_RESET`` seconds, then
+  lets a single probe through.
+
+Rejected calls raise ``Unavailable`` (with ``retry_after``), which the views
+turn into a 503.  The wrapped clients keep the ``OpenAI`` interface
+(``client.chat.completions.create``) and share a tuned httpx pool with
+explicit timeouts (HTTP/2 when the ``h2`` package is installed).
+``sync_client()`` is created on first use; ``async_client()`` returns one
+client per event loop, since an httpx pool cannot be shared across loops.
+The OpenAI SDK is only imported then too: it is about half of a cold start,
+which management commands and workers that never call the API skip.
+"""
+import asyncio
+import importlib.util
+import os
+import random
+import threading
+import time
+import weakref
+from types import SimpleNamespace
+
+from django.conf import settings
+
+DEFAULTS = {
+    "API_KEY": None,
+    "BASE_URL": None,
+    "TIMEOUT": 60.0,
+    "CONNECT_TIMEOUT": 5.0,
+    "MAX_CONNECTIONS": 50,
+    "MAX_KEEPALIVE": 20,
+    "KEEPALIVE_EXPIRY": 30.0,
+    "HTTP2": True,
+    "RATE_PER_MINUTE": 500,
+    "BURST": 20,
+    "MAX_CONCURRENCY": 16,
+    "MAX_WAIT": 30.0,
+    "MAX_RETRIES": 3,
+    "BACKOFF_BASE": 0.5,
+    "BACKOFF_MAX": 8.0,
+    "BREAKER_THRESHOLD": 5,
+    "BREAKER_RESET": 30.0,
+}
+
+
+def options():
+    return {**DEFAULTS, **getattr(settings, "OPENAI_CLIENT", {})}
+
+
+class Unavailable(Exception):
+    """The call was not sent; try again after ``retry_after`` seconds."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpen(Unavailable):
+    pass
+
+
+class QueueFull(Unavailable):
+    pass
+
+
+class TokenBucket:
+    """Token bucket that hands out reservations: ``reserve()`` returns how long to wait."""
+
+    def __init__(self, rate_per_second, burst):
+        self.rate = rate_per_second
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, max_wait=None):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = max(0.0, (1 - self.tokens) / self.rate)
+            if max_wait is not None and wait > max_wait:
+                raise QueueFull("OpenAI request queue is full", retry_after=wait)
+            self.tokens -= 1
+            return wait
+
+
+class CircuitBreaker:
+    def __init__(self, threshold, reset_after):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset_after else "open"
+
+    def before_call(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            remaining = self.reset_after - (time.monotonic() - self.opened_at)
+            if remaining > 0 or self.probing:
+                raise CircuitOpen("OpenAI is failing; not sending requests for now", retry_after=max(remaining, 1.0))
+            self.probing = True
+
+    def cancel_probe(self):
+        with self.lock:
+            self.probing = False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+def retryable(error):
+    import openai
+
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    return isinstance(error, openai.APIStatusError) and (
+        error.status_code in (408, 409, 429) or error.status_code >= 500
+    )
+
+
+def upstream_failure(error):
+    """Errors that say the API is unhealthy (a 429 only says we are over quota)."""
+    import openai
+
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    return isinstance(error, openai.APIStatusError) and (error.status_code == 408 or error.status_code >= 500)
+
+
+def retry_after(error):
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers["retry-after"])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+class Guard:
+    """Rate limit, concurrency cap, retries and circuit breaker shared by every client in the process."""
+
+    def __init__(self, opts):
+        self.opts = opts
+        self.bucket = TokenBucket(opts["RATE_PER_MINUTE"] / 60, opts["BURST"])
+        self.breaker = CircuitBreaker(opts["BREAKER_THRESHOLD"], opts["BREAKER_RESET"])
+        self.semaphore = threading.BoundedSemaphore(opts["MAX_CONCURRENCY"])
+        self.loop_semaphores = weakref.WeakKeyDictionary()
+        self.lock = threading.Lock()
+        self.counters = {"calls": 0, "retries": 0, "failures": 0, "rejected": 0}
+
+    def count(self, counter):
+        with self.lock:
+            self.counters[counter] += 1
+
+    def stats(self):
+        with self.lock:
+            snapshot = dict(self.counters)
+        snapshot["breaker"] = self.breaker.state
+        return snapshot
+
+    def backoff(self, attempt, error):
+        delay = random.uniform(0, min(self.opts["BACKOFF_MAX"], self.opts["BACKOFF_BASE"] * 2 ** attempt))
+        return max(delay, min(retry_after(error) or 0.0, self.opts["BACKOFF_MAX"]))
+
+    def admit(self):
+        """Breaker check and a rate-limit reservation; returns the wait before sending."""
+        try:
+            self.breaker.before_call()
+        except Unavailable:
+            self.count("rejected")
+            raise
+        try:
+            return self.bucket.reserve(self.opts["MAX_WAIT"])
+        except Unavailable:
+            self.breaker.cancel_probe()
+            self.count("rejected")
+            raise
+
+    def outcome(self, error, attempt):
+        """Record a failed attempt; returns the delay before retrying, or ``None`` to give up."""
+        if not retryable(error):
+            self.breaker.record_success()
+            return None
+        if upstream_failure(error):
+            self.breaker.record_failure()
+        else:
+            self.breaker.cancel_probe()
+        if attempt >= self.opts["MAX_RETRIES"]:
+            self.count("failures")
+            return None
+        self.count("retries")
+        return self.backoff(attempt, error)
+
+    def call(self, create, kwargs):
+        self.count("calls")
+        attempt = 0
+        while True:
+            wait = self.admit()
+            try:
+                time.sleep(wait)
+                self.semaphore.acquire()
+            except BaseException:
+                self.breaker.cancel_probe()
+                raise
+            try:
+                response = create(**kwargs)
+            except Exception as error:
+                delay = self.outcome(error, attempt)
+                if delay is None:
+                    raise
+            except BaseException:
+                self.breaker.cancel_probe()
+                raise
+            else:
+                self.breaker.record_success()
+                return response
+            finally:
+                self.semaphore.release()
+            time.sleep(delay)
+            attempt += 1
+
+    def loop_semaphore(self):
+        loop = asyncio.get_running_loop()
+        semaphore = self.loop_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self.loop_semaphores[loop] = asyncio.Semaphore(self.opts["MAX_CONCURRENCY"])
+        return semaphore
+
+    async def acall(self, create, kwargs):
+        self.count("calls")
+        attempt = 0
+        while True:
+            wait = self.admit()
+            semaphore = self.loop_semaphore()
+            # A probe cancelled while queued must give up its slot, or the breaker stays half-open for good.
+            try:
+                await asyncio.sleep(wait)
+                await semaphore.acquire()
+            except BaseException:
+                self.breaker.cancel_probe()
+                raise
+            try:
+                response = await create(**kwargs)
+            except Exception as error:
+                delay = self.outcome(error, attempt)
+                if delay is None:
+                    raise
+            except BaseException:
+                self.breaker.cancel_probe()
+                raise
+            else:
+                self.breaker.record_success()
+                return response
+            finally:
+                semaphore.release()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+class Client:
+    """An ``OpenAI`` client whose ``chat.completions.create`` goes through the guard."""
+
+    def __init__(self, client, guard):
+        self.client = client
+        self.guard = guard
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        return self.guard.call(self.client.chat.completions.create, kwargs)
+
+
+class AsyncClient(Client):
+    async def create(self, **kwargs):
+        return await self.guard.acall(self.client.chat.completions.create, kwargs)
+
+
+def http_options(opts):
+    import httpx
+
+    return {
+        "timeout": httpx.Timeout(opts["TIMEOUT"], connect=opts["CONNECT_TIMEOUT"]),
+        "limits": httpx.Limits(
+            max_connections=opts["MAX_CONNECTIONS"],
+            max_keepalive_connections=opts["MAX_KEEPALIVE"],
+            keepalive_expiry=opts["KEEPALIVE_EXPIRY"],
+        ),
+        "http2": opts["HTTP2"] and importlib.util.find_spec("h2") is not None,
+    }
+
+
+def client_options(opts):
+    import httpx
+
+    return {
+        "api_key": opts["API_KEY"] or os.getenv("OPENAI_API_KEY"),
+        "base_url": opts["BASE_URL"] or os.getenv("OPENAI_BASE_URL"),
+        "timeout": httpx.Timeout(opts["TIMEOUT"], connect=opts["CONNECT_TIMEOUT"]),
+        # Retries are done by the guard, so they share the rate limit and the breaker.
+        "max_retries": 0,
+    }
+
+
+_lock = threading.Lock()
+_guard = None
+_sync_client = None
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def guard():
+    global _guard
+    with _lock:
+        if _guard is None:
+            _guard = Guard(options())
+        return _guard
+
+
+def sync_client():
+    import openai
+
+    global _sync_client
+    shared = guard()
+    with _lock:
+        if _sync_client is None:
+            opts = options()
+            _sync_client = Client(
+                openai.OpenAI(**client_options(opts), http_client=openai.DefaultHttpxClient(**http_options(opts))),
+                shared,
+            )
+        return _sync_client
+
+
+def async_client():
+    """The client for the running event loop."""
+    import openai
+
+    loop = asyncio.get_running_loop()
+    shared = guard()
+    with _lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            opts = options()
+            client = _async_clients[loop] = AsyncClient(
+                openai.AsyncOpenAI(
+                    **client_options(opts), http_client=openai.DefaultAsyncHttpxClient(**http_options(opts)),
+                ),
+                shared,
+            )
+        return client
+
+
+def reset():
+    """Drop the clients and the guard, e.g. after ``OPENAI_CLIENT`` changed."""
+    global _guard, _sync_client
+    with _lock:
+        _guard = None
+        _sync_client = None
+        _async_clients.clear()
+
+
+def stats():
+    return guard().stats()
@@ -0,0 +1,429 @@
+"""
+HTTP load test for every API route, with the app under a real server.
+
+``run()`` starts the fake OpenAI server (``manage.py fake_openai``) and then,
+for each server kind, the app in its own process on a fresh copy of a
+scratch database (``root.settings_loadtest``):
+
+* ``wsgi`` -- ``root.wsgi`` under gunicorn when installed, otherwise under
+  Django's threaded development server;
+* ``asgi`` -- ``root.asgi`` under uvicorn (or daphne); skipped when neither
+  is installed, which fails the command when ``--baseline`` is given.
+
+Each route in ``ROUTES`` is driven by ``concurrency`` asyncio workers until
+``requests`` requests have completed; the result holds throughput, latency
+percentiles, status counts and the server's peak RSS while it ran.  Uploads
+use distinct images so verify-menu is measured on cache misses.
+
+``compare()`` lists the metrics of a report that are worse than a saved
+baseline by more than a tolerance.  Numbers only compare across runs on the
+same machine with the same options.
+"""
+import asyncio
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+import django
+import httpx
+from PIL import Image
+
+from .benchmarking import summarize
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+MANAGE = BASE_DIR / "manage.py"
+NUTRITION_CSV = BASE_DIR / "myapp" / "nutrition_data" / "dishes.csv"
+
+SERVER_KINDS = ("wsgi", "asgi")
+SEED_TEACHERS = 1000
+MENU = "Rice, Dal, Roti, Salad"
+
+# Differences below these are noise, whatever the relative change.
+NOISE = {"p50_ms": 1.0, "p95_ms": 2.0, "p99_ms": 5.0, "rps": 5.0, "peak_rss_mb": 5.0}
+
+
+class Route:
+    """One URL name: how to build a request, and what to remember from the response."""
+
+    def __init__(self, name, method, build, after=None):
+        self.name = name
+        self.method = method
+        self.build = build
+        self.after = after
+
+
+class Context:
+    """State shared by the request builders of one server run."""
+
+    def __init__(self, seed, images):
+        self.random = random.Random(seed)
+        self.images = images
+        self.uploads = 0
+        self.job_ids = []
+
+    def image(self):
+        # A different trailer per upload gives each image its own digest, so the result cache never hits.
+        self.uploads += 1
+        return self.images[self.uploads % len(self.images)] + self.uploads.to_bytes(8, "big")
+
+    def lang(self):
+        return self.random.choice(("en", "gu"))
+
+
+def survey_answers(ctx):
+    return {
+        "school": f"school-{ctx.random.randrange(20)}",
+        "lang": "en",
+        "answers": {"q1": ctx.random.randrange(4), "q2": ctx.random.randrange(4)},
+    }
+
+
+def upload(ctx):
+    return {
+        "data": {"lang": ctx.lang(), "menu": MENU, "school": f"school-{ctx.random.randrange(20)}"},
+        "files": {"image": ("plate.jpg", ctx.image(), "image/jpeg")},
+    }
+
+
+def batch_upload(ctx, size=4):
+    data = {"lang": ctx.lang()}
+    files = {}
+    for index in range(size):
+        data[f"menu_{index}"] = MENU
+        files[f"image_{index}"] = ("plate.jpg", ctx.image(), "image/jpeg")
+    return {"data": data, "files": files}
+
+
+def remember_job(ctx, response):
+    ctx.job_ids.append(response.json()["id"])
+
+
+def job_status(ctx):
+    job_id = ctx.random.choice(ctx.job_ids) if ctx.job_ids else "00000000-0000-0000-0000-000000000000"
+    return {"url": f"/api/verify-menu/jobs/{job_id}/"}
+
+
+# In run order: job status polls the jobs submitted before it.
+ROUTES = [
+    Route("teacher-list", "GET", lambda ctx: {"url": "/api/teachers/", "params": {"lang": ctx.lang()}}),
+    Route("teacher-detail", "GET", lambda ctx: {
+        "url": f"/api/teachers/{ctx.random.randint(1, SEED_TEACHERS)}/", "params": {"lang": ctx.lang()},
+    }),
+    Route("teacher-search", "GET", lambda ctx: {"url": "/api/teachers/search/", "params": {
+        "q": ctx.random.choice(("teacher 12", "શિક્ષક 4", "each", "her 99", "ક્ષક 7")), "lang": ctx.lang(),
+    }}),
+    Route("teacher-create", "POST", lambda ctx: {"url": "/api/teachers/create/", "params": {"lang": ctx.lang()}}),
+    Route("teacher-bulk-create", "POST", lambda ctx: {"url": "/api/teachers/bulk/", "json": [
+        {"username_en": f"Teacher {n}", "username_gu": f"શિક્ષક {n}"} for n in range(100)
+    ]}),
+    Route("get-survey", "GET", lambda ctx: {"url": "/api/survey/", "params": {"lang": ctx.lang()}}),
+    Route("get-survey-lang", "GET", lambda ctx: {"url": f"/api/survey/{ctx.lang()}/"}),
+    Route("survey-response-create", "POST", lambda ctx: {"url": "/api/survey/responses/", "json": survey_answers(ctx)}),
+    Route("survey-summary", "GET", lambda ctx: {
+        "url": "/api/survey/summary/", "params": {"school": f"school-{ctx.random.randrange(20)}", "lang": ctx.lang()},
+    }),
+    Route("verify-menu", "POST", lambda ctx: {"url": "/api/verify-menu/", **upload(ctx)}),
+    Route("verify-menu-async", "POST", lambda ctx: {"url": "/api/verify-menu/async/", **upload(ctx)}),
+    Route("verify-menu-batch", "POST", lambda ctx: {"url": "/api/verify-menu/batch/", **batch_upload(ctx)}),
+    Route("verify-menu-job-submit", "POST", lambda ctx: {"url": "/api/verify-menu/jobs/", **upload(ctx)}, remember_job),
+    Route("verify-menu-job", "GET", job_status),
+    Route("verify-menu-report", "GET", lambda ctx: {
+        "url": "/api/verify-menu/report/", "params": {"by": ctx.random.choice(("day", "school", "item"))},
+    }),
+    Route("metrics", "GET", lambda ctx: {"url": "/metrics/"}),
+]
+
+
+def unrouted():
+    """URL names in ``myapp.urls`` that ``ROUTES`` does not drive."""
+    from . import urls
+
+    return sorted({pattern.name for pattern in urls.urlpatterns} - {route.name for route in ROUTES})
+
+
+def plate_images(count, size=(640, 480)):
+    """``count`` distinct noisy JPEGs, roughly the size of a phone photo after light compression."""
+    rng = random.Random(0)
+    images = []
+    for _ in range(count):
+        noise = Image.effect_noise(size, 40).convert("RGB")
+        tint = Image.new("RGB", size, tuple(rng.randrange(256) for _ in range(3)))
+        out = io.BytesIO()
+        Image.blend(noise, tint, 0.5).save(out, "JPEG", quality=85)
+        images.append(out.getvalue())
+    return images
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, process, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{process.args[1:4]} exited with status {process.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Nothing listening on port {port} after {timeout:.0f}s")
+
+
+def server_command(kind, port, workers):
+    """``(runner, argv)`` to serve the app, or ``None`` when no server for ``kind`` is installed."""
+    host = "127.0.0.1"
+    if kind == "wsgi":
+        if importlib.util.find_spec("gunicorn"):
+            return "gunicorn", [
+                sys.executable, "-m", "gunicorn", "root.wsgi:application", "--bind", f"{host}:{port}",
+                "--workers", str(workers), "--threads", "8",
+            ]
+        return "runserver", [
+            sys.executable, str(MANAGE), "runserver", f"{host}:{port}", "--noreload", "--nostatic", "--skip-checks",
+        ]
+    if importlib.util.find_spec("uvicorn"):
+        return "uvicorn", [
+            sys.executable, "-m", "uvicorn", "root.asgi:application", "--host", host, "--port", str(port),
+            "--workers", str(workers), "--no-access-log", "--log-level", "warning",
+        ]
+    if importlib.util.find_spec("daphne"):
+        return "daphne", [sys.executable, "-m", "daphne", "-b", host, "-p", str(port), "root.asgi:application"]
+    return None
+
+
+def process_tree(pid):
+    pids = [pid]
+    for task in Path(f"/proc/{pid}/task").glob("*/children"):
+        try:
+            children = task.read_text().split()
+        except OSError:
+            continue
+        for child in children:
+            pids.extend(process_tree(int(child)))
+    return pids
+
+
+def peak_rss_mb(pid):
+    """Peak resident memory of ``pid`` and its children (``VmHWM``, Linux only)."""
+    total_kb = 0
+    for member in process_tree(pid):
+        try:
+            status = Path(f"/proc/{member}/status").read_text()
+        except OSError:
+            continue
+        for line in status.splitlines():
+            if line.startswith("VmHWM:"):
+                total_kb += int(line.split()[1])
+    return round(total_kb / 1024, 1) if total_kb else None
+
+
+def reset_peak_rss(pid):
+    for member in process_tree(pid):
+        try:
+            Path(f"/proc/{member}/clear_refs").write_text("5")
+        except OSError:
+            pass
+
+
+async def drive(client, route, ctx, requests, concurrency):
+    """Send ``requests`` requests for ``route`` from ``concurrency`` workers; returns the stats."""
+    samples = []
+    statuses = Counter()
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            kwargs = route.build(ctx)
+            started = time.perf_counter()
+            try:
+                response = await client.request(route.method, **kwargs)
+                statuses[response.status_code] += 1
+            except httpx.HTTPError as error:
+                statuses[type(error).__name__] += 1
+                continue
+            finally:
+                samples.append(time.perf_counter() - started)
+            if route.after and response.is_success:
+                route.after(ctx, response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    errors = sum(count for status, count in statuses.items() if not (isinstance(status, int) and status < 400))
+    return {
+        **summarize(samples),
+        "rps": round(len(samples) / elapsed, 1),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "status": {str(status): count for status, count in sorted(statuses.items(), key=str)},
+    }
+
+
+async def drive_routes(base_url, pid, routes, options, images, progress):
+    ctx = Context(options["seed"], images)
+    results = {}
+    limits = httpx.Limits(max_connections=options["concurrency"], max_keepalive_connections=options["concurrency"])
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits) as client:
+        response = await client.post("/api/teachers/bulk/", json=[
+            {"username_en": f"Teacher {n}", "username_gu": f"શિક્ષક {n}"} for n in range(SEED_TEACHERS)
+        ])
+        response.raise_for_status()
+        for route in routes:
+            if options["warmup"]:
+                await drive(client, route, ctx, options["warmup"], min(options["warmup"], options["concurrency"]))
+            reset_peak_rss(pid)
+            results[route.name] = await drive(client, route, ctx, options["requests"], options["concurrency"])
+            results[route.name]["peak_rss_mb"] = peak_rss_mb(pid)
+            progress(route.name, results[route.name])
+    return results
+
+
+def manage(env, *args):
+    subprocess.run([sys.executable, str(MANAGE), *args], env=env, cwd=BASE_DIR, check=True, stdout=subprocess.DEVNULL)
+
+
+def prepare_database(path, env, with_kb):
+    """Migrate a scratch database (and load the nutrition table) to copy for each server."""
+    env = {**env, "LOADTEST_DATABASE": str(path)}
+    manage(env, "migrate", "--noinput")
+    if with_kb:
+        manage(env, "import_nutrition", str(NUTRITION_CSV))
+
+
+def run_server(kind, options, env, template, workdir, images, progress):
+    port = free_port()
+    command = server_command(kind, port, options["workers"])
+    if command is None:
+        return {"skipped": "install uvicorn or daphne to run the app under ASGI"}
+    runner, argv = command
+
+    database = workdir / f"{kind}.sqlite3"
+    shutil.copyfile(template, database)
+    log = open(workdir / f"{kind}.log", "wb")
+    process = subprocess.Popen(
+        argv, env={**env, "LOADTEST_DATABASE": str(database)}, cwd=BASE_DIR, stdout=log, stderr=subprocess.STDOUT,
+    )
+    try:
+        wait_for_port(port, process)
+        routes = [route for route in ROUTES if not options["routes"] or route.name in options["routes"]]
+        results = asyncio.run(drive_routes(f"http://127.0.0.1:{port}", process.pid, routes, options, images, progress))
+        return {"runner": runner, "workers": options["workers"], "routes": results}
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        log.close()
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(options, progress=lambda route, stats: None, announce=lambda kind, runner: None):
+    """
+    Run the load test; returns the report.
+
+    ``options``: ``servers``, ``routes`` (names; empty for all), ``requests``,
+    ``concurrency``, ``warmup``, ``workers``, ``seed``, ``latency``,
+    ``error_rate``, ``reply_shape``, ``base_settings`` and ``with_kb``.
+    """
+    workdir = Path(tempfile.mkdtemp(prefix="loadtest-"))
+    fake_port = free_port()
+    fake = subprocess.Popen(
+        [
+            sys.executable, str(MANAGE), "fake_openai", "--port", str(fake_port),
+            "--latency", str(options["latency"]), "--error-rate", str(options["error_rate"]),
+            "--reply-shape", options["reply_shape"],
+        ],
+        cwd=BASE_DIR, stdout=subprocess.DEVNULL,
+    )
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "root.settings_loadtest",
+        "LOADTEST_BASE_SETTINGS": options["base_settings"],
+        "DJANGO_SECRET_KEY": os.environ.get("DJANGO_SECRET_KEY", "loadtest"),
+        "OPENAI_API_KEY": "fake",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{fake_port}/v1",
+    }
+    try:
+        wait_for_port(fake_port, fake)
+        template = workdir / "template.sqlite3"
+        prepare_database(template, env, options["with_kb"])
+        images = plate_images(32)
+
+        servers = {}
+        for kind in options["servers"]:
+            runner = server_command(kind, 0, options["workers"])
+            announce(kind, runner[0] if runner else None)
+            servers[kind] = run_server(kind, options, env, template, workdir, images, progress)
+    finally:
+        fake.terminate()
+        fake.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        "options": {key: value for key, value in options.items() if key != "routes"},
+        "servers": servers,
+    }
+
+
+def compare(report, baseline, tolerance):
+    """
+    ``(server, route, metric, before, after)`` for each metric worse than
+    in ``baseline`` by more than ``tolerance`` (a fraction) and the noise floor.
+    """
+    regressions = []
+    for kind, result in report["servers"].items():
+        before_routes = baseline.get("servers", {}).get(kind, {}).get("routes", {})
+        for route, after in result.get("routes", {}).items():
+            before = before_routes.get(route)
+            if not before:
+                continue
+            for metric in ("p50_ms", "p95_ms", "p99_ms", "peak_rss_mb"):
+                old, new = before.get(metric), after.get(metric)
+                if old is not None and new is not None and new - old > max(old * tolerance, NOISE[metric]):
+                    regressions.append((kind, route, metric, old, new))
+            if before["rps"] - after["rps"] > max(before["rps"] * tolerance, NOISE["rps"]):
+                regressions.append((kind, route, "rps", before["rps"], after["rps"]))
+            if after["error_rate"] > before["error_rate"] + tolerance / 10:
+                regressions.append((kind, route, "error_rate", before["error_rate"], after["error_rate"]))
+    return regressions
+
+
+def load(path):
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def save(report, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import Counter
+
+import httpx
+from django.core.cache import caches
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.db import connection
+from django.test import override_settings
+
+from myapp import admission, loadtest
+from myapp.benchmarking import format_row, summarize
+from myapp.fake_openai import FakeOpenAIServer
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class Server(ThreadedWSGIServer):
+    request_queue_size = 256
+
+
+def serve():
+    server = Server(("127.0.0.1", 0), QuietHandler, allow_reuse_address=False)
+    server.set_app(WSGIHandler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def flood_and_probe(base_url, clients, duration, images):
+    """
+    ``clients`` clients upload plates back to back (waiting out
+    ``Retry-After`` when refused) while two probes read the survey and
+    teacher list.
+    """
+    verify = {"ok": [], "rejected": [], "status": Counter()}
+    probes = []
+    deadline = time.monotonic() + duration
+    uploads = iter(range(10 ** 9))
+    limits = httpx.Limits(max_connections=clients + 4, max_keepalive_connections=clients + 4)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits) as client:
+        async def uploader(index):
+            while time.monotonic() < deadline:
+                upload = next(uploads)
+                started = time.perf_counter()
+                response = await client.post(
+                    "/api/verify-menu/",
+                    data={"lang": "en", "menu": loadtest.MENU},
+                    files={"image": ("plate.jpg", images[upload % len(images)] + upload.to_bytes(8, "big"), "image/jpeg")},
+                    headers={"X-Client-Id": f"school-{index}"},
+                )
+                elapsed = time.perf_counter() - started
+                verify["status"][response.status_code] += 1
+                if response.status_code == 200:
+                    verify["ok"].append(elapsed)
+                else:
+                    verify["rejected"].append(elapsed)
+                    await asyncio.sleep(min(float(response.headers.get("Retry-After", 1)), deadline - time.monotonic()))
+
+        async def probe():
+            while time.monotonic() < deadline:
+                for url in ("/api/survey/en/", "/api/teachers/"):
+                    started = time.perf_counter()
+                    response = await client.get(url)
+                    response.raise_for_status()
+                    probes.append(time.perf_counter() - started)
+                await asyncio.sleep(0.05)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(uploader(index) for index in range(clients)), probe(), probe())
+        elapsed = time.perf_counter() - started
+    return verify, probes, elapsed
+
+
+class Command(BaseCommand):
+    help = (
+        "Flood verify-menu (fake OpenAI server, the default OpenAI quota) while probing the survey and "
+        "teacher routes, with and without admission control, on a threaded WSGI server in-process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=64)
+        parser.add_argument("--duration", type=float, default=20.0)
+        parser.add_argument("--latency", type=float, default=1.0, help="Fake OpenAI seconds per reply.")
+
+    def handle(self, *args, **options):
+        fake = FakeOpenAIServer(latency=options["latency"]).start()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        server = serve()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        images = loadtest.plate_images(8)
+        # Every refusal would be logged as a warning or error.
+        logging.getLogger("django.request").setLevel(logging.CRITICAL)
+        try:
+            for enabled in (False, True):
+                caches["admission"].clear()
+                with override_settings(
+                    ALLOWED_HOSTS=["127.0.0.1"],
+                    OPENAI_CLIENT={"API_KEY": "fake", "BASE_URL": fake.base_url, "MAX_RETRIES": 0},
+                    VERIFY_MENU_HISTORY={"ENABLED": False},
+                    VERIFY_MENU_ADMISSION={
+                        **admission.options(), "ENABLED": enabled, "CLIENT_HEADER": "HTTP_X_CLIENT_ID",
+                    },
+                ):
+                    verify, probes, elapsed = asyncio.run(
+                        flood_and_probe(base_url, options["clients"], options["duration"], images),
+                    )
+                label = "admission on" if enabled else "admission off"
+                statuses = ", ".join(f"{code}={count}" for code, count in sorted(verify["status"].items()))
+                self.stdout.write(f"{label}: verify-menu {statuses}, {len(verify['ok']) / elapsed:.1f} verified/s")
+                self.stdout.write("  " + format_row("verify-menu 200", summarize(verify["ok"])))
+                if verify["rejected"]:
+                    self.stdout.write("  " + format_row("verify-menu refused", summarize(verify["rejected"])))
+                self.stdout.write("  " + format_row("survey + teachers", summarize(probes)))
+        finally:
+            server.shutdown()
+            server.server_close()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            fake.stop()
@@ -0,0 +1,76 @@
+import importlib
+import os
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+
+from myapp.benchmarking import format_row, summarize
+from myapp.models import Teacher
+
+PROFILE_SETTINGS = ("DEBUG", "MIDDLEWARE", "API_PATH_PREFIXES", "BROWSER_MIDDLEWARE", "REST_FRAMEWORK")
+
+REQUESTS = [
+    ("teacher-list", "get", "/api/teachers/", {"lang": "en"}),
+    ("teacher-detail", "get", "/api/teachers/7/", {"lang": "gu"}),
+    ("get-survey-lang", "get", "/api/survey/en/", {}),
+    ("survey-summary", "get", "/api/survey/summary/", {"school": "s1", "date": "2024-01-01"}),
+    ("survey-response-create", "post", "/api/survey/responses/", {
+        "school": "s1", "date": "2024-01-01", "answers": {"q1": 0, "q2": 1},
+    }),
+]
+
+
+def production_settings():
+    with mock.patch.dict(os.environ, {"DJANGO_SECRET_KEY": os.environ.get("DJANGO_SECRET_KEY", "bench")}):
+        production = importlib.import_module("root.settings_production")
+    return {name: getattr(production, name) for name in PROFILE_SETTINGS}
+
+
+def latencies(profile, method, path, data, requests):
+    with override_settings(**profile):
+        client = Client(HTTP_HOST="localhost")
+        send = getattr(client, method)
+        kwargs = {"content_type": "application/json"} if method == "post" else {}
+        send(path, data, **kwargs)
+        samples = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = send(path, data, **kwargs)
+            samples.append(time.perf_counter() - started)
+        assert response.status_code < 400, response.content
+    return samples
+
+
+class Command(BaseCommand):
+    help = (
+        "Per-request latency of the teacher and survey endpoints with the default settings "
+        "and with the production profile (root.settings_production), in-process on a throwaway database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--rounds", type=int, default=3)
+
+    def handle(self, *args, **options):
+        profiles = {"default": {}, "production": production_settings()}
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            Teacher.objects.bulk_create([
+                Teacher(username_en=f"Teacher {n}", username_gu=f"શિક્ષક {n}") for n in range(1000)
+            ])
+            for name, method, path, data in REQUESTS:
+                results = {label: [] for label in profiles}
+                # Alternate the profiles so drift hits both.
+                for _ in range(options["rounds"]):
+                    for label, profile in profiles.items():
+                        results[label] += latencies(profile, method, path, data, options["requests"])
+                summaries = {label: summarize(samples) for label, samples in results.items()}
+                saved = summaries["default"]["p50_ms"] - summaries["production"]["p50_ms"]
+                self.stdout.write(f"{name}: production saves {saved * 1000:.0f}us p50 per request")
+                for label, summary in summaries.items():
+                    self.stdout.write(format_row(f"  {label}", summary))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
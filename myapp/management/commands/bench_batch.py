@@ -0,0 +1,56 @@
+import asyncio
+import base64
+import os
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from openai import AsyncOpenAI
+
+from myapp.fake_openai import FakeOpenAIServer
+from myapp.result_cache import result_cache
+from myapp.uploads import EncodedImage
+from myapp.verify import averify_batch
+
+MENU = ["rice", "dal", "roti", "salad"]
+
+
+def fake_image(size_kb):
+    data_url = "data:image/jpeg;base64," + base64.b64encode(os.urandom(size_kb * 1024)).decode("ascii")
+    return EncodedImage("plate.jpg", "image/jpeg", size_kb * 1024, uuid.uuid4().hex, data_url=data_url)
+
+
+class Command(BaseCommand):
+    help = "Measure batch verify-menu throughput for several pool sizes against a fake OpenAI server."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=40)
+        parser.add_argument("--pool-sizes", default="1,2,4,8,16")
+        parser.add_argument("--latency", type=float, default=0.2)
+        parser.add_argument("--image-kb", type=int, default=30)
+        parser.add_argument("--mode", choices=["parallel", "combined"], default="parallel")
+
+    def handle(self, *args, **options):
+        # Every image is new; skip the persistent tier so no cache table is needed.
+        result_cache.alias = None
+        server = FakeOpenAIServer(latency=options["latency"]).start()
+        try:
+            for size in (int(size) for size in options["pool_sizes"].split(",")):
+                elapsed, failed = asyncio.run(self.run_batch(server, size, options))
+                self.stdout.write(
+                    f"pool={size:<4} items={options['items']:<5} failed={failed:<4} "
+                    f"elapsed={elapsed:>7.2f}s throughput={options['items'] / elapsed:>7.2f} images/s"
+                )
+        finally:
+            server.stop()
+
+    async def run_batch(self, server, size, options):
+        client = AsyncOpenAI(api_key="fake", base_url=server.base_url, max_retries=0)
+        items = [(fake_image(options["image_kb"]), MENU) for _ in range(options["items"])]
+        try:
+            started = time.perf_counter()
+            outcomes = await averify_batch(client, items, "en", mode=options["mode"], pool=asyncio.Semaphore(size))
+            elapsed = time.perf_counter() - started
+        finally:
+            await client.close()
+        return elapsed, sum(1 for outcome in outcomes if isinstance(outcome, BaseException))
@@ -0,0 +1,62 @@
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+BASE_DIR = Path(__file__).resolve().parents[3]
+
+# Run in a fresh interpreter: what a worker does before its first request.
+COLD_START = """
+import json, os, sys, time
+sys.path.insert(0, {base!r})
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "root.settings")
+started = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+urls = time.perf_counter()
+print(json.dumps({{"setup": setup - started, "urls": urls - setup}}))
+"""
+
+
+def cold_start(importtime=False):
+    command = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", COLD_START.format(base=str(BASE_DIR))]
+    result = subprocess.run(command, capture_output=True, text=True, check=True, cwd=BASE_DIR)
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def heaviest_imports(stderr, top):
+    """Import time (microseconds) per top-level package, summed from the self times in ``-X importtime`` output."""
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        own, _, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if own.isdigit():
+            package = name.split(".")[0]
+            totals[package] = totals.get(package, 0) + int(own)
+    return sorted(totals.items(), key=lambda item: -item[1])[:top]
+
+
+class Command(BaseCommand):
+    help = "Time a cold start (django.setup() and loading the URL conf) in fresh interpreters, and list the slowest imports."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--top", type=int, default=12)
+
+    def handle(self, *args, **options):
+        runs = [cold_start()[0] for _ in range(options["runs"])]
+        setup = statistics.median(run["setup"] for run in runs) * 1000
+        urls = statistics.median(run["urls"] for run in runs) * 1000
+        self.stdout.write(f"cold start (median of {options['runs']}): setup={setup:.0f}ms urls={urls:.0f}ms total={setup + urls:.0f}ms")
+
+        _, stderr = cold_start(importtime=True)
+        self.stdout.write("slowest packages to import (one run with -X importtime):")
+        for name, micros in heaviest_imports(stderr, options["top"]):
+            self.stdout.write(f"  {name:<28} {micros / 1000:>8.1f}ms")
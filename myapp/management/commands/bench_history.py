@@ -0,0 +1,113 @@
+import random
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory, override_settings
+
+from myapp import history
+from myapp.benchmarking import format_row, summarize
+from myapp.models import Verification
+from myapp.views import VerificationReportAPIView
+
+FIRST_DAY = date(2024, 1, 1)
+MENU = ["rice", "dal", "roti", "sabzi", "salad", "buttermilk"]
+
+
+def entries(count, schools, days, seed=0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        menu = rng.sample(MENU, rng.randint(3, len(MENU)))
+        missing = [item for item in menu if rng.random() < 0.15]
+        yield {
+            "school": f"school-{rng.randrange(schools)}",
+            "teacher_id": None,
+            "date": FIRST_DAY + timedelta(days=rng.randrange(days)),
+            "lang": rng.choice(("en", "gu")),
+            "menu": menu,
+            "detected_items": [item for item in menu if item not in missing],
+            "found_items": [item for item in menu if item not in missing],
+            "missing_items": missing,
+            "nutritions": {item: {"calories": "200 kcal"} for item in menu if item not in missing},
+        }
+
+
+def report_view(group, date_to):
+    request = RequestFactory().get("/api/verify-menu/report/", {
+        "by": group, "from": FIRST_DAY.isoformat(), "to": date_to.isoformat(),
+    }, HTTP_HOST="localhost")
+    response = VerificationReportAPIView.as_view()(request)
+    response.render()
+    return response
+
+
+def report_scan(group, date_to):
+    """What the per-school report costs without the rollups: read every stored verification."""
+    totals = Counter()
+    for school, menu, missing in Verification.objects.filter(
+        date__range=(FIRST_DAY, date_to),
+    ).values_list("school", "menu", "missing_items").iterator(chunk_size=5000):
+        totals[(school, "menu")] += len(menu)
+        totals[(school, "missing")] += len(missing)
+    return totals
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark verification history: request-path cost of recording, batch write rate, and "
+        "report latency (rollups vs scanning verifications) on a throwaway database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verifications", type=int, default=500_000)
+        parser.add_argument("--schools", type=int, default=200)
+        parser.add_argument("--days", type=int, default=180, help="A school term is about 180 days.")
+        parser.add_argument("--queries", type=int, default=20)
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            sample = list(entries(200, options["schools"], options["days"], seed=1))
+            inline = timed(lambda: history.write([sample[0]]), len(sample))
+            self.stdout.write(format_row("record (inline write)", summarize(inline)))
+            with override_settings(VERIFY_MENU_HISTORY={"ASYNC": True}):
+                items = iter(sample)
+                queued = timed(lambda: history.record(next(items)), len(sample))
+                history.flush()
+            self.stdout.write(format_row("record (queued)", summarize(queued)))
+
+            batch_size = history.options()["BATCH_SIZE"]
+            started = time.perf_counter()
+            batch = []
+            for item in entries(options["verifications"], options["schools"], options["days"]):
+                batch.append(item)
+                if len(batch) == batch_size:
+                    history.write(batch)
+                    batch = []
+            if batch:
+                history.write(batch)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"write    verifications={options['verifications']:,} batch={batch_size} elapsed={elapsed:.1f}s "
+                f"rate={options['verifications'] / elapsed:,.0f}/s"
+            )
+
+            date_to = FIRST_DAY + timedelta(days=options["days"] - 1)
+            for group in history.GROUPS:
+                samples = timed(lambda: report_view(group, date_to), options["queries"])
+                self.stdout.write(format_row(f"report by {group}", summarize(samples)))
+            samples = timed(lambda: report_scan("school", date_to), max(1, options["queries"] // 10))
+            self.stdout.write(format_row("by school (scan)", summarize(samples)))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,73 @@
+import base64
+import io
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp import images, pipeline
+from myapp.benchmarking import summarize
+
+
+def phone_photo(width=4032, height=3024, quality=92):
+    """A noisy full-resolution JPEG, roughly the size a phone camera produces."""
+    from PIL import Image
+
+    noise = Image.effect_noise((width, height), 60).convert("RGB")
+    gradient = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    photo = Image.blend(noise, gradient, 0.5)
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    out = io.BytesIO()
+    photo.save(out, "JPEG", quality=quality, exif=exif)
+    return out.getvalue()
+
+
+def wire_bytes(image_url):
+    """Bytes sent to the API for the food-list and nutrition requests."""
+    started = time.perf_counter()
+    body = b"".join(
+        json.dumps(request).encode("utf-8")
+        for request in (pipeline.food_request(image_url), pipeline.nutrition_request(image_url))
+    )
+    return len(body), time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = "Show bytes on the wire and serialization time with and without image downscaling."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--image", help="Path to a photo to use instead of a generated one.")
+        parser.add_argument("--iterations", type=int, default=10)
+
+    def handle(self, *args, **options):
+        if not images.enabled():
+            raise CommandError("Image preprocessing needs Pillow and VERIFY_MENU_IMAGE['ENABLED'].")
+
+        if options["image"]:
+            with open(options["image"], "rb") as f:
+                raw = f.read()
+        else:
+            raw = phone_photo()
+
+        opts = images.options()
+        original_url = "data:image/jpeg;base64," + base64.b64encode(raw).decode("ascii")
+
+        prep_samples, before_samples, after_samples = [], [], []
+        for _ in range(options["iterations"]):
+            started = time.perf_counter()
+            small = images.downscale(raw, opts["MAX_SIDE"], opts["QUALITY"])
+            prep_samples.append(time.perf_counter() - started)
+            small_url = "data:image/jpeg;base64," + base64.b64encode(small).decode("ascii")
+
+            before_bytes, elapsed = wire_bytes(original_url)
+            before_samples.append(elapsed)
+            after_bytes, elapsed = wire_bytes(small_url)
+            after_samples.append(elapsed)
+
+        self.stdout.write(f"upload size:          {len(raw):>12,} B -> {len(small):>10,} B")
+        self.stdout.write(f"bytes on the wire:    {before_bytes:>12,} B -> {after_bytes:>10,} B "
+                          f"({before_bytes / after_bytes:.1f}x smaller)")
+        self.stdout.write(f"serialization p50:    {summarize(before_samples)['p50_ms']:>10.2f}ms -> "
+                          f"{summarize(after_samples)['p50_ms']:>8.2f}ms")
+        self.stdout.write(f"preprocessing p50:    {summarize(prep_samples)['p50_ms']:>10.2f}ms")
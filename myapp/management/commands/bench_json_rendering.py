@@ -0,0 +1,97 @@
+import csv
+import gzip
+import json
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+from myapp import renderers, surveys
+from myapp.loadtest import NUTRITION_CSV
+
+TEACHERS = [("Vaishaliben Patel", "વૈશાલીબેન પટેલ"), ("Parulben Shah", "પારૂલબેન શાહ"), ("Manishaben Desai", "મનીષાબેન દેસાઈ")]
+
+
+def dishes():
+    with open(NUTRITION_CSV, encoding="utf-8", newline="") as handle:
+        return list(csv.DictReader(handle))
+
+
+def verify_result(lang, rows):
+    """A verify-menu response the size of a typical plate, with names in ``lang``."""
+    names = [row["name_gu" if lang == "gu" else "name_en"] or row["name_en"] for row in rows[:8]]
+    return {
+        "items_food": names[:6],
+        "input_menu": names[:4] + names[6:8],
+        "found_items": names[:4],
+        "missing_items": names[6:8],
+        "nutritions": {
+            name: {
+                "calories": f"{row['calories']} kcal", "protein": f"{row['protein']} g",
+                "fat": f"{row['fat']} g", "carbs": f"{row['carbs']} g",
+            }
+            for name, row in zip(names[:6], rows)
+        },
+        "nutrition_kb": {"hits": 6, "misses": []},
+    }
+
+
+def payloads(lang):
+    rows = dishes()
+    result = verify_result(lang, rows)
+    return {
+        "verify-menu": result,
+        "batch of 20": {"succeeded": 20, "failed": 0, "items": [
+            {"index": index, "status": 200, "cache": "MISS", "result": result} for index in range(20)
+        ]},
+        "survey": surveys.get(lang).survey.model_dump(),
+        "teachers x1000": [
+            {"id": n, "username": TEACHERS[n % len(TEACHERS)][lang == "gu"]} for n in range(1, 1001)
+        ],
+    }
+
+
+def encoders():
+    drf = JSONRenderer()
+
+    def stdlib_fallback(data):
+        with mock.patch.object(renderers, "orjson", None):
+            return renderers.dumps(data)
+
+    return {
+        "JsonResponse": lambda data: json.dumps(data, cls=DjangoJSONEncoder).encode("utf-8"),
+        "DRF JSONRenderer": drf.render,
+        "dumps (stdlib)": stdlib_fallback,
+        "dumps": renderers.dumps,
+        "dumps + gzip": lambda data: gzip.compress(renderers.dumps(data), compresslevel=6, mtime=0),
+    }
+
+
+def time_per_call(func, data, min_time=0.2):
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        func(data)
+        calls += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            return elapsed / calls
+
+
+class Command(BaseCommand):
+    help = "Serialization time and payload size per encoder, for English and Gujarati responses."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--min-time", type=float, default=0.2, help="Seconds to time each encoder for.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"dumps uses {'orjson' if renderers.orjson else 'the stdlib json encoder'}")
+        for lang in ("en", "gu"):
+            for name, data in payloads(lang).items():
+                self.stdout.write(f"{lang} {name}")
+                for label, func in encoders().items():
+                    size = len(func(data))
+                    micros = time_per_call(func, data, options["min_time"]) * 1e6
+                    self.stdout.write(f"  {label:<18} {size:>9,} bytes {micros:>10.1f}us")
@@ -0,0 +1,107 @@
+import base64
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from openai import OpenAI
+
+from myapp import nutrition_kb, pipeline, translations
+from myapp.benchmarking import format_row, summarize
+from myapp.fake_openai import FakeOpenAIServer
+from myapp.loadtest import NUTRITION_CSV
+from myapp.models import NutritionFact, Translation
+from myapp.parsers import CSVParser
+
+MENUS = {"en": ["rice", "dal", "roti", "salad"], "gu": ["ભાત", "દાળ", "રોટલી", "સલાડ"]}
+
+# The Gujarati prompts the pipeline used to send for lang=gu.
+NATIVE_PROMPTS = {
+    "food": "આ છબીમાં તમે કયા ખોરાક વસ્તુઓ જોઈ શકો છો? ફક્ત યાદી આપો.",
+    "nutrition": (
+        "તમે આ છબીમાં કયા ખોરાક જોઈ શકો છો? દરેક વસ્તુ માટે અંદાજિત પોષણ માહિતી આપો: કૅલોરીઝ (kcal) "
+        "અને પ્રોટીન, ફેટ, કાર્બસ (ગ્રામ) સંખ્યામાં."
+    ),
+    "nutrition_items": (
+        "નીચેની દરેક ખોરાક વસ્તુની એક પીરસણ માટે અંદાજિત કૅલોરીઝ (kcal) અને પ્રોટીન, ફેટ, કાર્બસ (ગ્રામ) "
+        "સંખ્યામાં આપો. દરેક વસ્તુનું નામ જેમ લખ્યું છે તેમ જ રાખો."
+    ),
+}
+
+
+def with_prompt(request, prompt):
+    content = request["messages"][-1]["content"]
+    if isinstance(content, str):
+        request["messages"][-1]["content"] = "\n".join([prompt, *content.splitlines()[1:]])
+    else:
+        content[0]["text"] = prompt
+    return request
+
+
+def run_native(client, lang, image_url, menu_list):
+    """The previous pipeline: prompts (and so replies) in the request's language."""
+    if lang == "en":
+        return pipeline.build_result(menu_list, *pipeline.detect(client, image_url))
+    reply = pipeline.complete(client, "food", with_prompt(pipeline.food_request(image_url), NATIVE_PROMPTS["food"]))
+    detected_items = pipeline.parse_detected_items(reply)
+    nutritions = {}
+    if not nutrition_kb.active():
+        request = with_prompt(pipeline.nutrition_request(image_url), NATIVE_PROMPTS["nutrition"])
+        nutritions = pipeline.parse_nutritions(pipeline.complete(client, "nutrition", request))
+    elif nutrition_kb.unknown(detected_items):
+        request = with_prompt(
+            pipeline.nutrition_items_request(nutrition_kb.unknown(detected_items)), NATIVE_PROMPTS["nutrition_items"],
+        )
+        nutritions = pipeline.parse_nutritions(pipeline.complete(client, "nutrition_items", request))
+    return pipeline.build_result(menu_list, detected_items, nutritions)
+
+
+def load_tables(filled):
+    Translation.objects.all().delete()
+    NutritionFact.objects.all().delete()
+    if filled:
+        with open(NUTRITION_CSV, "rb") as handle:
+            nutrition_kb.import_rows(CSVParser().parse(handle))
+    nutrition_kb.load()
+    translations.load()
+
+
+class Command(BaseCommand):
+    help = (
+        "Output tokens, calls and latency per verification for lang=en and lang=gu, with native-language "
+        "prompts (before) and English detection rendered locally (after), against a local fake OpenAI server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=20)
+        parser.add_argument("--latency", type=float, default=0.2, help="Fake server seconds per reply.")
+        parser.add_argument("--token-latency", type=float, default=0.01, help="Fake server seconds per output token.")
+
+    def handle(self, *args, **options):
+        server = FakeOpenAIServer(latency=options["latency"], token_latency=options["token_latency"]).start()
+        client = OpenAI(api_key="fake", base_url=server.base_url, max_retries=0)
+        image_url = "data:image/jpeg;base64," + base64.b64encode(os.urandom(64 * 1024)).decode("ascii")
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            for filled, scenario in ((True, "nutrition table and dictionary filled"), (False, "empty tables")):
+                self.stdout.write(scenario)
+                for lang in ("en", "gu"):
+                    for label, run in (("native", run_native), ("english+local", pipeline.run)):
+                        load_tables(filled)
+                        self.bench(server, client, run, lang, image_url, f"{lang} {label}", options["requests"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            server.stop()
+
+    def bench(self, server, client, run, lang, image_url, label, requests):
+        calls, tokens = server.request_count, server.completion_tokens
+        samples = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            run(client, lang, image_url, MENUS[lang])
+            samples.append(time.perf_counter() - started)
+        self.stdout.write(
+            "  " + format_row(label, summarize(samples))
+            + f" calls={(server.request_count - calls) / requests:.2f}"
+            + f" output_tokens={(server.completion_tokens - tokens) / requests:.1f}"
+        )
@@ -0,0 +1,91 @@
+import json
+import random
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.utils.regex_helper import normalize
+
+from myapp.matching import MenuIndex, match_menu
+from myapp.pipeline import parse_detected_items
+
+CORPUS = Path(__file__).resolve().parents[2] / "bench_data" / "menu_matching.json"
+
+
+def legacy_match(menu_list, detected_items):
+    """The original matcher: regex_helper.normalize() on every menu/detected pair."""
+    found_items = [
+        item for item in menu_list
+        if any(normalize(item) == normalize(d) for d in detected_items)
+    ]
+    return found_items, [item for item in menu_list if item not in found_items]
+
+
+def accuracy(matcher, cases):
+    """Precision and recall over menu items marked found, plus the share of fully correct cases."""
+    true_pos = false_pos = false_neg = exact = errors = 0
+    for case in cases:
+        try:
+            found, _ = matcher(case["menu"], parse_detected_items(case["reply"]))
+        except Exception:
+            # regex_helper.normalize() raises on some replies, e.g. "Dal (lentil curry)"; the view returned a 500.
+            errors += 1
+            found = []
+        expected = set(case["expected"])
+        true_pos += len(expected & set(found))
+        false_pos += len(set(found) - expected)
+        false_neg += len(expected - set(found))
+        exact += found == case["expected"]
+    return {
+        "precision": true_pos / (true_pos + false_pos) if true_pos + false_pos else 1.0,
+        "recall": true_pos / (true_pos + false_neg) if true_pos + false_neg else 1.0,
+        "exact": exact / len(cases),
+        "errors": errors,
+    }
+
+
+def synthetic(menu_size, detected, seed=0):
+    """A ``menu_size`` menu built from corpus words and a reply naming ``detected`` dishes."""
+    rng = random.Random(seed)
+    words = sorted({word for case in json.loads(CORPUS.read_text()) for item in case["menu"] for word in item.split()})
+    menu = [f"{rng.choice(words)} {rng.choice(words)} {n}" for n in range(menu_size)]
+    reply = [rng.choice(menu).lower() for _ in range(detected // 2)]
+    reply += [f"{rng.choice(words)} special" for _ in range(detected - len(reply))]
+    return menu, reply
+
+
+def time_per_call(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat
+
+
+class Command(BaseCommand):
+    help = "Compare the legacy and indexed menu matchers: accuracy on a labelled corpus, then speed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--menu-sizes", default="10,100,1000")
+        parser.add_argument("--detected", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        cases = json.loads(CORPUS.read_text())
+        self.stdout.write(f"corpus: {len(cases)} cases from {CORPUS.name}")
+        for label, matcher in (("legacy", legacy_match), ("indexed", match_menu)):
+            scores = accuracy(matcher, cases)
+            self.stdout.write(
+                f"{label:<8} precision={scores['precision']:.3f} recall={scores['recall']:.3f} "
+                f"exact_cases={scores['exact']:.3f} errors={scores['errors']}"
+            )
+
+        for size in map(int, options["menu_sizes"].split(",")):
+            menu, reply = synthetic(size, options["detected"])
+            legacy = time_per_call(lambda: legacy_match(menu, reply), max(1, options["repeat"] * 10 // size))
+            build = time_per_call(lambda: MenuIndex(menu), options["repeat"])
+            index = MenuIndex(menu)
+            warm = time_per_call(lambda: index.match(reply), options["repeat"])
+            self.stdout.write(
+                f"menu={size:<6} detected={options['detected']:<4} legacy={legacy * 1000:>10.2f}ms "
+                f"index_build={build * 1000:>8.2f}ms match={warm * 1000:>8.3f}ms"
+            )
@@ -0,0 +1,61 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from myapp import metrics
+from myapp.benchmarking import format_row, summarize
+
+MIDDLEWARE = "myapp.middleware.ServerTimingMiddleware"
+
+
+def request_latencies(path, requests, instrumented):
+    """Time in-process GETs of ``path`` with or without the Server-Timing middleware."""
+    middleware = [name for name in settings.MIDDLEWARE if instrumented or name != MIDDLEWARE]
+    with override_settings(MIDDLEWARE=middleware):
+        client = Client(HTTP_HOST="localhost")
+        client.get(path)  # load the middleware chain and warm caches
+        samples = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            client.get(path)
+            samples.append(time.perf_counter() - started)
+    return samples
+
+
+def stage_cost(repeat):
+    """Seconds per ``metrics.stage()`` block inside a request."""
+    token = metrics.start_request()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        with metrics.stage("bench"):
+            pass
+    elapsed = time.perf_counter() - started
+    metrics.end_request(token)
+    return elapsed / repeat
+
+
+class Command(BaseCommand):
+    help = "Cost of the Server-Timing middleware and stage timers on a cheap endpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/survey/en/")
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--rounds", type=int, default=3)
+
+    def handle(self, *args, **options):
+        results = {"plain": [], "instrumented": []}
+        # Alternate the two so drift (caches, CPU frequency) hits both.
+        for _ in range(options["rounds"]):
+            for label in results:
+                results[label] += request_latencies(options["path"], options["requests"], label == "instrumented")
+
+        for label, samples in results.items():
+            self.stdout.write(format_row(label, summarize(samples)))
+        plain, instrumented = summarize(results["plain"]), summarize(results["instrumented"])
+        self.stdout.write(
+            f"middleware overhead: {(instrumented['mean_ms'] - plain['mean_ms']) * 1000:+.1f}us/request mean, "
+            f"{(instrumented['p50_ms'] - plain['p50_ms']) * 1000:+.1f}us p50"
+        )
+        self.stdout.write(f"stage() block: {stage_cost(100000) * 1e6:.2f}us")
@@ -0,0 +1,47 @@
+import json
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from myapp.pipeline import UNITS, parse_nutrition_text, parse_nutritions
+
+CORPUS = Path(__file__).resolve().parents[2] / "bench_data" / "nutrition_replies.json"
+
+# The text fixtures are what the old free-form prompt returned; the json ones
+# what the structured-output prompt returns.
+PARSERS = {
+    "text": ("regex", parse_nutrition_text),
+    "json": ("structured", parse_nutritions),
+}
+
+
+def parsed_correctly(nutritions, expected):
+    """Every expected item, nothing else, and all four values for each."""
+    return sorted(nutritions) == sorted(expected) and all(set(UNITS) <= set(values) for values in nutritions.values())
+
+
+class Command(BaseCommand):
+    help = "Parse success rate, parse time and reply size for free-text vs structured nutrition replies."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        cases = json.loads(CORPUS.read_text())
+        for reply_format, (label, parser) in PARSERS.items():
+            group = [case for case in cases if case["format"] == reply_format]
+            replies = [case["reply"].strip().lower() for case in group]
+            ok = sum(parsed_correctly(parser(reply), case["items"]) for reply, case in zip(replies, group))
+
+            started = time.perf_counter()
+            for _ in range(options["repeat"]):
+                for reply in replies:
+                    parser(reply)
+            per_parse = (time.perf_counter() - started) / (options["repeat"] * len(replies))
+
+            chars = sum(len(reply) for reply in replies) / max(1, sum(len(case["items"]) for case in group))
+            self.stdout.write(
+                f"{reply_format:<5} parser={label:<11} parsed={ok}/{len(group)} "
+                f"parse={per_parse * 1e6:>7.1f}us reply={chars:>5.0f} chars/item (~{chars / 4:.0f} tokens)"
+            )
@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from openai import AsyncOpenAI
+
+from myapp import llm, pipeline
+from myapp.benchmarking import format_row, summarize
+from myapp.fake_openai import FakeOpenAIServer
+
+SCENARIOS = ("quota", "outage")
+
+
+async def burst(client, requests, concurrency):
+    """Send ``requests`` food-list calls, ``concurrency`` at a time; returns (latencies of successes, failures)."""
+    request = pipeline.food_request("data:image/jpeg;base64,")
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failures = [], 0
+
+    async def one():
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await client.chat.completions.create(**request)
+            except Exception:
+                failures += 1
+            else:
+                latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies, failures
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare a bare AsyncOpenAI client with the guarded client (myapp.llm) against the fake server, "
+        "under a request quota (429s) and during an outage (every call fails)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--latency", type=float, default=0.1)
+        parser.add_argument("--quota", type=int, default=40, help="Fake server requests per second.")
+        parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+
+    def handle(self, *args, **options):
+        for scenario in options["scenarios"].split(","):
+            server = FakeOpenAIServer(
+                latency=options["latency"],
+                quota=options["quota"] if scenario == "quota" else 0,
+                error_rate=1.0 if scenario == "outage" else 0.0,
+            ).start()
+            try:
+                for label in ("bare", "bare+retries", "guarded"):
+                    server.request_count = server.throttled_count = 0
+                    started = time.perf_counter()
+                    latencies, failures = asyncio.run(self.run(label, server, options))
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        format_row(f"{scenario}/{label}", summarize(latencies))
+                        + f" ok={len(latencies)} failed={failures} upstream={server.request_count}"
+                        f" 429s={server.throttled_count} elapsed={elapsed:.1f}s"
+                    )
+            finally:
+                server.stop()
+
+    async def run(self, label, server, options):
+        if label == "guarded":
+            # Quota and breaker sized like OPENAI_CLIENT would be for this account.
+            with override_settings(OPENAI_CLIENT={
+                "API_KEY": "fake", "BASE_URL": server.base_url,
+                "RATE_PER_MINUTE": options["quota"] * 60, "BURST": max(1, options["quota"] // 4), "BACKOFF_BASE": 0.2,
+            }):
+                try:
+                    return await burst(llm.async_client(), options["requests"], options["concurrency"])
+                finally:
+                    await llm.async_client().client.close()
+
+        client = AsyncOpenAI(
+            api_key="fake", base_url=server.base_url, max_retries=2 if label == "bare+retries" else 0,
+        )
+        try:
+            return await burst(client, options["requests"], options["concurrency"])
+        finally:
+            await client.close()
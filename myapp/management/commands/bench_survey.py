@@ -0,0 +1,92 @@
+import json
+import random
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+
+from myapp import surveys
+from myapp.benchmarking import format_row, summarize
+from myapp.models import SurveyResponse
+from myapp.views import SurveyResponseCreateAPIView, SurveySummaryAPIView
+
+FIRST_DAY = date(2024, 1, 1)
+
+
+def submit(responses, schools, days, batch_size):
+    """POST ``responses`` random submissions through the view, ``batch_size`` per request."""
+    rng = random.Random(0)
+    questions = [(question.id, len(question.options)) for question in surveys.get("en").survey.questions]
+    factory = RequestFactory()
+    view = SurveyResponseCreateAPIView.as_view()
+    for start in range(0, responses, batch_size):
+        body = json.dumps([
+            {
+                "school": f"school-{rng.randrange(schools)}",
+                "date": (FIRST_DAY + timedelta(days=rng.randrange(days))).isoformat(),
+                "answers": {question_id: rng.randrange(options) for question_id, options in questions},
+            }
+            for _ in range(min(batch_size, responses - start))
+        ])
+        response = view(factory.post("/api/survey/responses/", body, content_type="application/json", HTTP_HOST="localhost"))
+        assert response.status_code == 201, response.data
+
+
+def summary_view(school, date_to):
+    request = RequestFactory().get("/api/survey/summary/", {
+        "school": school, "from": FIRST_DAY.isoformat(), "to": date_to.isoformat(),
+    }, HTTP_HOST="localhost")
+    response = SurveySummaryAPIView.as_view()(request)
+    response.render()
+    return response
+
+
+def summary_scan(school, date_to):
+    """What a summary costs without the counters: read every matching response."""
+    counts = Counter()
+    for answers in SurveyResponse.objects.filter(
+        school=school, date__range=(FIRST_DAY, date_to),
+    ).values_list("answers", flat=True).iterator():
+        counts.update(answers.items())
+    return counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark survey response ingestion and summary latency (counters vs scanning "
+        "responses) on a throwaway database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--responses", type=int, default=1_000_000)
+        parser.add_argument("--schools", type=int, default=50)
+        parser.add_argument("--days", type=int, default=30)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--queries", type=int, default=50)
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            started = time.perf_counter()
+            submit(options["responses"], options["schools"], options["days"], options["batch_size"])
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"ingest   responses={options['responses']:,} elapsed={elapsed:.1f}s "
+                f"rate={options['responses'] / elapsed:,.0f} responses/s"
+            )
+
+            date_to = FIRST_DAY + timedelta(days=options["days"] - 1)
+            rng = random.Random(1)
+            for label, func in (("summary (counters)", summary_view), ("summary (scan)", summary_scan)):
+                samples = []
+                for _ in range(options["queries"]):
+                    school = f"school-{rng.randrange(options['schools'])}"
+                    started = time.perf_counter()
+                    func(school, date_to)
+                    samples.append(time.perf_counter() - started)
+                self.stdout.write(format_row(label, summarize(samples)))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from myapp.views import TeacherBulkCreateAPIView, TeacherCreateAPIView
+
+# SQLite's own defaults, for comparison with SQLITE_PRAGMAS.
+UNTUNED_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL"}
+
+
+def insert_single(rows):
+    factory = RequestFactory()
+    view = TeacherCreateAPIView.as_view()
+    for _ in range(rows):
+        view(factory.post("/api/teachers/create/?lang=en", HTTP_HOST="localhost"))
+
+
+def insert_bulk(rows):
+    factory = RequestFactory()
+    view = TeacherBulkCreateAPIView.as_view()
+    batch = 5000
+    for start in range(0, rows, batch):
+        body = json.dumps([
+            {"username_en": f"Teacher {n}", "username_gu": f"શિક્ષક {n}"}
+            for n in range(start, min(start + batch, rows))
+        ])
+        response = view(factory.post("/api/teachers/bulk/", body, content_type="application/json", HTTP_HOST="localhost"))
+        assert response.status_code == 201, response.data
+
+
+class Command(BaseCommand):
+    help = "Report rows/sec for single-row vs bulk teacher inserts on a throwaway SQLite file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--single-rows", type=int, default=2000)
+        parser.add_argument("--bulk-rows", type=int, default=100000)
+        parser.add_argument("--untuned", action="store_true", help="Use SQLite's default journal/sync settings.")
+
+    def handle(self, *args, **options):
+        workdir = tempfile.mkdtemp(prefix="bench-ingest-")
+        connection.settings_dict["TEST"]["NAME"] = os.path.join(workdir, "bench.sqlite3")
+        pragmas = {"SQLITE_PRAGMAS": UNTUNED_PRAGMAS} if options["untuned"] else {}
+
+        with override_settings(**pragmas):
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute("PRAGMA journal_mode")
+                    journal = cursor.fetchone()[0]
+                self.stdout.write(f"journal_mode={journal}")
+                for label, func, rows in (
+                    ("single", insert_single, options["single_rows"]),
+                    ("bulk", insert_bulk, options["bulk_rows"]),
+                ):
+                    started = time.perf_counter()
+                    func(rows)
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(f"{label:<8} rows={rows:<8} elapsed={elapsed:>8.2f}s rate={rows / elapsed:>10.0f} rows/s")
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
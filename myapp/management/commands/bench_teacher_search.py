@@ -0,0 +1,81 @@
+import random
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from myapp import teacher_search
+from myapp.benchmarking import format_row, summarize
+from myapp.models import Teacher
+
+FIRST = [
+    ("Vaishali", "વૈશાલી"), ("Parul", "પારૂલ"), ("Manisha", "મનીષા"), ("Hetal", "હેતલ"), ("Kinjal", "કિંજલ"),
+    ("Nirav", "નિરવ"), ("Bhavesh", "ભાવેશ"), ("Jignesh", "જીગ્નેશ"), ("Dipika", "દીપિકા"), ("Rekha", "રેખા"),
+    ("Sanjay", "સંજય"), ("Alpesh", "અલ્પેશ"), ("Komal", "કોમલ"), ("Mehul", "મેહુલ"), ("Falguni", "ફાલ્ગુની"),
+]
+SUFFIX = [("ben", "બેન"), ("bhai", "ભાઈ"), ("", "")]
+LAST = [
+    ("Patel", "પટેલ"), ("Shah", "શાહ"), ("Desai", "દેસાઈ"), ("Joshi", "જોશી"), ("Mehta", "મહેતા"), ("Trivedi", "ત્રિવેદી"),
+    ("Pandya", "પંડ્યા"), ("Chauhan", "ચૌહાણ"), ("Parmar", "પરમાર"), ("Solanki", "સોલંકી"), ("Vyas", "વ્યાસ"),
+]
+
+# A few names that occur once in a million, spread through the table.
+RARE = [("Zarnaben Vakharia", "ઝરણાબેન વખારિયા"), ("Ilesh Kothari", "ઈલેશ કોઠારી"), ("Yogini Bhatt", "યોગિની ભટ્ટ")]
+
+# Rare to very common, both scripts, prefix and inside-the-word.
+QUERIES = ["vakharia", "ilesh koth", "યોગિની", "vaishaliben patel", "kinj", "ndya", "patel", "ben", "જોશી", "ગ્નેશ", "મહેતા કોમલ"]
+
+
+def fill(rows, seed=0, batch_size=50000):
+    rng = random.Random(seed)
+    with connection.cursor() as cursor:
+        for start in range(0, rows, batch_size):
+            batch = []
+            for n in range(start, min(start + batch_size, rows)):
+                if n % (rows // len(RARE) + 1) == rows // (2 * len(RARE)):
+                    name_en, name_gu = RARE[n * len(RARE) // rows]
+                else:
+                    (first_en, first_gu), (suffix_en, suffix_gu), (last_en, last_gu) = (
+                        rng.choice(FIRST), rng.choice(SUFFIX), rng.choice(LAST),
+                    )
+                    name_en, name_gu = f"{first_en}{suffix_en} {last_en}", f"{first_gu}{suffix_gu} {last_gu}"
+                batch.append((f"{name_en} {n}", f"{name_gu} {n}"))
+            cursor.executemany(
+                f"INSERT INTO {Teacher._meta.db_table} (username_en, username_gu) VALUES (%s, %s)", batch,
+            )
+
+
+def time_queries(queries, repeat, limit):
+    samples = []
+    for _ in range(repeat):
+        for query in queries:
+            started = time.perf_counter()
+            teacher_search.search(teacher_search.terms(query), limit)
+            samples.append(time.perf_counter() - started)
+    return samples
+
+
+class Command(BaseCommand):
+    help = "Teacher name search latency with the FTS5 trigram index vs icontains, on a throwaway database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--limit", type=int, default=20)
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            started = time.perf_counter()
+            fill(options["rows"])
+            self.stdout.write(f"inserted {options['rows']:,} teachers (index kept by triggers) in {time.perf_counter() - started:.1f}s")
+
+            fallback_repeat = max(1, options["repeat"] // 10)
+            for query in QUERIES:
+                self.stdout.write(format_row(f"fts {query}", summarize(time_queries([query], options["repeat"], options["limit"]))))
+                with mock.patch.object(teacher_search, "fts_available", return_value=False):
+                    samples = time_queries([query], fallback_repeat, options["limit"])
+                self.stdout.write(format_row(f"icontains {query}", summarize(samples)))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,97 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from myapp.models import Teacher
+from myapp.views import TeacherListAPIView
+
+SCENARIOS = ("legacy", "page", "stream")
+
+
+def fill_teachers(rows, batch_size=50000):
+    """Insert ``rows`` synthetic teachers with one executemany per batch."""
+    with connection.cursor() as cursor:
+        for start in range(0, rows, batch_size):
+            cursor.executemany(
+                f"INSERT INTO {Teacher._meta.db_table} (username_en, username_gu) VALUES (%s, %s)",
+                [(f"Teacher {n}", f"શિક્ષક {n}") for n in range(start, min(start + batch_size, rows))],
+            )
+
+
+def legacy_list(lang):
+    """The original TeacherListAPIView body: every row as a model instance, one big list."""
+    data = []
+    for teacher in Teacher.objects.all():
+        data.append({
+            "id": teacher.id,
+            "username": teacher.username_en if lang == 'en' else teacher.username_gu
+        })
+    yield JSONRenderer().render(data)
+
+
+def view_chunks(query):
+    request = RequestFactory().get("/api/teachers/", query, HTTP_HOST="localhost")
+    response = TeacherListAPIView.as_view()(request)
+    if response.streaming:
+        yield from response.streaming_content
+    else:
+        # Cached pages come back as a plain HttpResponse, errors as a DRF Response.
+        if hasattr(response, "render"):
+            response.render()
+        yield response.content
+
+
+def scenario_chunks(name, lang):
+    if name == "legacy":
+        return legacy_list(lang)
+    if name == "page":
+        return view_chunks({"lang": lang})
+    return view_chunks({"lang": lang, "stream": "1"})
+
+
+def measure(name, lang):
+    """Time to first byte and total time, then peak traced memory in a second pass."""
+    started = time.perf_counter()
+    chunks = scenario_chunks(name, lang)
+    first = next(chunks)
+    ttfb = time.perf_counter() - started
+    size = len(first) + sum(len(chunk) for chunk in chunks)
+    total = time.perf_counter() - started
+
+    tracemalloc.start()
+    for _ in scenario_chunks(name, lang):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return ttfb, total, peak, size
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the teacher list (legacy full list vs keyset page vs streaming export) "
+        "on a throwaway database filled with synthetic rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--lang", choices=["en", "gu"], default="en")
+        parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            started = time.perf_counter()
+            fill_teachers(options["rows"])
+            self.stdout.write(f"inserted {options['rows']:,} teachers in {time.perf_counter() - started:.1f}s")
+            for name in options["scenarios"].split(","):
+                ttfb, total, peak, size = measure(name, options["lang"])
+                self.stdout.write(
+                    f"{name:<8} ttfb={ttfb * 1000:>10.2f}ms total={total * 1000:>10.2f}ms "
+                    f"peak_mem={peak / 2**20:>8.1f}MiB body={size / 1024:>10.1f}KiB"
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
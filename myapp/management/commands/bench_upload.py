@@ -0,0 +1,96 @@
+import base64
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, RequestFactory, encode_multipart
+
+from myapp.benchmarking import format_row, summarize
+from myapp.uploads import ImageUploadHandler
+
+MODES = ("tempfile", "streaming")
+
+
+def build_body(image_mb):
+    image = b"\xff\xd8\xff\xe0" + os.urandom(image_mb * 1024 * 1024)
+    files = {"lang": "en", "menu": "rice, dal"}
+    body = encode_multipart(BOUNDARY, files)
+    # encode_multipart wants file objects; splice the image part in by hand to avoid a copy on disk.
+    image_part = (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="image"; filename="plate.jpg"\r\n'
+        "Content-Type: image/jpeg\r\n\r\n"
+    ).encode("ascii") + image + b"\r\n"
+    closing = f"--{BOUNDARY}--\r\n".encode("ascii")
+    return body[: -len(closing)] + image_part + closing
+
+
+def tempfile_path(request):
+    """The pre-streaming path: temp file, read back, encode, two payload copies."""
+    image_file = request.FILES["image"]
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as temp_img:
+        for chunk in image_file.chunks():
+            temp_img.write(chunk)
+        image_path = temp_img.name
+    try:
+        with open(image_path, "rb") as img_file:
+            image_base64 = base64.b64encode(img_file.read()).decode("utf-8")
+        return [f"data:image/jpeg;base64,{image_base64}", f"data:image/jpeg;base64,{image_base64}"]
+    finally:
+        os.unlink(image_path)
+
+
+def streaming_path(request):
+    request.upload_handlers = [ImageUploadHandler(max_bytes=1 << 30)]
+    image = request.FILES["image"]
+    return [image.data_url, image.data_url]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare peak RSS and latency of the old temp-file upload path against the "
+        "streaming base64 upload handler. Each mode runs in its own process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--image-mb", type=int, default=8)
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--mode", choices=MODES, help="Run a single mode in this process.")
+
+    def handle(self, *args, **options):
+        if options["mode"]:
+            self.stdout.write(json.dumps(self.run_mode(options)))
+            return
+
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, sys.argv[0], "bench_upload", "--mode", mode,
+                 "--image-mb", str(options["image_mb"]), "--iterations", str(options["iterations"])],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            report = json.loads(output.strip().splitlines()[-1])
+            self.stdout.write(f"{format_row(mode, report['latency'])} peak_rss_growth={report['peak_rss_growth_kb']}kB")
+
+    def run_mode(self, options):
+        body = build_body(options["image_mb"])
+        handler = tempfile_path if options["mode"] == "tempfile" else streaming_path
+        factory = RequestFactory()
+        baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        samples = []
+        for _ in range(options["iterations"]):
+            request = factory.generic("POST", "/api/verify-menu/", body, content_type=MULTIPART_CONTENT)
+            started = time.perf_counter()
+            handler(request)
+            samples.append(time.perf_counter() - started)
+
+        return {
+            "mode": options["mode"],
+            "latency": summarize(samples),
+            "peak_rss_growth_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_kb,
+        }
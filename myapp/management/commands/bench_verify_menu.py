@@ -0,0 +1,69 @@
+import asyncio
+import base64
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from openai import AsyncOpenAI, OpenAI
+
+from myapp import pipeline
+from myapp.benchmarking import format_row, summarize
+from myapp.fake_openai import FakeOpenAIServer
+
+MENU = ["rice", "dal", "roti", "salad"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare verify-menu latency for the sequential sync pipeline against the async "
+        "parallel and combined pipelines, using a local fake OpenAI server."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=50)
+        parser.add_argument("--concurrency", type=int, default=10)
+        parser.add_argument("--latency", type=float, default=0.3, help="Fake server seconds per reply.")
+        parser.add_argument("--token-latency", type=float, default=0.002, help="Fake server seconds per token.")
+        parser.add_argument("--image-kb", type=int, default=200)
+        parser.add_argument("--lang", choices=["en", "gu"], default="en")
+        parser.add_argument("--modes", default="sequential,parallel,combined")
+
+    def handle(self, *args, **options):
+        server = FakeOpenAIServer(latency=options["latency"], token_latency=options["token_latency"]).start()
+        image_url = "data:image/jpeg;base64," + base64.b64encode(os.urandom(options["image_kb"] * 1024)).decode("ascii")
+        try:
+            for mode in options["modes"].split(","):
+                if mode == "sequential":
+                    samples = self.bench_sync(server, image_url, options)
+                else:
+                    samples = asyncio.run(self.bench_async(server, image_url, options, mode))
+                self.stdout.write(format_row(mode, summarize(samples)))
+        finally:
+            server.stop()
+
+    def bench_sync(self, server, image_url, options):
+        client = OpenAI(api_key="fake", base_url=server.base_url, max_retries=0)
+
+        def one(_):
+            started = time.perf_counter()
+            pipeline.run(client, options["lang"], image_url, MENU)
+            return time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            return list(pool.map(one, range(options["requests"])))
+
+    async def bench_async(self, server, image_url, options, mode):
+        client = AsyncOpenAI(api_key="fake", base_url=server.base_url, max_retries=0)
+        semaphore = asyncio.Semaphore(options["concurrency"])
+
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                await pipeline.arun(client, options["lang"], image_url, MENU, mode=mode)
+                return time.perf_counter() - started
+
+        try:
+            return await asyncio.gather(*(one() for _ in range(options["requests"])))
+        finally:
+            await client.close()
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from myapp.fake_openai import REPLY_SHAPES, FakeOpenAIServer
+
+
+class Command(BaseCommand):
+    help = "Run a local fake OpenAI chat completions server for benchmarks and manual testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--latency", type=float, default=0.5, help="Seconds before each reply.")
+        parser.add_argument("--token-latency", type=float, default=0.0, help="Extra seconds per generated token.")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 500.")
+        parser.add_argument("--quota", type=int, default=0, help="Requests per second before answering 429.")
+        parser.add_argument(
+            "--reply-shape", choices=REPLY_SHAPES, default="json",
+            help="Answer structured nutrition requests with JSON, or with free text.",
+        )
+
+    def handle(self, *args, **options):
+        server = FakeOpenAIServer(
+            host=options["host"],
+            port=options["port"],
+            latency=options["latency"],
+            token_latency=options["token_latency"],
+            error_rate=options["error_rate"],
+            quota=options["quota"],
+            reply_shape=options["reply_shape"],
+        )
+        self.stdout.write(f"Fake OpenAI server on {server.base_url} (set OPENAI_BASE_URL to use it)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
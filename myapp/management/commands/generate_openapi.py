@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp import openapi
+
+
+class Command(BaseCommand):
+    help = "Write the OpenAPI document (swagger.json and swagger.yaml) to OPENAPI_SCHEMA_DIR, to serve it pre-generated."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output-dir", help="Defaults to OPENAPI_SCHEMA_DIR.")
+
+    def handle(self, *args, **options):
+        directory = options["output_dir"] or getattr(settings, "OPENAPI_SCHEMA_DIR", None)
+        if not directory:
+            raise CommandError("Set OPENAPI_SCHEMA_DIR or pass --output-dir")
+        for path in openapi.write(directory):
+            self.stdout.write(f"Wrote {path}")
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ParseError, ValidationError
+
+from myapp import nutrition_kb
+from myapp.parsers import CSVParser
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert or update the local nutrition table from a CSV file with the columns "
+        + ",".join(nutrition_kb.CSV_FIELDS)
+        + " (aliases separated by '|')."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("csv_file", help="e.g. myapp/nutrition_data/dishes.csv")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["csv_file"], "rb") as f:
+                imported = nutrition_kb.import_rows(CSVParser().parse(f))
+        except (OSError, ParseError) as e:
+            raise CommandError(str(e))
+        except ValidationError as e:
+            errors = {index + 2: error for index, error in enumerate(e.detail) if error}
+            raise CommandError(f"Invalid rows (by line number): {errors}")
+        self.stdout.write(f"Imported {imported} nutrition entries")
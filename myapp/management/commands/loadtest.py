@@ -0,0 +1,84 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp import loadtest
+from myapp.benchmarking import format_row
+from myapp.fake_openai import REPLY_SHAPES
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test every API route with the app under WSGI and ASGI servers and a fake OpenAI server; "
+        "writes a JSON report and compares it with a saved baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--servers", default=",".join(loadtest.SERVER_KINDS))
+        parser.add_argument("--routes", default="", help="Comma-separated URL names (default: all).")
+        parser.add_argument("--requests", type=int, default=200, help="Requests per route.")
+        parser.add_argument("--concurrency", type=int, default=10)
+        parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests per route first.")
+        parser.add_argument("--workers", type=int, default=1, help="Server worker processes (gunicorn/uvicorn).")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--latency", type=float, default=0.1, help="Fake OpenAI seconds per reply.")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Fake OpenAI share of 500 replies.")
+        parser.add_argument("--reply-shape", choices=REPLY_SHAPES, default="json")
+        parser.add_argument("--base-settings", default="root.settings", help="Settings module the servers start from.")
+        parser.add_argument("--without-kb", action="store_true", help="Leave the nutrition table empty.")
+        parser.add_argument("--output", default="loadtest-report.json")
+        parser.add_argument("--baseline", help="Report to compare against; exits with an error on regressions.")
+        parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative change (0.2 = 20%%).")
+        parser.add_argument("--save-baseline", help="Also write the report here, as the next baseline.")
+
+    def handle(self, *args, **options):
+        servers = [kind for kind in options["servers"].split(",") if kind]
+        unknown = set(servers) - set(loadtest.SERVER_KINDS)
+        if unknown:
+            raise CommandError(f"Unknown server kinds: {', '.join(sorted(unknown))}")
+        routes = [name for name in options["routes"].split(",") if name]
+        unknown = set(routes) - {route.name for route in loadtest.ROUTES}
+        if unknown:
+            raise CommandError(f"Unknown routes: {', '.join(sorted(unknown))}")
+        for name in loadtest.unrouted():
+            self.stderr.write(f"warning: no load-test scenario for URL name {name!r}")
+
+        report = loadtest.run(
+            {
+                "servers": servers,
+                "routes": routes,
+                "requests": options["requests"],
+                "concurrency": options["concurrency"],
+                "warmup": options["warmup"],
+                "workers": options["workers"],
+                "seed": options["seed"],
+                "latency": options["latency"],
+                "error_rate": options["error_rate"],
+                "reply_shape": options["reply_shape"],
+                "base_settings": options["base_settings"],
+                "with_kb": not options["without_kb"],
+            },
+            progress=self.progress,
+            announce=lambda kind, runner: self.stdout.write(f"{kind}: {runner or 'skipped (no server installed)'}"),
+        )
+
+        loadtest.save(report, options["output"])
+        self.stdout.write(f"report written to {options['output']}")
+        if options["save_baseline"]:
+            loadtest.save(report, options["save_baseline"])
+            self.stdout.write(f"baseline saved to {options['save_baseline']}")
+
+        if options["baseline"]:
+            skipped = [kind for kind, result in report["servers"].items() if "skipped" in result]
+            if skipped:
+                raise CommandError(f"Cannot compare {', '.join(skipped)} against the baseline: no server installed")
+            regressions = loadtest.compare(report, loadtest.load(options["baseline"]), options["tolerance"])
+            for kind, route, metric, before, after in regressions:
+                self.stdout.write(f"REGRESSION {kind} {route} {metric}: {before} -> {after}")
+            if regressions:
+                raise CommandError(f"{len(regressions)} regression(s) against {options['baseline']}")
+            self.stdout.write(f"no regressions against {options['baseline']} (tolerance {options['tolerance']:.0%})")
+
+    def progress(self, route, stats):
+        self.stdout.write(
+            f"  {format_row(route, stats)} rps={stats['rps']:>8.1f} errors={stats['errors']} "
+            f"rss={stats['peak_rss_mb']}MB"
+        )
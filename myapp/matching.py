@@ -0,0 +1,205 @@
+"""
+Match the dishes the model detected against the submitted menu.
+
+Names on both sides are reduced to a canonical key first: Unicode NFKC and
+case folding, list markers, markdown and ``(notes)`` removed, common
+Gujarati spelling variants folded together (nukta, chandrabindu, long/short
+i and u), English plurals singularized and synonyms mapped to one spelling
+(``chapati``/``phulka``/``રોટલી`` -> ``roti``).  Word order is ignored.
+
+``MenuIndex`` is built once per menu (and kept in a small LRU) with a key
+table, a word index and a character-trigram index, so each detected item is
+a few dictionary lookups rather than a comparison against every menu item:
+
+1. the same canonical key;
+2. otherwise the most specific menu item whose words all appear in the
+   detected name (menu ``rice`` matches ``steamed basmati rice``);
+3. otherwise the menu item with the most similar trigrams, if its Dice
+   score reaches ``FUZZY_THRESHOLD`` (spelling slips such as ``bhindi`` /
+   ``bhinda``).
+"""
+import re
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+
+from django.conf import settings
+
+DEFAULTS = {
+    "FUZZY_THRESHOLD": 0.7,
+}
+
+# Folded before anything else: zero-width joiners, the nukta, chandrabindu to
+# anusvara, long vowels to short ones, Gujarati digits to ASCII.
+GUJARATI_FOLD = str.maketrans({
+    "\u200c": None, "\u200d": None, "\ufeff": None,
+    "\u0abc": None,
+    "\u0a81": "\u0a82",
+    "\u0ac0": "\u0abf", "\u0ac2": "\u0ac1",
+    "\u0a88": "\u0a87", "\u0a8a": "\u0a89",
+    **{chr(0x0ae6 + digit): str(digit) for digit in range(10)},
+})
+
+LIST_MARKER = re.compile(r"^\s*(?:[-*•]+|\d+\s*[.)])\s*")
+NOTES = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+SEPARATORS = re.compile(r"[^\w\u0a80-\u0aff]+|_")
+
+STOPWORDS = frozenset({
+    "a", "an", "the", "of", "with", "and", "some", "plate", "bowl", "cup", "glass", "piece", "serving",
+    "side", "portion",
+})
+
+# Alternative spellings and names, keyed by their folded form.
+SYNONYMS = {
+    "roti": ("chapati", "chapatti", "chapathi", "phulka", "fulka", "rotli", "રોટલી", "રોટી", "ચપાતી", "ફુલકા"),
+    "dal": ("daal", "dhal", "dahl", "lentil", "દાળ", "દાલ"),
+    "rice": ("chawal", "chaval", "bhaat", "bhat", "ભાત", "ચોખા"),
+    "sabzi": ("sabji", "subzi", "subji", "sabjee", "shaak", "shak", "શાક", "સબ્જી", "સબજી"),
+    "curd": ("dahi", "yogurt", "yoghurt", "દહીં"),
+    "buttermilk": ("chaas", "chhas", "chhash", "chaach", "છાશ"),
+    "khichdi": ("khichadi", "khichri", "khichari", "ખીચડી", "ખિચડી"),
+    "kadhi": ("kadi", "kadhee", "કઢી"),
+    "papad": ("papadum", "poppadom", "papadam", "પાપડ"),
+    "salad": ("kachumber", "kachumbar", "સલાડ"),
+    "potato": ("aloo", "alu", "બટાકા", "બટેટા"),
+    "thepla": ("થેપલા",),
+    "puri": ("poori", "પૂરી", "પુરી"),
+    "sambar": ("sambhar", "સાંભાર"),
+}
+
+# Whole phrases that name a single menu item.
+PHRASES = {
+    "mixed vegetable": "sabzi",
+    "mix vegetable": "sabzi",
+    "vegetable curry": "sabzi",
+    "lentil soup": "dal",
+}
+
+
+def _fold(text):
+    return unicodedata.normalize("NFKC", text).casefold().translate(GUJARATI_FOLD)
+
+
+SYNONYM_OF = {_fold(alias): canonical for canonical, aliases in SYNONYMS.items() for alias in aliases}
+PHRASE_OF = {_fold(phrase): canonical for phrase, canonical in PHRASES.items()}
+
+
+def options():
+    return {**DEFAULTS, **getattr(settings, "VERIFY_MENU_MATCH", {})}
+
+
+def singular(token):
+    """Strip a regular English plural; other scripts are left alone."""
+    if not token.isascii() or len(token) <= 3:
+        return token
+    if token.endswith("ies"):
+        return token[:-3] + "y"
+    if token.endswith(("oes", "ches", "shes", "sses", "xes")):
+        return token[:-2]
+    if token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def canonical_token(token):
+    if token in SYNONYM_OF:
+        return SYNONYM_OF[token]
+    token = singular(token)
+    return SYNONYM_OF.get(token, token)
+
+
+def tokens(name):
+    """Canonical words of a dish name."""
+    text = _fold(LIST_MARKER.sub("", name))
+    text = " ".join(SEPARATORS.sub(" ", NOTES.sub(" ", text)).split())
+    for phrase, canonical in PHRASE_OF.items():
+        if phrase in text:
+            text = re.sub(rf"\b{re.escape(phrase)}\b", canonical, text)
+    return tuple(canonical_token(word) for word in text.split() if word not in STOPWORDS)
+
+
+def canonical_key(name):
+    return " ".join(sorted(set(tokens(name))))
+
+
+def trigrams(key):
+    padded = f" {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class MenuIndex:
+    """Lookup tables for one menu; see the module docstring for the match order."""
+
+    def __init__(self, menu_list, threshold=DEFAULTS["FUZZY_THRESHOLD"]):
+        self.menu_list = list(menu_list)
+        self.threshold = threshold
+        self.by_key = {}
+        self.by_word = {}
+        self.by_trigram = {}
+        self.keys = []
+        self.words = []
+        self.grams = []
+        for position, item in enumerate(self.menu_list):
+            key = canonical_key(item)
+            words = frozenset(key.split())
+            grams = trigrams(key)
+            self.keys.append(key)
+            self.words.append(words)
+            self.grams.append(grams)
+            if not key:
+                continue
+            self.by_key.setdefault(key, []).append(position)
+            for word in words:
+                self.by_word.setdefault(word, []).append(position)
+            for gram in grams:
+                self.by_trigram.setdefault(gram, []).append(position)
+
+    def lookup(self, detected):
+        """Menu positions matched by one detected item (all duplicates of the best item)."""
+        key = canonical_key(detected)
+        if not key:
+            return []
+        if key in self.by_key:
+            return self.by_key[key]
+
+        words = set(key.split())
+        candidates = {position for word in words for position in self.by_word.get(word, ())}
+        covered = [position for position in candidates if self.words[position] <= words]
+        if covered:
+            best = max(covered, key=lambda position: (len(self.words[position]), -position))
+            return self.by_key[self.keys[best]]
+
+        grams = trigrams(key)
+        shared = Counter(position for gram in grams for position in self.by_trigram.get(gram, ()))
+        best, score = None, 0.0
+        for position, common in shared.items():
+            dice = 2 * common / (len(grams) + len(self.grams[position]))
+            if dice > score:
+                best, score = position, dice
+        if best is None or score < self.threshold:
+            return []
+        return self.by_key[self.keys[best]]
+
+    def match(self, detected_items):
+        """``(found_items, missing_items)`` in menu order."""
+        found = set()
+        for detected in detected_items:
+            found.update(self.lookup(detected))
+        return (
+            [item for position, item in enumerate(self.menu_list) if position in found],
+            [item for position, item in enumerate(self.menu_list) if position not in found],
+        )
+
+
+@lru_cache(maxsize=256)
+def _cached_index(menu, threshold):
+    return MenuIndex(menu, threshold)
+
+
+def index_for(menu_list):
+    """The (cached) ``MenuIndex`` for a menu."""
+    return _cached_index(tuple(menu_list), options()["FUZZY_THRESHOLD"])
+
+
+def match_menu(menu_list, detected_items):
+    return index_for(menu_list).match(detected_items)
@@ -0,0 +1,176 @@
+"""
+In-process request metrics: stage timers, latency histograms, token counts.
+
+``ServerTimingMiddleware`` opens a timing record for each request;
+``stage("name")`` blocks inside views and the pipeline add to it.  When the
+response leaves, the stages go out as a ``Server-Timing`` header and into
+per-endpoint histograms.  Stages timed outside a request (the job worker,
+benchmarks) land in the histograms under the endpoint ``-``.
+
+``/metrics`` renders everything in the Prometheus text format, together
+with the cache, nutrition table and OpenAI client counters.  The hot path
+is a ``perf_counter`` call per stage and one lock per histogram update;
+values are per process, so scrape each worker (or sum them).
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Seconds; verify-menu spans milliseconds (cache hits) to tens of seconds (GPT calls).
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_timings = ContextVar("timings", default=None)
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def observe(name, labels, value):
+    key = (name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.observe(value)
+
+
+def increment(name, labels, amount=1):
+    key = (name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def start_request():
+    """Begin collecting stages for the current request; returns the token for ``end_request``."""
+    return _timings.set([])
+
+
+def end_request(token):
+    timings = _timings.get()
+    _timings.reset(token)
+    return timings or []
+
+
+@contextmanager
+def stage(name):
+    """Time the block as ``name`` for the current request (or directly into the histograms)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        timings = _timings.get()
+        if timings is None:
+            observe("stage_duration_seconds", (("endpoint", "-"), ("stage", name)), elapsed)
+        else:
+            timings.append((name, elapsed))
+
+
+def record_usage(call, response):
+    """Count the prompt and completion tokens an OpenAI response reports."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    increment("openai_tokens_total", (("call", call), ("kind", "prompt")), usage.prompt_tokens or 0)
+    increment("openai_tokens_total", (("call", call), ("kind", "completion")), usage.completion_tokens or 0)
+
+
+def record_request(endpoint, method, status_code, total, timings):
+    """Fold a finished request into the histograms; returns its ``Server-Timing`` value."""
+    stages = {}
+    for name, elapsed in timings:
+        stages[name] = stages.get(name, 0.0) + elapsed
+
+    observe("http_request_duration_seconds", (("endpoint", endpoint), ("method", method)), total)
+    increment("http_requests_total", (("endpoint", endpoint), ("method", method), ("status", str(status_code))))
+    for name, elapsed in stages.items():
+        observe("stage_duration_seconds", (("endpoint", endpoint), ("stage", name)), elapsed)
+
+    parts = [f"{name};dur={elapsed * 1000:.1f}" for name, elapsed in stages.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def _labels(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join('%s="%s"' % (key, str(value).replace("\\", "\\\\").replace('"', '\\"')) for key, value in pairs) + "}"
+
+
+def _gauges():
+    """Counters kept by other modules, as ``(name, labels, value)``."""
+    from . import admission, llm, nutrition_kb, teacher_cache, translations
+    from .result_cache import result_cache
+
+    for key, value in result_cache.stats().items():
+        yield "verify_menu_cache", (("stat", key),), value
+    for key, value in teacher_cache.stats().items():
+        yield "teacher_cache", (("stat", key),), value
+    for key, value in admission.stats().items():
+        yield "verify_menu_admission", (("stat", key),), value
+    for key, value in nutrition_kb.stats().items():
+        yield "nutrition_kb", (("stat", key),), value
+    for key, value in translations.stats().items():
+        yield "verify_menu_translations", (("stat", key),), value
+    for key, value in llm.stats().items():
+        if key == "breaker":
+            for state in ("closed", "open", "half_open"):
+                yield "openai_breaker_state", (("state", state),), int(value == state)
+        else:
+            yield "openai_client", (("stat", key),), value
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    with _lock:
+        histograms = {key: (list(h.counts), h.sum, h.count) for key, h in _histograms.items()}
+        counters = dict(_counters)
+
+    lines = []
+    for name in sorted({name for name, _ in histograms}):
+        lines.append(f"# TYPE {name} histogram")
+        for (metric, labels), (counts, total, count) in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, bucket_count in zip((*BUCKETS, "+Inf"), counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_labels(labels, [('le', bound)])} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f"# TYPE {name} counter")
+        lines.extend(
+            f"{name}{_labels(labels)} {value}"
+            for (metric, labels), value in sorted(counters.items()) if metric == name
+        )
+
+    gauges = list(_gauges())
+    for name in sorted({name for name, _, _ in gauges}):
+        lines.append(f"# TYPE {name} gauge")
+        lines.extend(f"{name}{_labels(labels)} {value}" for metric, labels, value in gauges if metric == name)
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
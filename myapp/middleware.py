@@ -0,0 +1,116 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from . import metrics
+
+
+class ServerTimingMiddleware:
+    """
+    Time each request, add a ``Server-Timing`` header with the stages the
+    view recorded (``metrics.stage``) and feed the ``/metrics`` histograms.
+    Works under both WSGI and ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = metrics.start_request()
+        started = time.perf_counter()
+        response = self.get_response(request)
+        return self.finish(request, response, token, started)
+
+    async def __acall__(self, request):
+        token = metrics.start_request()
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        return self.finish(request, response, token, started)
+
+    def finish(self, request, response, token, started):
+        total = time.perf_counter() - started
+        match = request.resolver_match
+        endpoint = (match.url_name or match.route) if match else "unmatched"
+        response["Server-Timing"] = metrics.record_request(
+            endpoint, request.method, response.status_code, total, metrics.end_request(token),
+        )
+        return response
+
+
+class BrowserMiddleware:
+    """
+    Run the ``BROWSER_MIDDLEWARE`` stack (sessions, CSRF, auth, messages,
+    clickjacking) for every path except those under ``API_PATH_PREFIXES``.
+
+    The JSON API uses none of it, so API requests go straight to the view
+    while ``/admin/`` and the schema pages keep the full stack.  Django only
+    calls ``process_view``, ``process_exception`` and
+    ``process_template_response`` on middleware listed in ``MIDDLEWARE``, so
+    this class collects those hooks from the stack (in the order
+    ``BaseHandler.load_middleware`` would) and runs them itself -- without
+    that, ``CsrfViewMiddleware`` would never check a token.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefixes = tuple(settings.API_PATH_PREFIXES)
+        self.view_hooks = []
+        self.template_response_hooks = []
+        self.exception_hooks = []
+        handler = get_response
+        for path in reversed(settings.BROWSER_MIDDLEWARE):
+            handler = import_string(path)(handler)
+            if hasattr(handler, "process_view"):
+                self.view_hooks.insert(0, handler.process_view)
+            if hasattr(handler, "process_template_response"):
+                self.template_response_hooks.append(handler.process_template_response)
+            if hasattr(handler, "process_exception"):
+                self.exception_hooks.append(handler.process_exception)
+        self.browser = handler
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def is_api(self, request):
+        return request.path_info.startswith(self.prefixes)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return (self.get_response if self.is_api(request) else self.browser)(request)
+
+    async def __acall__(self, request):
+        return await (self.get_response if self.is_api(request) else self.browser)(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.is_api(request):
+            return None
+        for hook in self.view_hooks:
+            response = hook(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+    def process_template_response(self, request, response):
+        if not self.is_api(request):
+            for hook in self.template_response_hooks:
+                response = hook(request, response)
+        return response
+
+    def process_exception(self, request, exception):
+        if self.is_api(request):
+            return None
+        for hook in self.exception_hooks:
+            response = hook(request, exception)
+            if response is not None:
+                return response
+        return None
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0002_verifyjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SurveyAnswerCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('school', models.CharField(max_length=64)),
+                ('date', models.DateField()),
+                ('question_id', models.CharField(max_length=16)),
+                ('option', models.PositiveSmallIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SurveyResponse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('school', models.CharField(max_length=64)),
+                ('date', models.DateField()),
+                ('lang', models.CharField(max_length=2)),
+                ('answers', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['school', 'date'], name='surveyresponse_school_date')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='surveyanswercount',
+            constraint=models.UniqueConstraint(fields=('school', 'date', 'question_id', 'option'), name='surveyanswercount_unique'),
+        ),
+    ]
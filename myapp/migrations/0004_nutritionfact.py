@@ -0,0 +1,27 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0003_surveyresponse'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NutritionFact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name_en', models.CharField(max_length=100, unique=True)),
+                ('name_gu', models.CharField(blank=True, default='', max_length=100)),
+                ('aliases', models.TextField(blank=True, default='')),
+                ('calories', models.FloatField()),
+                ('protein', models.FloatField()),
+                ('fat', models.FloatField()),
+                ('carbs', models.FloatField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Full-text index over teacher names for myapp.teacher_search.
+
+import sqlite3
+
+from django.db import migrations
+
+TABLE = 'myapp_teacher'
+INDEX = 'myapp_teacher_fts'
+
+# External-content FTS5 table: the index stores trigrams only and reads the
+# names from myapp_teacher. The triggers keep it in step with every write,
+# bulk_create and raw SQL included.
+CREATE = [
+    f"CREATE VIRTUAL TABLE {INDEX} USING fts5("
+    f"username_en, username_gu, content='{TABLE}', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER {INDEX}_insert AFTER INSERT ON {TABLE} BEGIN "
+    f"INSERT INTO {INDEX}(rowid, username_en, username_gu) VALUES (new.id, new.username_en, new.username_gu); END",
+    f"CREATE TRIGGER {INDEX}_delete AFTER DELETE ON {TABLE} BEGIN "
+    f"INSERT INTO {INDEX}({INDEX}, rowid, username_en, username_gu) "
+    f"VALUES ('delete', old.id, old.username_en, old.username_gu); END",
+    f"CREATE TRIGGER {INDEX}_update AFTER UPDATE ON {TABLE} BEGIN "
+    f"INSERT INTO {INDEX}({INDEX}, rowid, username_en, username_gu) "
+    f"VALUES ('delete', old.id, old.username_en, old.username_gu); "
+    f"INSERT INTO {INDEX}(rowid, username_en, username_gu) VALUES (new.id, new.username_en, new.username_gu); END",
+    f"INSERT INTO {INDEX}({INDEX}) VALUES ('rebuild')",
+]
+
+DROP = [
+    f"DROP TRIGGER IF EXISTS {INDEX}_insert",
+    f"DROP TRIGGER IF EXISTS {INDEX}_delete",
+    f"DROP TRIGGER IF EXISTS {INDEX}_update",
+    f"DROP TABLE IF EXISTS {INDEX}",
+]
+
+
+def supported(schema_editor):
+    # The trigram tokenizer needs SQLite 3.34; elsewhere search falls back to icontains.
+    return schema_editor.connection.vendor == 'sqlite' and sqlite3.sqlite_version_info >= (3, 34)
+
+
+def create_index(apps, schema_editor):
+    if supported(schema_editor):
+        for statement in CREATE:
+            schema_editor.execute(statement)
+
+
+def drop_index(apps, schema_editor):
+    if supported(schema_editor):
+        for statement in DROP:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0004_nutritionfact'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
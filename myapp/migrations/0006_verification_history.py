@@ -0,0 +1,88 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0005_teacher_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MissingItemCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('school', models.CharField(max_length=64)),
+                ('date', models.DateField()),
+                ('item', models.CharField(max_length=100)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Verification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('school', models.CharField(blank=True, default='', max_length=64)),
+                ('date', models.DateField()),
+                ('lang', models.CharField(max_length=2)),
+                ('menu', models.JSONField(default=list)),
+                ('detected_items', models.JSONField(default=list)),
+                ('found_items', models.JSONField(default=list)),
+                ('missing_items', models.JSONField(default=list)),
+                ('nutritions', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='verifyjob',
+            name='school',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='verifyjob',
+            name='teacher_id',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='VerificationDailyCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('school', models.CharField(max_length=64)),
+                ('date', models.DateField()),
+                ('verifications', models.PositiveIntegerField(default=0)),
+                ('menu_items', models.PositiveIntegerField(default=0)),
+                ('missing_items', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date'], name='verificationdailycount_date')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='verificationdailycount',
+            constraint=models.UniqueConstraint(fields=('school', 'date'), name='verificationdailycount_unique'),
+        ),
+        migrations.AddField(
+            model_name='verification',
+            name='teacher',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='myapp.teacher'),
+        ),
+        migrations.AddIndex(
+            model_name='missingitemcount',
+            index=models.Index(fields=['item', 'date', 'count'], name='missingitemcount_item_date'),
+        ),
+        migrations.AddConstraint(
+            model_name='missingitemcount',
+            constraint=models.UniqueConstraint(fields=('school', 'date', 'item'), name='missingitemcount_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='verification',
+            index=models.Index(fields=['school', 'date'], name='verification_school_date'),
+        ),
+        migrations.AddIndex(
+            model_name='verification',
+            index=models.Index(fields=['date'], name='verification_date'),
+        ),
+    ]
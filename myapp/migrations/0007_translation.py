@@ -0,0 +1,29 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0006_verification_history'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Translation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('dish', 'Dish'), ('label', 'Label')], default='dish', max_length=5)),
+                ('lang', models.CharField(default='gu', max_length=2)),
+                ('name_en', models.CharField(max_length=100)),
+                ('name', models.CharField(max_length=100)),
+                ('source', models.CharField(choices=[('admin', 'Admin'), ('model', 'Model')], default='admin', max_length=5)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='translation',
+            constraint=models.UniqueConstraint(fields=('kind', 'lang', 'name_en'), name='translation_unique'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.apps.registry import Apps
+from django.db import migrations, models
+
+# The verify_menu DatabaseCache (CACHES['verify_menu']['LOCATION']). The
+# layout is the one createcachetable builds, fixed here so the migration does
+# not depend on whatever CACHES the current settings define.
+TABLE = 'verify_menu_cache'
+
+
+def cache_model():
+    return type('VerifyMenuCacheEntry', (models.Model,), {
+        '__module__': __name__,
+        # "key" is a reserved word in MySQL, hence cache_key (as in Django).
+        'cache_key': models.CharField(max_length=255, primary_key=True),
+        'value': models.TextField(),
+        'expires': models.DateTimeField(db_index=True),
+        'Meta': type('Meta', (), {'app_label': 'myapp', 'db_table': TABLE, 'apps': Apps()}),
+    })
+
+
+def create_cache_tables(apps, schema_editor):
+    # Databases where createcachetable was run by hand already have it.
+    if TABLE not in schema_editor.connection.introspection.table_names():
+        schema_editor.create_model(cache_model())
+
+
+def drop_cache_tables(apps, schema_editor):
+    if TABLE in schema_editor.connection.introspection.table_names():
+        schema_editor.delete_model(cache_model())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0007_translation'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_tables, drop_cache_tables),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0008_create_cache_tables'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='verifyjob',
+            name='not_before',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
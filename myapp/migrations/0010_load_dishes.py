@@ -0,0 +1,58 @@
+from django.db import migrations
+
+# myapp/nutrition_data/dishes.csv as it was when the table first shipped,
+# frozen here so replaying the migration always loads the same rows. Later
+# edits to the file reach the table through `manage.py import_nutrition`.
+FIELDS = ("name_en", "name_gu", "aliases", "calories", "protein", "fat", "carbs")
+DISHES = [
+    ('rice', 'ભાત', 'steamed rice|plain rice|white rice', 200, 4, 0.5, 45),
+    ('jeera rice', 'જીરા ભાત', 'cumin rice', 240, 4.5, 5, 44),
+    ('dal', 'દાળ', 'toor dal|yellow dal|dal tadka', 150, 9, 3, 20),
+    ('dal fry', 'દાળ ફ્રાય', '', 180, 9, 6, 21),
+    ('moong dal', 'મગની દાળ', '', 140, 9, 2.5, 20),
+    ('roti', 'રોટલી', 'chapati|phulka', 120, 3, 3.5, 18),
+    ('puri', 'પૂરી', '', 140, 2, 8, 15),
+    ('thepla', 'થેપલા', 'methi thepla', 140, 3.5, 5, 20),
+    ('bhakri', 'ભાખરી', '', 150, 3.5, 5, 23),
+    ('sabzi', 'શાક', 'mixed vegetable', 90, 2, 5, 10),
+    ('potato sabzi', 'બટાકાનું શાક', 'aloo sabzi', 150, 2.5, 6, 22),
+    ('aloo gobi', 'આલુ ગોબી', '', 130, 3, 7, 15),
+    ('bhindi masala', 'ભીંડાનું શાક', 'bhindi sabzi', 110, 2.5, 7, 10),
+    ('chole', 'છોલે', 'chana masala', 210, 9, 7, 28),
+    ('rajma', 'રાજમા', '', 200, 9, 5, 30),
+    ('kadhi', 'કઢી', 'gujarati kadhi', 120, 4, 6, 12),
+    ('khichdi', 'ખીચડી', '', 250, 8, 6, 40),
+    ('upma', 'ઉપમા', '', 200, 5, 7, 30),
+    ('poha', 'પૌંઆ', 'kanda poha', 180, 3.5, 6, 29),
+    ('idli', 'ઈડલી', '', 60, 2, 0.4, 12),
+    ('sambar', 'સાંભાર', '', 130, 6, 4, 18),
+    ('dhokla', 'ઢોકળા', 'khaman', 160, 6, 5, 22),
+    ('curd', 'દહીં', '', 60, 3.5, 3, 4.5),
+    ('buttermilk', 'છાશ', '', 40, 2, 1, 5),
+    ('papad', 'પાપડ', '', 35, 2, 0.3, 6),
+    ('salad', 'સલાડ', 'kachumber', 30, 1, 0.2, 6),
+    ('pickle', 'અથાણું', '', 30, 0.3, 2.5, 2),
+    ('banana', 'કેળું', '', 105, 1.3, 0.4, 27),
+    ('sukhdi', 'સુખડી', '', 200, 3, 9, 27),
+    ('halwa', 'શીરો', 'sheera|sooji halwa', 220, 3, 9, 32),
+]
+
+
+def load_dishes(apps, schema_editor):
+    # Ship the nutrition table filled; rows already present (edited in the
+    # admin or imported) are left alone.
+    NutritionFact = apps.get_model("myapp", "NutritionFact")
+    for row in DISHES:
+        values = dict(zip(FIELDS, row))
+        NutritionFact.objects.get_or_create(name_en=values.pop("name_en"), defaults=values)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0009_verifyjob_not_before'),
+    ]
+
+    operations = [
+        migrations.RunPython(load_dishes, migrations.RunPython.noop),
+    ]
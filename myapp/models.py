@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 
 class Teacher(models.Model):
@@ -6,3 +8,205 @@ class Teacher(models.Model):
 
     def __str__(self):
         return self.username_en
+
+
+class NutritionFact(models.Model):
+    """
+    Per-serving nutrition for a dish, used instead of asking the model.
+    ``aliases`` holds other spellings separated by ``|``.
+    """
+
+    name_en = models.CharField(max_length=100, unique=True)
+    name_gu = models.CharField(max_length=100, blank=True, default="")
+    aliases = models.TextField(blank=True, default="")
+    calories = models.FloatField()
+    protein = models.FloatField()
+    fat = models.FloatField()
+    carbs = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name_en
+
+
+class Translation(models.Model):
+    """
+    A dish name or label in another language, for rendering verify-menu
+    results (``myapp.translations``).  Rows with ``source`` "model" were
+    translated by the model; correct them here and they become "admin".
+    """
+
+    DISH = "dish"
+    LABEL = "label"
+    KIND_CHOICES = [
+        (DISH, "Dish"),
+        (LABEL, "Label"),
+    ]
+
+    ADMIN = "admin"
+    MODEL = "model"
+    SOURCE_CHOICES = [
+        (ADMIN, "Admin"),
+        (MODEL, "Model"),
+    ]
+
+    kind = models.CharField(max_length=5, choices=KIND_CHOICES, default=DISH)
+    lang = models.CharField(max_length=2, default="gu")
+    name_en = models.CharField(max_length=100)
+    name = models.CharField(max_length=100)
+    source = models.CharField(max_length=5, choices=SOURCE_CHOICES, default=ADMIN)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "lang", "name_en"], name="translation_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.name_en} ({self.lang}): {self.name}"
+
+
+class VerifyJob(models.Model):
+    """A queued verify-menu request, picked up by ``manage.py verify_menu_worker``."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    lang = models.CharField(max_length=2)
+    menu = models.JSONField(default=list)
+    image = models.BinaryField(blank=True, default=b"")
+    content_type = models.CharField(max_length=20)
+    digest = models.CharField(max_length=64)
+    school = models.CharField(max_length=64, blank=True, default="")
+    teacher_id = models.BigIntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # A retried job is not claimed again before this time.
+    not_before = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="verifyjob_status_created"),
+        ]
+
+    def __str__(self):
+        return f"{self.id} ({self.status})"
+
+
+class SurveyResponse(models.Model):
+    """One submitted survey; ``answers`` maps question id to the chosen option index."""
+
+    school = models.CharField(max_length=64)
+    date = models.DateField()
+    lang = models.CharField(max_length=2)
+    answers = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["school", "date"], name="surveyresponse_school_date"),
+        ]
+
+
+class SurveyAnswerCount(models.Model):
+    """
+    How often ``option`` was chosen for ``question_id`` at a school on a day.
+
+    Kept up to date as responses arrive, so summaries never scan
+    ``SurveyResponse``.
+    """
+
+    school = models.CharField(max_length=64)
+    date = models.DateField()
+    question_id = models.CharField(max_length=16)
+    option = models.PositiveSmallIntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["school", "date", "question_id", "option"], name="surveyanswercount_unique",
+            ),
+        ]
+
+
+class Verification(models.Model):
+    """
+    One verified plate: what was on the menu, what was found, what was
+    missing, and the nutrition reported.  Written in batches by
+    ``myapp.history``, off the request path.
+    """
+
+    school = models.CharField(max_length=64, blank=True, default="")
+    teacher = models.ForeignKey(
+        Teacher, null=True, blank=True, on_delete=models.SET_NULL, db_constraint=False, related_name="+",
+    )
+    date = models.DateField()
+    lang = models.CharField(max_length=2)
+    menu = models.JSONField(default=list)
+    detected_items = models.JSONField(default=list)
+    found_items = models.JSONField(default=list)
+    missing_items = models.JSONField(default=list)
+    nutritions = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["school", "date"], name="verification_school_date"),
+            models.Index(fields=["date"], name="verification_date"),
+        ]
+
+
+class VerificationDailyCount(models.Model):
+    """
+    Verifications, menu items and missing items for a school on a day.
+
+    Kept up to date as verifications are written, so reports aggregate
+    one row per school and day instead of scanning ``Verification``.
+    """
+
+    school = models.CharField(max_length=64)
+    date = models.DateField()
+    verifications = models.PositiveIntegerField(default=0)
+    menu_items = models.PositiveIntegerField(default=0)
+    missing_items = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["school", "date"], name="verificationdailycount_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["date"], name="verificationdailycount_date"),
+        ]
+
+
+class MissingItemCount(models.Model):
+    """How often menu ``item`` was missing from the plate at a school on a day."""
+
+    school = models.CharField(max_length=64)
+    date = models.DateField()
+    item = models.CharField(max_length=100)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["school", "date", "item"], name="missingitemcount_unique"),
+        ]
+        # Covers the per-item report: grouped by item, no table lookups.
+        indexes = [
+            models.Index(fields=["item", "date", "count"], name="missingitemcount_item_date"),
+        ]
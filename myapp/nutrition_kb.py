@@ -0,0 +1,151 @@
+"""
+Local nutrition table for dishes that school menus repeat every week.
+
+``NutritionFact`` rows (English and Gujarati names plus aliases, per-serving
+calories, protein, fat and carbs) are loaded into an in-memory dict keyed by
+the menu matcher's canonical key, so ``rotli``, ``Chapatis`` and ``રોટલી``
+all hit the same entry.  The pipeline asks the model only about detected
+items the table does not know; when it knows all of them the nutrition call
+is skipped entirely.
+
+Lookups never touch the database.  ``refresh()`` (``arefresh()`` from async
+code) reloads the table when it was changed in this process or is older than
+``RELOAD_INTERVAL`` seconds -- call it before a request is processed.
+"""
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+from .matching import canonical_key
+
+DEFAULTS = {
+    "KB_ENABLED": True,
+    "RELOAD_INTERVAL": 300,
+}
+
+UNITS = {"calories": "kcal", "protein": "g", "fat": "g", "carbs": "g"}
+CSV_FIELDS = ["name_en", "name_gu", "aliases", "calories", "protein", "fat", "carbs"]
+
+_lock = threading.Lock()
+_index = {}
+_loaded_at = None
+counters = {"hits": 0, "misses": 0, "skipped_calls": 0}
+
+
+def options():
+    return {**DEFAULTS, **getattr(settings, "VERIFY_MENU_NUTRITION", {})}
+
+
+def values_of(fact):
+    return {key: f"{getattr(fact, key):g} {unit}" for key, unit in UNITS.items()}
+
+
+def names_of(fact):
+    aliases = [alias.strip() for alias in fact.aliases.split("|")]
+    return [name for name in (fact.name_en, fact.name_gu, *aliases) if name]
+
+
+def load():
+    """Rebuild the in-memory index from the database."""
+    from .models import NutritionFact
+
+    index = {}
+    for fact in NutritionFact.objects.all():
+        values = values_of(fact)
+        for name in names_of(fact):
+            key = canonical_key(name)
+            if key:
+                index.setdefault(key, values)
+
+    global _index, _loaded_at
+    with _lock:
+        _index, _loaded_at = index, time.monotonic()
+    return index
+
+
+def invalidate():
+    global _loaded_at
+    with _lock:
+        _loaded_at = None
+
+
+def stale():
+    return _loaded_at is None or time.monotonic() - _loaded_at > options()["RELOAD_INTERVAL"]
+
+
+def refresh():
+    if options()["KB_ENABLED"] and stale():
+        load()
+
+
+async def arefresh():
+    if options()["KB_ENABLED"] and stale():
+        await sync_to_async(load)()
+
+
+def active():
+    """Whether the pipeline should consult the table (enabled and not empty)."""
+    return options()["KB_ENABLED"] and bool(_index)
+
+
+def unknown(items):
+    """Detected items the table has no entry for."""
+    if not active():
+        return list(items)
+    return [item for item in items if canonical_key(item) not in _index]
+
+
+def resolve(items):
+    """``(known, misses)``: table values for each known item and the count of unknown ones; updates the counters."""
+    if not active():
+        return {}, len(items)
+    known = {}
+    for item in items:
+        values = _index.get(canonical_key(item))
+        if values is not None:
+            known[item] = values
+    misses = len(items) - len(known)
+    with _lock:
+        counters["hits"] += len(known)
+        counters["misses"] += misses
+        counters["skipped_calls"] += bool(items) and not misses
+    return known, misses
+
+
+def stats():
+    with _lock:
+        snapshot = dict(counters)
+    lookups = snapshot["hits"] + snapshot["misses"]
+    snapshot["hit_rate"] = round(snapshot["hits"] / lookups, 4) if lookups else 0.0
+    snapshot["entries"] = len(_index)
+    return snapshot
+
+
+def import_rows(rows):
+    """
+    Insert or update ``NutritionFact`` rows (dicts with ``CSV_FIELDS``),
+    matched on ``name_en``.  Raises ``rest_framework.exceptions.ValidationError``
+    with per-row errors before anything is written.
+    """
+    from .models import NutritionFact
+    from .serializers import NutritionFactSerializer
+
+    serializer = NutritionFactSerializer(data=list(rows), many=True)
+    serializer.is_valid(raise_exception=True)
+    with transaction.atomic():
+        NutritionFact.objects.bulk_create(
+            [NutritionFact(**row) for row in serializer.validated_data],
+            update_conflicts=True,
+            unique_fields=["name_en"],
+            update_fields=[field for field in CSV_FIELDS if field != "name_en"],
+            batch_size=500,
+        )
+    # The upsert sends no signals; Gujarati dish names are read from this table too.
+    from . import translations
+
+    invalidate()
+    translations.invalidate()
+    return len(serializer.validated_data)
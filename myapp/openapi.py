@@ -0,0 +1,102 @@
+"""
+The OpenAPI document behind ``/swagger.json/``, ``/swagger.yaml/`` and the
+Swagger UI and ReDoc pages.
+
+drf_yasg builds it by walking every view and serializer; ``root.urls`` used
+to do that on every request (``cache_timeout=0``).  ``document(fmt)`` now
+generates and encodes it once per process, or -- after ``manage.py
+generate_openapi`` wrote it to ``OPENAPI_SCHEMA_DIR`` at deploy time -- reads
+that file instead, and keeps the bytes with an ETag.  A document generated
+without a request has no ``host`` or ``schemes``; Swagger UI and ReDoc then
+use the host the page was loaded from.
+"""
+import hashlib
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+
+INFO = openapi.Info(
+    title="Your API",
+    default_version='v1',
+    description="API documentation",
+    terms_of_service="https://www.yourapp.com/terms/",
+    contact=openapi.Contact(email="contact@yourapp.com"),
+    license=openapi.License(name="Your License"),
+)
+
+CODECS = {"json": OpenAPICodecJson, "yaml": OpenAPICodecYaml}
+
+
+class EncodedDocument:
+    def __init__(self, body, content_type):
+        self.body = body
+        self.content_type = content_type
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+_lock = threading.Lock()
+_documents = {}
+
+
+def generate():
+    """Build the schema from the URL conf (the slow part)."""
+    return OpenAPISchemaGenerator(INFO).get_schema(request=None, public=True)
+
+
+def encode(schema, fmt):
+    codec = CODECS[fmt](validators=[])
+    return codec.encode(schema), codec.media_type
+
+
+def path_for(fmt):
+    directory = getattr(settings, "OPENAPI_SCHEMA_DIR", None)
+    return Path(directory) / f"swagger.{fmt}" if directory else None
+
+
+def write(directory):
+    """Generate the document once and write ``swagger.json`` and ``swagger.yaml``; returns the paths."""
+    schema = generate()
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for fmt in CODECS:
+        path = directory / f"swagger.{fmt}"
+        path.write_bytes(encode(schema, fmt)[0])
+        paths.append(path)
+    return paths
+
+
+def document(fmt):
+    """The encoded document for ``fmt`` (``json`` or ``yaml``): from disk if generated ahead, else built once."""
+    encoded = _documents.get(fmt)
+    if encoded is not None:
+        return encoded
+    with _lock:
+        if fmt not in _documents:
+            path = path_for(fmt)
+            if path is not None and path.is_file():
+                _documents[fmt] = EncodedDocument(path.read_bytes(), CODECS[fmt].media_type)
+            else:
+                schema = generate()
+                for name in CODECS:
+                    _documents[name] = EncodedDocument(*encode(schema, name))
+        return _documents[fmt]
+
+
+def clear():
+    with _lock:
+        _documents.clear()
+
+
+def respond(request, encoded):
+    if encoded.etag in [tag.strip() for tag in request.META.get("HTTP_IF_NONE_MATCH", "").split(",")]:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(encoded.body, content_type=encoded.content_type)
+    response["ETag"] = encoded.etag
+    return response
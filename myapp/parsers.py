@@ -0,0 +1,21 @@
+import csv
+import io
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class CSVParser(BaseParser):
+    """Parse a CSV body with a header row into a list of dicts."""
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        try:
+            text = stream.read().decode('utf-8-sig' if encoding.lower() == 'utf-8' else encoding)
+            return [
+                {key.strip(): (value or '').strip() for key, value in row.items() if key}
+                for row in csv.DictReader(io.StringIO(text))
+            ]
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise ParseError(f'CSV parse error - {exc}')
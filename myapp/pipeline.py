@@ -0,0 +1,410 @@
+"""
+Vision pipeline shared by the verify-menu views.
+
+The food-list and nutrition prompts used to live inline in
+``UploadImage.post``.  They are kept here so the sync view, the async view
+and the benchmarks all send exactly the same requests to the model.
+"""
+import asyncio
+import logging
+import re
+from typing import List
+
+from pydantic import BaseModel, ConfigDict, ValidationError
+
+from . import metrics, nutrition_kb, translations
+from .matching import match_menu
+from .nutrition_kb import UNITS
+
+logger = logging.getLogger(__name__)
+
+MODEL = "gpt-4o"
+
+# Bump whenever a prompt, token limit or parser changes so cached results
+# produced by the old pipeline are no longer served.
+PROMPT_VERSION = f"{MODEL}-v4"
+
+SYSTEM_PROMPT = "You are a food image detection expert. Identify all food items visible in the image."
+NUTRITION_SYSTEM_PROMPT = "You are a nutrition expert for Indian school meals."
+TRANSLATE_SYSTEM_PROMPT = "You translate the names of Indian dishes for school menus."
+
+# Every call runs in English, whatever language the result is rendered in:
+# Gujarati output costs several times the tokens.  See ``myapp.translations``.
+PROMPTS = {
+    "food": "What food items do you see in this image? Just list them.",
+    "nutrition": (
+        "What food items do you see in this image? For each item give its approximate calories (kcal) "
+        "and protein, fat and carbs (grams) as numbers."
+    ),
+    "combined": (
+        "What food items do you see in this image? List them, and for one serving of each give its "
+        "approximate calories (kcal) and protein, fat and carbs (grams) as numbers."
+    ),
+    "nutrition_items": (
+        "For one serving of each food item below, give its approximate calories (kcal) and protein, "
+        "fat and carbs (grams) as numbers. Keep each item name exactly as written."
+    ),
+    "translate": (
+        "Translate each dish name below into {language}, in {language} script, as it would be written "
+        "on a school menu. Keep each name exactly as written."
+    ),
+}
+
+MODES = ("parallel", "combined")
+
+
+class InvalidReply(ValueError):
+    """The model answered, but not in the shape asked for."""
+
+
+class NutritionItem(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    name: str
+    calories: float
+    protein: float
+    fat: float
+    carbs: float
+
+
+class NutritionReply(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    items: List[NutritionItem]
+
+
+# Structured output: the model can only answer with a ``NutritionReply``, as
+# bare numbers instead of a formatted list, which is far fewer output tokens.
+NUTRITION_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "nutrition", "strict": True, "schema": NutritionReply.model_json_schema()},
+}
+
+
+class TranslationItem(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    name: str
+    translation: str
+
+
+class TranslationReply(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    items: List[TranslationItem]
+
+
+class CombinedReply(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    items: List[str]
+    nutrition: List[NutritionItem]
+
+
+COMBINED_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "combined", "strict": True, "schema": CombinedReply.model_json_schema()},
+}
+
+
+TRANSLATION_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "translation", "strict": True, "schema": TranslationReply.model_json_schema()},
+}
+
+
+def build_messages(prompt, image_url):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": prompt},
+                {
+                    "type": "image_url",
+                    "image_url": {
+                        "url": image_url,
+                        "detail": "low"
+                    }
+                }
+            ]
+        }
+    ]
+
+
+def food_request(image_url):
+    return {
+        "model": MODEL,
+        "messages": build_messages(PROMPTS["food"], image_url),
+        "max_tokens": 150,
+        "temperature": 1,
+    }
+
+
+def nutrition_request(image_url):
+    return {
+        "model": MODEL,
+        "messages": build_messages(PROMPTS["nutrition"], image_url),
+        "max_tokens": 300,
+        "response_format": NUTRITION_FORMAT,
+    }
+
+
+def nutrition_items_request(items):
+    """Text-only nutrition request for detected items the local table does not know."""
+    return {
+        "model": MODEL,
+        "messages": [
+            {"role": "system", "content": NUTRITION_SYSTEM_PROMPT},
+            {"role": "user", "content": "\n".join([PROMPTS["nutrition_items"], *(f"- {item}" for item in items)])},
+        ],
+        "max_tokens": 300,
+        "response_format": NUTRITION_FORMAT,
+    }
+
+
+def translation_request(lang, names):
+    """Text-only request for the ``lang`` names of dishes the dictionary does not have."""
+    prompt = PROMPTS["translate"].format(language=translations.LANGUAGES[lang])
+    return {
+        "model": MODEL,
+        "messages": [
+            {"role": "system", "content": TRANSLATE_SYSTEM_PROMPT},
+            {"role": "user", "content": "\n".join([prompt, *(f"- {name}" for name in names)])},
+        ],
+        "max_tokens": 300,
+        "response_format": TRANSLATION_FORMAT,
+    }
+
+
+def combined_request(image_url):
+    return {
+        "model": MODEL,
+        "messages": build_messages(PROMPTS["combined"], image_url),
+        "max_tokens": 450,
+        "response_format": COMBINED_FORMAT,
+    }
+
+
+def reply_text(response):
+    return response.choices[0].message.content.strip().lower()
+
+
+def parse_detected_items(reply):
+    return [
+        item.strip("- ").strip()
+        for item in reply.split("\n")
+        if item.strip()
+    ]
+
+
+def parse_nutrition_json(reply):
+    """
+    Parse a structured nutrition reply into ``{item: {"calories": "200 kcal", ...}}``,
+    the same shape the text parser produces.  Raises ``ValueError`` if the
+    reply does not match ``NutritionReply``.
+    """
+    return format_nutrition(NutritionReply.model_validate_json(reply).items)
+
+
+def format_nutrition(items):
+    return {
+        item.name.strip(): {key: f"{getattr(item, key):g} {unit}" for key, unit in UNITS.items()}
+        for item in items
+        if item.name.strip()
+    }
+
+
+def parse_nutritions(reply):
+    """Structured JSON first; free text (older prompts, refusals, truncated JSON) through the regex parser."""
+    try:
+        return parse_nutrition_json(reply)
+    except ValidationError:
+        return parse_nutrition_text(reply)
+
+
+def parse_nutrition_text(reply):
+    nutritions = {}
+    current_item = None
+
+    for line in reply.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+
+        item_match = re.match(r"^\d+\.\s+\*{0,2}(.+?)\*{0,2}$", line)
+        if item_match:
+            current_item = item_match.group(1).strip()
+            nutritions[current_item] = {}
+            continue
+
+        if current_item:
+            nutrition_match = re.match(r"[-*]?\s*\*{0,2}([\w\s]+)\*{0,2}:\s*(.+)", line)
+            if nutrition_match:
+                key = nutrition_match.group(1).strip().lower()
+                value = nutrition_match.group(2).strip()
+                nutritions[current_item][key] = value
+
+    return nutritions
+
+
+def parse_combined(reply):
+    """
+    Split a combined reply into ``(detected_items, nutritions)``, formatted
+    like the parallel calls' results.  Raises ``InvalidReply`` if it does not
+    match ``CombinedReply``: without a food list there is nothing to fall back on.
+    """
+    try:
+        parsed = CombinedReply.model_validate_json(reply)
+    except ValidationError:
+        raise InvalidReply("Could not read the model's reply; try again or use mode=parallel")
+    detected_items = [item.strip() for item in parsed.items if item.strip()]
+    return detected_items, format_nutrition(parsed.nutrition)
+
+
+def parse_translations(reply):
+    """``{name: translation}`` from a structured translation reply; raises ``ValueError`` if it does not match."""
+    parsed = TranslationReply.model_validate_json(reply)
+    return {item.name.strip(): item.translation.strip() for item in parsed.items if item.name.strip()}
+
+
+def build_result(menu_list, detected_items, nutritions, lang="en"):
+    """
+    The verify-menu result for English ``detected_items`` and ``nutritions``.
+    In another language, dish names are rendered from the dictionary (names
+    it lacks stay in English) and ``labels`` gives the nutrient and unit names.
+    """
+    with metrics.stage("match"):
+        known, misses = nutrition_kb.resolve(detected_items)
+        nutritions = {**nutritions, **known}
+        local = translations.names_in(lang, [*detected_items, *nutritions])
+        # The menu may be written in either language.
+        found_items, missing_items = match_menu(menu_list, [*detected_items, *local.values()])
+    result = {
+        "items_food": [local.get(item, item) for item in detected_items],
+        "input_menu": menu_list,
+        "found_items": found_items,
+        "missing_items": missing_items,
+        "nutritions": {local.get(name, name): values for name, values in nutritions.items()},
+        "nutrition_kb": {"hits": len(known), "misses": misses},
+    }
+    if translations.localized(lang):
+        result["labels"] = translations.labels(lang)
+    return result
+
+
+def complete(client, call, request):
+    """Send one chat completion, timed as stage ``gpt_<call>`` with its token usage counted; returns the reply text."""
+    with metrics.stage(f"gpt_{call}"):
+        response = client.chat.completions.create(**request)
+    metrics.record_usage(call, response)
+    return reply_text(response)
+
+
+async def acomplete(client, call, request):
+    with metrics.stage(f"gpt_{call}"):
+        response = await client.chat.completions.create(**request)
+    metrics.record_usage(call, response)
+    return reply_text(response)
+
+
+def timed_parse(parser, reply):
+    with metrics.stage("parse"):
+        return parser(reply)
+
+
+def detect(client, image_url):
+    """
+    Sequential detection: food list first, then nutrition -- only for the
+    items the local nutrition table does not know, when it is in use.
+    Returns ``(detected_items, nutritions)``, in English.
+    """
+    detected_items = parse_detected_items(complete(client, "food", food_request(image_url)))
+    if not nutrition_kb.active():
+        reply = complete(client, "nutrition", nutrition_request(image_url))
+        return detected_items, timed_parse(parse_nutritions, reply)
+
+    unknown = nutrition_kb.unknown(detected_items)
+    nutritions = {}
+    if unknown:
+        reply = complete(client, "nutrition_items", nutrition_items_request(unknown))
+        nutritions = timed_parse(parse_nutritions, reply)
+    return detected_items, nutritions
+
+
+async def adetect(client, image_url, mode="parallel"):
+    """
+    Async detection for an ``AsyncOpenAI`` client.
+
+    ``parallel`` sends the food-list and nutrition calls at the same time;
+    ``combined`` asks for both in a single JSON reply.  With the local
+    nutrition table in use, ``parallel`` still starts both calls, and drops
+    the nutrition one as soon as the food list shows the table knows every
+    dish.  That keeps one round trip of latency when it does not, at the
+    cost of asking about every item (with the image) rather than only the
+    unknown ones by name, as the sequential pipeline does.
+    """
+    if mode == "combined":
+        reply = await acomplete(client, "combined", combined_request(image_url))
+        return timed_parse(parse_combined, reply)
+
+    nutrition = asyncio.ensure_future(acomplete(client, "nutrition", nutrition_request(image_url)))
+    # Its outcome is not needed when the call is dropped; do not log it as unretrieved.
+    nutrition.add_done_callback(lambda task: task.cancelled() or task.exception())
+    try:
+        detected_items = parse_detected_items(await acomplete(client, "food", food_request(image_url)))
+        if nutrition_kb.active() and not nutrition_kb.unknown(detected_items):
+            return detected_items, {}
+        reply_nutrition = await nutrition
+    finally:
+        nutrition.cancel()
+    return detected_items, timed_parse(parse_nutritions, reply_nutrition)
+
+
+def translate(client, lang, names):
+    """
+    Ask the model for the ``lang`` names of dishes the dictionary lacks and
+    keep them.  A failure only leaves those names in English.
+    """
+    unknown = translations.unknown(lang, names)
+    if not unknown or not translations.options()["TRANSLATE_UNKNOWN"]:
+        return
+    try:
+        reply = complete(client, "translate", translation_request(lang, unknown))
+        translations.store(lang, timed_parse(parse_translations, reply))
+    except Exception:
+        logger.warning("Could not translate %d dish names to %s", len(unknown), lang, exc_info=True)
+
+
+async def atranslate(client, lang, names):
+    unknown = translations.unknown(lang, names)
+    if not unknown or not translations.options()["TRANSLATE_UNKNOWN"]:
+        return
+    try:
+        reply = await acomplete(client, "translate", translation_request(lang, unknown))
+        await translations.astore(lang, timed_parse(parse_translations, reply))
+    except Exception:
+        logger.warning("Could not translate %d dish names to %s", len(unknown), lang, exc_info=True)
+
+
+def render(client, lang, menu_list, detected_items, nutritions):
+    """``build_result`` in ``lang``, translating dish names the dictionary does not have first."""
+    translate(client, lang, [*detected_items, *nutritions])
+    return build_result(menu_list, detected_items, nutritions, lang)
+
+
+async def arender(client, lang, menu_list, detected_items, nutritions):
+    await atranslate(client, lang, [*detected_items, *nutritions])
+    return build_result(menu_list, detected_items, nutritions, lang)
+
+
+def run(client, lang, image_url, menu_list):
+    """Sequential pipeline: ``detect`` in English, then ``render`` in ``lang``."""
+    detected_items, nutritions = detect(client, image_url)
+    return render(client, lang, menu_list, detected_items, nutritions)
+
+
+async def arun(client, lang, image_url, menu_list, mode="parallel"):
+    """Async pipeline: ``adetect`` in English, then ``arender`` in ``lang``."""
+    detected_items, nutritions = await adetect(client, image_url, mode=mode)
+    return await arender(client, lang, menu_list, detected_items, nutritions)
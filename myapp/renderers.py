@@ -0,0 +1,102 @@
+"""
+One JSON encoding for every myapp response.
+
+``dumps`` uses orjson when it is installed -- several times faster than the
+stdlib encoder -- and falls back to ``json``.  Either way the output is
+compact UTF-8 with non-ASCII text left as is: ``JsonResponse`` escaped each
+Gujarati character to a six-byte ``\\uXXXX``, twice its UTF-8 size.  Values
+neither encoder knows (dates and datetimes, decimals, lazy strings) are
+converted by DRF's encoder, so the output matches DRF's.
+
+``FastJSONRenderer`` is the DRF default renderer (``REST_FRAMEWORK``) and
+``JSONResponse`` stands in for ``JsonResponse``.  Given the request,
+``JSONResponse`` gzips bodies of at least ``JSON_RESPONSES["GZIP_MIN_BYTES"]``
+for clients that accept it.
+"""
+import gzip
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+DEFAULTS = {
+    "GZIP_MIN_BYTES": 2048,
+    "GZIP_LEVEL": 6,
+}
+
+_fallback = JSONEncoder().default
+_encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+if orjson is not None:
+    # Datetimes go through DRF's encoder ("Z" for UTC, as DRF renders them).
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def options():
+    return {**DEFAULTS, **getattr(settings, "JSON_RESPONSES", {})}
+
+
+def dumps(data):
+    """``data`` as compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_fallback, option=_ORJSON_OPTIONS)
+    return _encoder.encode(data).encode("utf-8")
+
+
+def choose_encoding(accept_encoding, available):
+    """Best content encoding the client accepts: brotli, then gzip, then none."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in ("br", "gzip"):
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return "identity"
+
+
+def compress(request, response):
+    """Gzip ``response`` in place when it is large enough and ``request`` accepts gzip."""
+    opts = options()
+    patch_vary_headers(response, ["Accept-Encoding"])
+    if opts["GZIP_MIN_BYTES"] is None or len(response.content) < opts["GZIP_MIN_BYTES"]:
+        return response
+    if choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""), {"gzip"}) != "gzip":
+        return response
+    response.content = gzip.compress(response.content, compresslevel=opts["GZIP_LEVEL"], mtime=0)
+    response["Content-Encoding"] = "gzip"
+    return response
+
+
+class FastJSONRenderer(JSONRenderer):
+    """DRF's ``JSONRenderer`` through ``dumps``; indented output (the browsable API) still goes through DRF."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+class JSONResponse(HttpResponse):
+    """``JsonResponse`` encoded with ``dumps``; pass ``request`` to gzip large bodies."""
+
+    def __init__(self, data, request=None, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(dumps(data), **kwargs)
+        if request is not None:
+            compress(request, self)
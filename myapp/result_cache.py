@@ -0,0 +1,157 @@
+"""
+Content-addressed cache for verify-menu results.
+
+Entries are keyed on the SHA-256 of the uploaded image, the pipeline's
+prompt version and the image preprocessing settings, and hold only what the
+model told us: the raw detected items and the parsed nutrition data, in
+English.  Menu matching and rendering in the request's language are cheap
+and depend on the caller's ``menu`` and ``lang``, so they are re-run on
+every hit.
+
+Lookups go through a bounded in-process LRU first and then a persistent
+Django cache (``VERIFY_MENU_CACHE["ALIAS"]``, a SQLite table by default)
+whose entries expire after ``VERIFY_MENU_CACHE["TIMEOUT"]`` seconds.  Its
+table is created by a migration; should the persistent tier fail anyway, the
+error is logged and the lookup counts as a miss.
+"""
+import logging
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import images, pipeline
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+
+    def __init__(self, max_entries=512, timeout=7 * 24 * 3600, alias="verify_menu"):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.alias = alias
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"memory_hits": 0, "persistent_hits": 0, "misses": 0}
+
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, "VERIFY_MENU_CACHE", {})
+        return cls(
+            max_entries=options.get("MAX_ENTRIES", 512),
+            timeout=options.get("TIMEOUT", 7 * 24 * 3600),
+            alias=options.get("ALIAS", "verify_menu"),
+        )
+
+    @property
+    def persistent(self):
+        return caches[self.alias] if self.alias else None
+
+    def make_key(self, digest, mode="parallel"):
+        # Sequential and parallel runs send the same two prompts, so they share entries.
+        prompts = "combined" if mode == "combined" else "split"
+        return f"verify-menu:{pipeline.PROMPT_VERSION}:{images.signature()}:{prompts}:{digest}"
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _recall(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.counters["memory_hits"] += 1
+            return entry
+
+    def _count(self, counter):
+        with self._lock:
+            self.counters[counter] += 1
+
+    # The persistent tier only saves model calls: if it fails, carry on without it.
+    def _persistent_get(self, key):
+        if not self.persistent:
+            return None
+        try:
+            return self.persistent.get(key)
+        except Exception:
+            logger.warning("Could not read verify-menu cache %r", self.alias, exc_info=True)
+            return None
+
+    async def _persistent_aget(self, key):
+        if not self.persistent:
+            return None
+        try:
+            return await self.persistent.aget(key)
+        except Exception:
+            logger.warning("Could not read verify-menu cache %r", self.alias, exc_info=True)
+            return None
+
+    def get(self, key):
+        """Return ``{"items_food": ..., "nutritions": ...}`` or ``None``."""
+        entry = self._recall(key)
+        if entry is not None:
+            return entry
+        entry = self._persistent_get(key)
+        if entry is None:
+            self._count("misses")
+            return None
+        self._count("persistent_hits")
+        self._remember(key, entry)
+        return entry
+
+    def set(self, key, result):
+        entry = {"items_food": result["items_food"], "nutritions": result["nutritions"]}
+        self._remember(key, entry)
+        if self.persistent:
+            try:
+                self.persistent.set(key, entry, self.timeout)
+            except Exception:
+                logger.warning("Could not store verify-menu result in cache %r", self.alias, exc_info=True)
+
+    async def aget(self, key):
+        entry = self._recall(key)
+        if entry is not None:
+            return entry
+        entry = await self._persistent_aget(key)
+        if entry is None:
+            self._count("misses")
+            return None
+        self._count("persistent_hits")
+        self._remember(key, entry)
+        return entry
+
+    async def aset(self, key, result):
+        entry = {"items_food": result["items_food"], "nutritions": result["nutritions"]}
+        self._remember(key, entry)
+        if self.persistent:
+            try:
+                await self.persistent.aset(key, entry, self.timeout)
+            except Exception:
+                logger.warning("Could not store verify-menu result in cache %r", self.alias, exc_info=True)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.persistent:
+            self.persistent.clear()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+            size = len(self._entries)
+        lookups = sum(counters.values())
+        hits = counters["memory_hits"] + counters["persistent_hits"]
+        counters.update({
+            "memory_entries": size,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        })
+        return counters
+
+
+result_cache = ResultCache.from_settings()
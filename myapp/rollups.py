@@ -0,0 +1,19 @@
+"""Counter tables kept up to date with one upsert per key."""
+from django.db import connection
+
+
+def upsert_sql(model, key, counters):
+    """
+    ``INSERT ... ON CONFLICT`` for ``model`` that adds to the ``counters``
+    columns of the row with the same ``key`` columns, creating it if needed.
+
+    Takes the key values, then the counter values, as parameters.  Same
+    syntax on SQLite (3.24+) and PostgreSQL.
+    """
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    key_columns = ", ".join(quote(column) for column in key)
+    columns = ", ".join(quote(column) for column in (*key, *counters))
+    placeholders = ", ".join(["%s"] * (len(key) + len(counters)))
+    updates = ", ".join(f"{quote(column)} = {table}.{quote(column)} + excluded.{quote(column)}" for column in counters)
+    return f"INSERT INTO {table} ({columns}) VALUES ({placeholders}) ON CONFLICT ({key_columns}) DO UPDATE SET {updates}"
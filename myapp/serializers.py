@@ -1,7 +1,52 @@
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Teacher
+from . import surveys
+from .models import NutritionFact, Teacher
 
 class TeacherSerializer(serializers.ModelSerializer):
     class Meta:
         model = Teacher
         fields = ['id', 'username_en', 'username_gu']
+
+
+class NutritionFactSerializer(serializers.ModelSerializer):
+    # Validated per CSV row; uniqueness is handled by the upsert on import.
+    name_en = serializers.CharField(max_length=100)
+
+    class Meta:
+        model = NutritionFact
+        fields = ['name_en', 'name_gu', 'aliases', 'calories', 'protein', 'fat', 'carbs']
+        extra_kwargs = {field: {'min_value': 0} for field in ['calories', 'protein', 'fat', 'carbs']}
+
+
+class SurveyResponseSerializer(serializers.Serializer):
+    """
+    A survey submission.  ``answers`` maps question ids to either the option
+    index or the option text in ``lang``; both are stored as the index.
+    """
+    school = serializers.CharField(max_length=64)
+    date = serializers.DateField(required=False)
+    lang = serializers.CharField(default='en')
+    answers = serializers.DictField(child=serializers.JSONField(), allow_empty=False)
+
+    def validate(self, attrs):
+        encoded = surveys.get(attrs['lang'])
+        if encoded is None:
+            raise serializers.ValidationError({'lang': 'Invalid language'})
+
+        questions = {question.id: question.options for question in encoded.survey.questions}
+        answers = {}
+        for question_id, answer in attrs['answers'].items():
+            options = questions.get(question_id)
+            if options is None:
+                raise serializers.ValidationError({'answers': f'Unknown question {question_id!r}'})
+            if isinstance(answer, int) and not isinstance(answer, bool) and 0 <= answer < len(options):
+                answers[question_id] = answer
+            elif isinstance(answer, str) and answer in options:
+                answers[question_id] = options.index(answer)
+            else:
+                raise serializers.ValidationError({'answers': f'Invalid option for {question_id!r}'})
+
+        attrs['answers'] = answers
+        attrs.setdefault('date', timezone.localdate())
+        return attrs
@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import admission, llm, nutrition_kb, teacher_cache, translations
+from .models import NutritionFact, Teacher, Translation
+
+
+@receiver(post_save, sender=Teacher)
+@receiver(post_delete, sender=Teacher)
+def invalidate_teacher_cache(sender, **kwargs):
+    teacher_cache.invalidate()
+
+
+@receiver(post_save, sender=NutritionFact)
+@receiver(post_delete, sender=NutritionFact)
+def invalidate_nutrition_kb(sender, **kwargs):
+    nutrition_kb.invalidate()
+    # Gujarati dish names come from the nutrition table too.
+    translations.invalidate()
+
+
+@receiver(post_save, sender=Translation)
+@receiver(post_delete, sender=Translation)
+def invalidate_translations(sender, **kwargs):
+    translations.invalidate()
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(setting_changed)
+def reset_openai_clients(sender, setting, **kwargs):
+    if setting == 'OPENAI_CLIENT':
+        llm.reset()
+    elif setting in ('VERIFY_MENU_ADMISSION', 'CACHES'):
+        admission.reset()
@@ -0,0 +1,43 @@
+"""Row-by-row JSON encoding for ``StreamingHttpResponse`` exports."""
+from asgiref.sync import sync_to_async
+
+from .renderers import dumps
+
+
+def json_array_stream(rows, to_item, batch_size=1000):
+    """
+    Yield a JSON array of ``to_item(row)`` for each row, ``batch_size`` rows per chunk.
+
+    ``rows`` is consumed lazily (e.g. ``QuerySet.iterator()``), so memory stays
+    flat however many rows are exported.
+    """
+    yield b"["
+    first = True
+    batch = []
+    for row in rows:
+        batch.append(dumps(to_item(row)))
+        if len(batch) >= batch_size:
+            yield (b"" if first else b",") + b",".join(batch)
+            first = False
+            batch = []
+    if batch:
+        yield (b"" if first else b",") + b",".join(batch)
+    yield b"]"
+
+
+async def aiter_chunks(chunks):
+    """
+    Async iterator over a sync chunk iterator, for responses served under ASGI.
+
+    Django 4.2 buffers a sync ``streaming_content`` with ``sync_to_async(list)``
+    before sending any of it; here each chunk is pulled by its own
+    ``sync_to_async`` call instead, in the request's thread so a database
+    cursor stays on its connection.
+    """
+    chunks = iter(chunks)
+    done = object()
+    while True:
+        chunk = await sync_to_async(next, thread_sensitive=True)(chunks, done)
+        if chunk is done:
+            return
+        yield chunk
@@ -0,0 +1,66 @@
+"""
+Survey response storage and per-question aggregates.
+
+``record`` writes a batch of validated responses with ``bulk_create`` and, in
+the same transaction, adds them to ``SurveyAnswerCount`` -- one counter row
+per school, day, question and option -- with a single upsert per batch.
+``summary`` then only reads those counters: its cost depends on the number
+of questions, options and days asked for, not on how many responses exist.
+"""
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Sum
+
+from . import surveys
+from .models import SurveyAnswerCount, SurveyResponse
+from .rollups import upsert_sql
+
+
+def record(responses):
+    """Store validated responses and fold them into the counters; returns how many were stored."""
+    counts = Counter()
+    for response in responses:
+        for question_id, option in response["answers"].items():
+            counts[(response["school"], response["date"], question_id, option)] += 1
+
+    with transaction.atomic():
+        SurveyResponse.objects.bulk_create([SurveyResponse(**response) for response in responses], batch_size=500)
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                upsert_sql(SurveyAnswerCount, ("school", "date", "question_id", "option"), ("count",)),
+                [
+                    (school, connection.ops.adapt_datefield_value(date), question_id, option, count)
+                    for (school, date, question_id, option), count in counts.items()
+                ],
+            )
+    return len(responses)
+
+
+def summary(school, date_from, date_to, lang):
+    """Option counts per question for ``school`` between two dates (inclusive), labelled in ``lang``."""
+    totals = dict(
+        ((question_id, option), total)
+        for question_id, option, total in SurveyAnswerCount.objects.filter(
+            school=school, date__range=(date_from, date_to),
+        ).values_list("question_id", "option").annotate(total=Sum("count")).order_by()
+    )
+
+    survey = surveys.get(lang).survey
+    return {
+        "school": school,
+        "from": date_from.isoformat(),
+        "to": date_to.isoformat(),
+        "questions": [
+            {
+                "id": question.id,
+                "text": question.text,
+                "responses": sum(totals.get((question.id, index), 0) for index in range(len(question.options))),
+                "options": [
+                    {"text": text, "count": totals.get((question.id, index), 0)}
+                    for index, text in enumerate(question.options)
+                ],
+            }
+            for question in survey.questions
+        ],
+    }
@@ -0,0 +1,108 @@
+"""
+Survey definitions served by ``SurveyAPIView``.
+
+Each language is a data file, ``survey_data/<lang>.json``, loaded and
+validated once when the app starts (``MyappConfig.ready``).  The response
+body is encoded up front as UTF-8 JSON (``myapp.renderers.dumps``), plus
+gzip and (with the ``brotli`` package) brotli variants, so a request is a
+dictionary lookup and a header check.  Adding a language means adding a
+data file.
+"""
+import gzip
+import hashlib
+from pathlib import Path
+from typing import List
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse, HttpResponseNotModified
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+from .renderers import choose_encoding, dumps
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+SURVEY_DIR = Path(__file__).resolve().parent / "survey_data"
+
+
+class Question(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    id: str
+    text: str
+    options: List[str] = Field(min_length=1)
+
+
+class Survey(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    surveyTitle: str
+    description: str
+    questions: List[Question] = Field(min_length=1)
+
+
+class EncodedSurvey:
+    """A survey's response body in every supported content encoding."""
+
+    def __init__(self, survey):
+        self.survey = survey
+        body = dumps(survey.model_dump())
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.variants = {"identity": body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.variants["br"] = brotli.compress(body, quality=11)
+        # Strong ETags must differ between encodings of the same resource.
+        self.etags = {
+            encoding: f'"{digest}"' if encoding == "identity" else f'"{digest}-{encoding}"'
+            for encoding in self.variants
+        }
+
+
+_surveys = {}
+
+
+def load(directory=SURVEY_DIR):
+    """Load, validate and pre-encode every ``<lang>.json`` in ``directory``."""
+    surveys = {}
+    for path in sorted(Path(directory).glob("*.json")):
+        try:
+            survey = Survey.model_validate_json(path.read_bytes())
+        except ValidationError as e:
+            raise ImproperlyConfigured(f"Invalid survey file {path.name}: {e}") from e
+        surveys[path.stem] = EncodedSurvey(survey)
+
+    if not surveys:
+        raise ImproperlyConfigured(f"No survey files found in {directory}")
+    shapes = {lang: [(q.id, len(q.options)) for q in encoded.survey.questions] for lang, encoded in surveys.items()}
+    if len({tuple(shape) for shape in shapes.values()}) > 1:
+        raise ImproperlyConfigured(f"Survey files disagree on question ids or option counts: {shapes}")
+
+    _surveys.clear()
+    _surveys.update(surveys)
+    return surveys
+
+
+def languages():
+    return sorted(_surveys)
+
+
+def get(lang):
+    return _surveys.get(lang)
+
+
+def respond(request, encoded):
+    encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""), encoded.variants)
+    etag = encoded.etags[encoding]
+    if etag in [tag.strip() for tag in request.META.get("HTTP_IF_NONE_MATCH", "").split(",")]:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(encoded.variants[encoding], content_type="application/json")
+        if encoding != "identity":
+            response["Content-Encoding"] = encoding
+    response["ETag"] = etag
+    response["Vary"] = "Accept-Encoding"
+    response["Cache-Control"] = f"public, max-age={settings.SURVEY_CACHE_MAX_AGE}"
+    return response
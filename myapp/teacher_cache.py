@@ -0,0 +1,84 @@
+"""
+Response cache for the teacher read endpoints.
+
+Rendered list pages and detail bodies are cached per language in the
+``teachers`` cache alias together with a strong ETag.  A request whose
+``If-None-Match`` matches the cached ETag gets a 304 straight from the cache,
+without a database query.
+
+Every key embeds a generation stamp; any write to ``Teacher`` (the create
+API, the admin, bulk imports) calls ``invalidate()``, which moves to a new
+generation so every cached page and detail is dropped at once.  With the
+default ``LocMemCache`` that only covers the current process, so entries
+live just a few seconds (the alias' ``TIMEOUT``): other workers serve the
+old pages at most that long.  That still absorbs bursts of reads; point the
+alias at a shared cache (Redis, memcached) to cache longer across workers.
+"""
+import hashlib
+import threading
+import time
+
+from django.core.cache import caches
+from django.http import HttpResponse, HttpResponseNotModified
+
+from .renderers import dumps
+
+ALIAS = "teachers"
+GENERATION_KEY = "teachers:generation"
+
+_lock = threading.Lock()
+counters = {"hits": 0, "misses": 0, "not_modified": 0}
+
+
+def _count(counter):
+    with _lock:
+        counters[counter] += 1
+
+
+def stats():
+    with _lock:
+        snapshot = dict(counters)
+    lookups = snapshot["hits"] + snapshot["misses"]
+    snapshot["hit_rate"] = round(snapshot["hits"] / lookups, 4) if lookups else 0.0
+    return snapshot
+
+
+def invalidate():
+    caches[ALIAS].set(GENERATION_KEY, time.time_ns(), None)
+
+
+def make_key(*parts):
+    generation = caches[ALIAS].get_or_set(GENERATION_KEY, time.time_ns, None)
+    return ":".join(["teachers", str(generation), *map(str, parts)])
+
+
+def get(key):
+    entry = caches[ALIAS].get(key)
+    _count("misses" if entry is None else "hits")
+    return entry
+
+
+def store(key, data, headers=None):
+    body = dumps(data)
+    entry = {
+        "body": body,
+        "etag": '"%s"' % hashlib.sha256(body).hexdigest()[:32],
+        "headers": headers or {},
+    }
+    caches[ALIAS].set(key, entry)
+    return entry
+
+
+def respond(request, entry):
+    """Serve a cached entry, as a 304 when the client already has it."""
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH", "")
+    if entry["etag"] in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+        _count("not_modified")
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(entry["body"], content_type="application/json")
+        for header, value in entry["headers"].items():
+            response[header] = value
+    response["ETag"] = entry["etag"]
+    response["Cache-Control"] = "no-cache"
+    return response
@@ -0,0 +1,81 @@
+"""
+Teacher name search over ``username_en`` and ``username_gu``.
+
+On SQLite the names are indexed in ``myapp_teacher_fts``, an FTS5 table with
+the trigram tokenizer (migration 0005) that triggers keep in step with
+``myapp_teacher``.  Every word of the query of three or more characters must
+appear in the English or the Gujarati name -- at its start or anywhere
+inside it, ignoring case -- so ``vai``, ``patel``, ``shali`` and ``પટેલ``
+all find "Vaishaliben Patel / વૈશાલીબેન પટેલ".
+
+Names that start with the first word come first, then shorter names.
+Within one query that is close to what bm25 would give (every candidate
+holds the same terms, nearly always once, so mostly the length differs),
+but ``bm25()`` makes FTS5 count each phrase's matches over the whole
+index, which took 15-100 ms for common fragments (``ben``, ``patel``) at a
+million rows.  Only the first ``CANDIDATES`` matches are ranked, so those
+stay at about a millisecond.  On other databases, or when the index was
+never created, the search falls back to ``icontains`` in id order.
+"""
+import sqlite3
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Teacher
+
+MIN_TERM_LENGTH = 3
+CANDIDATES = 200
+
+INDEX = "myapp_teacher_fts"
+
+# Whether INDEX exists, by database name; looked up once per process.
+_index_exists = {}
+
+
+def terms(query):
+    """The words of ``query`` long enough to search for (trigrams need three characters)."""
+    return [word for word in query.split() if len(word) >= MIN_TERM_LENGTH]
+
+
+def fts_available():
+    """Whether the index can be used: SQLite 3.34+ and migration 0005 actually created it."""
+    if connection.vendor != "sqlite" or sqlite3.sqlite_version_info < (3, 34):
+        return False
+    # A database migrated under an older SQLite has no index even after an upgrade.
+    name = connection.settings_dict["NAME"]
+    if name not in _index_exists:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [INDEX])
+            _index_exists[name] = cursor.fetchone() is not None
+    return _index_exists[name]
+
+
+def _like_prefix(term):
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def search(words, limit):
+    """Up to ``limit`` ``(id, username_en, username_gu)`` rows matching every word, best first."""
+    if not words:
+        return []
+    if not fts_available():
+        condition = Q()
+        for word in words:
+            condition &= Q(username_en__icontains=word) | Q(username_gu__icontains=word)
+        return list(Teacher.objects.filter(condition).order_by("id").values_list("id", "username_en", "username_gu")[:limit])
+
+    match = " ".join('"%s"' % word.replace('"', '""') for word in words)
+    prefix = _like_prefix(words[0])
+    table = Teacher._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT t.id, t.username_en, t.username_gu FROM ("
+            f"  SELECT rowid FROM {INDEX} WHERE {INDEX} MATCH %s LIMIT %s"
+            f") AS m JOIN {table} AS t ON t.id = m.rowid "
+            f"ORDER BY (t.username_en LIKE %s ESCAPE '\\' OR t.username_gu LIKE %s ESCAPE '\\') DESC, "
+            f"length(t.username_en) + length(t.username_gu), t.id "
+            f"LIMIT %s",
+            [match, CANDIDATES, prefix, prefix, limit],
+        )
+        return cursor.fetchall()
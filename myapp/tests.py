@@ -1,3 +1,997 @@
-from django.test import TestCase
+import asyncio
+import base64
+import gzip
+import importlib
+import io
+import json
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import caches
+from django.core.handlers.asgi import ASGIHandler
+from django.core.signals import request_finished
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, close_old_connections, connection, connections, transaction
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import include, path
+from django.utils import timezone
+import httpx
+import openai
+from PIL import Image
+
+from myapp import (
+    admission, history, images, jobs, llm, loadtest, matching, metrics, nutrition_kb, openapi, pipeline, renderers, surveys,
+    teacher_cache, teacher_search, translations,
+)
+from myapp.fake_openai import FakeOpenAIServer, nutrition_json_reply, nutrition_reply
+from myapp.models import (
+    MissingItemCount, NutritionFact, SurveyAnswerCount, SurveyResponse, Teacher, Translation, Verification,
+    VerificationDailyCount, VerifyJob,
+)
+from myapp.result_cache import result_cache
+from myapp.streaming import json_array_stream
+from myapp.uploads import FORM_OVERHEAD_BYTES
+
+
+def jpeg_bytes(size=(64, 48), exif=None):
+    out = io.BytesIO()
+    Image.new("RGB", size, (200, 120, 40)).save(out, "JPEG", exif=exif or Image.Exif())
+    return out.getvalue()
+
+
+JPEG_BYTES = jpeg_bytes()
+
+
+def image_upload(data=JPEG_BYTES):
+    return SimpleUploadedFile("plate.jpg", data, content_type="image/jpeg")
+
+
+class VerifyMenuTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeOpenAIServer(latency=0).start()
+        cls.settings_override = override_settings(
+            OPENAI_CLIENT={"API_KEY": "fake", "BASE_URL": cls.server.base_url, "MAX_RETRIES": 0},
+            VERIFY_MENU_HISTORY={"ASYNC": False},
+        )
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        cls.server.stop()
+        super().tearDownClass()
+
+    def setUp(self):
+        result_cache.clear()
+        caches["admission"].clear()
+        # The table is per process; reload it from this test's database.
+        nutrition_kb.invalidate()
+        self.addCleanup(nutrition_kb.invalidate)
+        translations.invalidate()
+        self.addCleanup(translations.invalidate)
+
+    def test_sync_view_matches_menu(self):
+        response = self.client.post("/api/verify-menu/", {"lang": "en", "menu": "Rice, Dal, Salad", "image": image_upload()})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["found_items"], ["rice", "dal"])
+        self.assertEqual(data["missing_items"], ["salad"])
+        self.assertIn("rice", data["nutritions"])
+
+    def test_known_dishes_skip_the_nutrition_call(self):
+        call_command("import_nutrition", "myapp/nutrition_data/dishes.csv", stdout=io.StringIO())
+        calls = self.server.request_count
+        response = self.client.post("/api/verify-menu/", {"lang": "en", "menu": "Rice, Dal", "image": image_upload()})
+        data = response.json()
+        self.assertEqual(self.server.request_count - calls, 1)
+        self.assertEqual(data["nutrition_kb"], {"hits": 4, "misses": 0})
+        self.assertEqual(data["nutritions"]["rice"]["calories"], "200 kcal")
+
+        # An unknown item is the only one the model is asked about.
+        NutritionFact.objects.filter(name_en="sabzi").delete()
+        calls = self.server.request_count
+        data = self.client.post(
+            "/api/verify-menu/", {"lang": "en", "menu": "Rice", "image": image_upload(jpeg_bytes((32, 32)))},
+        ).json()
+        self.assertEqual(self.server.request_count - calls, 2)
+        self.assertEqual(data["nutrition_kb"], {"hits": 3, "misses": 1})
+        self.assertEqual(set(data["nutritions"]), {"rice", "dal", "roti", "sabzi"})
+
+    async def test_parallel_mode_uses_the_shipped_nutrition_table(self):
+        # Migration 0010 loads the shipped dishes, which cover the whole canned plate.
+        data = (await self.async_client.post(
+            "/api/verify-menu/async/", {"lang": "en", "menu": "rice", "image": image_upload(), "mode": "parallel"},
+        )).json()
+        self.assertEqual(data["nutrition_kb"], {"hits": 4, "misses": 0})
+
+        # With a dish missing, the nutrition call sent alongside the food list is used.
+        await NutritionFact.objects.filter(name_en="sabzi").adelete()
+        data = (await self.async_client.post(
+            "/api/verify-menu/async/",
+            {"lang": "en", "menu": "rice", "image": image_upload(jpeg_bytes((32, 32))), "mode": "parallel"},
+        )).json()
+        self.assertEqual(data["nutrition_kb"], {"hits": 3, "misses": 1})
+        self.assertEqual(data["nutritions"]["sabzi"]["calories"], "90 kcal")
+
+    def test_gujarati_result_is_rendered_from_the_dictionary(self):
+        call_command("import_nutrition", "myapp/nutrition_data/dishes.csv", stdout=io.StringIO())
+        calls = self.server.request_count
+        response = self.client.post("/api/verify-menu/", {"lang": "gu", "menu": "ભાત, દાળ, સલાડ", "image": image_upload()})
+        data = response.json()
+        # Only the English food list: nutrition and names are local.
+        self.assertEqual(self.server.request_count - calls, 1)
+        self.assertEqual(data["items_food"], ["ભાત", "દાળ", "રોટલી", "શાક"])
+        self.assertEqual((data["found_items"], data["missing_items"]), (["ભાત", "દાળ"], ["સલાડ"]))
+        self.assertEqual(data["nutritions"]["ભાત"]["calories"], "200 kcal")
+        self.assertEqual(data["labels"]["calories"], "કૅલરી")
+
+        # The cached answer is language-neutral.
+        english = self.client.post("/api/verify-menu/", {"lang": "en", "menu": "rice", "image": image_upload()})
+        self.assertEqual(english["X-Cache"], "HIT")
+        self.assertEqual(english.json()["items_food"], ["rice", "dal", "roti", "sabzi"])
+        self.assertNotIn("labels", english.json())
+
+    def test_imported_gujarati_names_are_used_at_once(self):
+        call_command("import_nutrition", "myapp/nutrition_data/dishes.csv", stdout=io.StringIO())
+        translations.refresh()
+        self.assertEqual(translations.names_in("gu", ["rice"]), {"rice": "ભાત"})
+
+        nutrition_kb.import_rows([{
+            "name_en": "rice", "name_gu": "ચોખા", "aliases": "steamed rice",
+            "calories": 200, "protein": 4, "fat": 0.5, "carbs": 45,
+        }])
+        translations.refresh()
+        self.assertEqual(translations.names_in("gu", ["rice", "steamed rice"]), {"rice": "ચોખા", "steamed rice": "ચોખા"})
+
+    def test_unknown_dish_names_are_translated_once(self):
+        NutritionFact.objects.all().delete()
+        calls = self.server.request_count
+        data = self.client.post("/api/verify-menu/", {"lang": "gu", "menu": "ભાત", "image": image_upload()}).json()
+        self.assertEqual(self.server.request_count - calls, 3)
+        self.assertEqual(data["items_food"], ["ભાત", "દાળ", "રોટલી", "શાક"])
+        self.assertEqual(data["found_items"], ["ભાત"])
+        self.assertEqual(Translation.objects.filter(source=Translation.MODEL).count(), 4)
+
+        # Stored names are used from then on, and edits show up at once.
+        Translation.objects.filter(name_en="roti").update(name="રોટલો")
+        Translation.objects.get(name_en="rice").save()
+        calls = self.server.request_count
+        data = self.client.post(
+            "/api/verify-menu/", {"lang": "gu", "menu": "ભાત", "image": image_upload(jpeg_bytes((32, 32)))},
+        ).json()
+        self.assertEqual(self.server.request_count - calls, 2)
+        self.assertEqual(data["items_food"], ["ભાત", "દાળ", "રોટલો", "શાક"])
+
+    def test_server_timing_header_and_metrics_endpoint(self):
+        NutritionFact.objects.all().delete()
+        metrics.reset()
+        response = self.client.post("/api/verify-menu/", {"lang": "en", "menu": "Rice, Dal", "image": image_upload()})
+        stages = [part.split(";")[0] for part in response["Server-Timing"].split(", ")]
+        for name in ("upload", "cache", "image_prep", "gpt_food", "gpt_nutrition", "match", "total"):
+            self.assertIn(name, stages)
+
+        text = self.client.get("/metrics/").content.decode()
+        self.assertIn('http_request_duration_seconds_bucket{endpoint="verify-menu",method="POST",le="+Inf"} 1', text)
+        self.assertIn('stage_duration_seconds_count{endpoint="verify-menu",stage="gpt_food"} 1', text)
+        self.assertRegex(text, r'openai_tokens_total\{call="food",kind="completion"\} [1-9]')
+        self.assertIn('openai_breaker_state{state="closed"} 1', text)
+
+    async def test_async_view_modes_agree(self):
+        results = {}
+        for mode in ("parallel", "combined"):
+            response = await self.async_client.post(
+                "/api/verify-menu/async/",
+                {"lang": "en", "menu": "rice, salad", "image": image_upload(), "mode": mode},
+            )
+            self.assertEqual(response.status_code, 200)
+            results[mode] = response.json()
+        self.assertEqual(results["parallel"]["found_items"], ["rice"])
+        self.assertEqual(results["parallel"]["found_items"], results["combined"]["found_items"])
+        self.assertEqual(results["parallel"]["nutritions"], results["combined"]["nutritions"])
+        self.assertEqual(results["combined"]["nutritions"]["rice"]["calories"], "200 kcal")
+
+    async def test_unreadable_combined_reply_is_a_502(self):
+        for reply in ("not json", '["rice"]', '{"items": ["rice"], "nutritions": {}}'):
+            with mock.patch.object(pipeline, "acomplete", mock.AsyncMock(return_value=reply)):
+                response = await self.async_client.post(
+                    "/api/verify-menu/async/",
+                    {"lang": "en", "menu": "rice", "image": image_upload(), "mode": "combined"},
+                )
+            self.assertEqual(response.status_code, 502, reply)
+            self.assertIn("Could not read the model's reply", response.json()["error"])
+
+    def test_repeat_upload_is_served_from_cache(self):
+        first = self.client.post("/api/verify-menu/", {"lang": "en", "menu": "rice", "image": image_upload()})
+        calls = self.server.request_count
+        second = self.client.post("/api/verify-menu/", {"lang": "en", "menu": "rice, salad", "image": image_upload()})
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(self.server.request_count, calls)
+        self.assertEqual(second.json()["missing_items"], ["salad"])
+
+    def test_persistent_tier_survives_lru_eviction(self):
+        self.client.post("/api/verify-menu/", {"lang": "gu", "menu": "rice", "image": image_upload()})
+        result_cache._entries.clear()
+        response = self.client.post("/api/verify-menu/", {"lang": "gu", "menu": "rice", "image": image_upload()})
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertGreaterEqual(result_cache.stats()["persistent_hits"], 1)
+
+    def test_missing_cache_table_is_a_miss_not_an_error(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TABLE verify_menu_cache")
+        with self.assertLogs("myapp.result_cache", "WARNING"):
+            response = self.client.post("/api/verify-menu/", {"lang": "en", "menu": "rice", "image": image_upload()})
+        self.assertEqual(response.status_code, 200)
+
+        # The migration builds the table itself, whatever CACHES says.
+        migration = importlib.import_module("myapp.migrations.0008_create_cache_tables")
+        with override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}):
+            # SQLite refuses a schema editor inside the test transaction only
+            # because it cannot switch foreign key checks off there.
+            with mock.patch.object(connection, "disable_constraint_checking", return_value=True):
+                with connection.schema_editor(atomic=False) as editor:
+                    migration.create_cache_tables(None, editor)
+        with connection.cursor() as cursor:
+            columns = [column.name for column in connection.introspection.get_table_description(cursor, "verify_menu_cache")]
+        self.assertEqual(columns, ["cache_key", "value", "expires"])
+        caches["verify_menu"].set("probe", {"ok": True})
+        self.assertEqual(caches["verify_menu"].get("probe"), {"ok": True})
+
+    def test_non_image_upload_is_refused(self):
+        upload = SimpleUploadedFile("menu.pdf", b"%PDF-1.4 not an image", content_type="image/jpeg")
+        response = self.client.post("/api/verify-menu/", {"lang": "en", "menu": "rice", "image": upload})
+        self.assertEqual(response.status_code, 415)
+
+    @override_settings(VERIFY_MENU_MAX_IMAGE_BYTES=256)
+    def test_oversized_upload_is_refused_before_calling_the_model(self):
+        calls = self.server.request_count
+        response = self.client.post("/api/verify-menu/", {"lang": "en", "menu": "rice", "image": image_upload()})
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(self.server.request_count, calls)
+
+    @override_settings(VERIFY_MENU_MAX_IMAGE_BYTES=1024)
+    async def test_oversized_request_body_is_refused_from_content_length(self):
+        # Larger than max_bytes * fields + FORM_OVERHEAD_BYTES, so refused before the body is read.
+        upload = image_upload(b"\xff\xd8\xff" + bytes(FORM_OVERHEAD_BYTES + 2048))
+        for url in ("/api/verify-menu/", "/api/verify-menu/async/", "/api/verify-menu/jobs/"):
+            response = await self.async_client.post(url, {"lang": "en", "menu": "rice", "image": upload})
+            upload.seek(0)
+            self.assertEqual(response.status_code, 413, url)
+            self.assertIn("Upload too large", response.json()["error"])
+
+    async def test_batch_reports_failures_per_item(self):
+        response = await self.async_client.post("/api/verify-menu/batch/", {
+            "lang": "en",
+            "image_0": image_upload(), "menu_0": "rice, salad",
+            "image_1": SimpleUploadedFile("notes.txt", b"hello", content_type="image/jpeg"), "menu_1": "dal",
+            "image_2": image_upload(jpeg_bytes((32, 32))),
+        })
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data["succeeded"], data["failed"]), (1, 2))
+        first, second, third = data["items"]
+        self.assertEqual(first["result"]["missing_items"], ["salad"])
+        self.assertEqual(second["status"], 415)
+        self.assertEqual(third["status"], 400)
+
+    def test_job_is_queued_then_processed_by_worker(self):
+        response = self.client.post("/api/verify-menu/jobs/", {"lang": "en", "menu": "rice, salad", "image": image_upload()})
+        self.assertEqual(response.status_code, 202)
+        status_url = response["Location"]
+        self.assertEqual(self.client.get(status_url).json()["status"], "queued")
+
+        jobs.work(once=True)
+
+        data = self.client.get(status_url, {"wait": 5}).json()
+        self.assertEqual(data["status"], "done")
+        self.assertEqual(data["result"]["missing_items"], ["salad"])
+        self.assertEqual(VerifyJob.objects.get().image, b"")
+        self.assertEqual(Verification.objects.get().missing_items, ["salad"])
+
+    def test_failed_jobs_back_off_and_outages_do_not_use_up_attempts(self):
+        self.client.post("/api/verify-menu/jobs/", {"lang": "en", "menu": "rice", "image": image_upload()})
+        outage = llm.CircuitOpen("OpenAI is failing", retry_after=30)
+        for _ in range(5):
+            with mock.patch.object(jobs, "verify", side_effect=outage):
+                jobs.run_job(None, jobs.claim())
+            self.assertIsNone(jobs.claim())
+            VerifyJob.objects.update(not_before=None)
+        job = VerifyJob.objects.get()
+        self.assertEqual((job.status, job.attempts), (VerifyJob.QUEUED, 0))
+
+        job = jobs.claim()
+        with mock.patch.object(jobs, "verify", side_effect=RuntimeError("boom")):
+            jobs.run_job(None, job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (VerifyJob.QUEUED, 1))
+        self.assertGreater(job.not_before, timezone.now())
+        self.assertIsNone(jobs.claim())
+
+    def test_verifications_are_stored_with_school_and_teacher(self):
+        teacher = Teacher.objects.create(username_en="Parulben Shah", username_gu="પારૂલબેન શાહ")
+        form = {"lang": "en", "menu": "rice, salad", "school": "s1", "teacher": str(teacher.id)}
+        self.client.post("/api/verify-menu/", {**form, "image": image_upload()})
+        self.client.post("/api/verify-menu/", {**form, "image": image_upload()})
+
+        stored = Verification.objects.filter(school="s1")
+        self.assertEqual(stored.count(), 2)
+        self.assertEqual(stored.first().teacher, teacher)
+        daily = VerificationDailyCount.objects.get(school="s1")
+        self.assertEqual((daily.verifications, daily.menu_items, daily.missing_items), (2, 4, 2))
+
+        response = self.client.post("/api/verify-menu/", {**form, "teacher": "x", "image": image_upload()})
+        self.assertEqual(response.status_code, 400)
+
+
+class MenuMatchingTests(SimpleTestCase):
+
+    def test_normalized_synonym_and_fuzzy_matches(self):
+        menu = ["Rice", "Jeera Rice", "Dal", "Phulka", "Bhindi Masala", "Salad", "ખીચડી"]
+        detected = ["1. **Jeera rice**", "Dal (lentil curry)", "Chapatis", "bhindi masla", "ખિચડી"]
+        found, missing = matching.match_menu(menu, detected)
+        self.assertEqual(found, ["Jeera Rice", "Dal", "Phulka", "Bhindi Masala", "ખીચડી"])
+        self.assertEqual(missing, ["Rice", "Salad"])
+
+    def test_unrelated_dishes_do_not_match(self):
+        self.assertEqual(matching.match_menu(["Dal", "Rice"], ["Soup", "Bread", ""]), ([], ["Dal", "Rice"]))
+        with override_settings(VERIFY_MENU_MATCH={"FUZZY_THRESHOLD": 1.0}):
+            self.assertEqual(matching.match_menu(["Bhindi Masala"], ["bhindi masla"])[0], [])
+
+
+class NutritionParsingTests(SimpleTestCase):
+
+    def test_structured_reply_with_text_fallback(self):
+        structured = pipeline.parse_nutritions(nutrition_json_reply())
+        self.assertEqual(structured["rice"], {"calories": "200 kcal", "protein": "4 g", "fat": "0.5 g", "carbs": "45 g"})
+        self.assertEqual(pipeline.parse_nutritions(nutrition_reply().lower()), structured)
+        self.assertEqual(pipeline.parse_nutritions(nutrition_json_reply()[:40]), {})
+        self.assertEqual(pipeline.nutrition_request("data:,")["response_format"]["type"], "json_schema")
+
+
+class OpenAIClientTests(TestCase):
+
+    def setUp(self):
+        self.server = FakeOpenAIServer(latency=0, error_rate=1.0).start()
+        self.addCleanup(self.server.stop)
+        override = override_settings(OPENAI_CLIENT={
+            "API_KEY": "fake", "BASE_URL": self.server.base_url,
+            "MAX_RETRIES": 2, "BACKOFF_BASE": 0.001, "BREAKER_THRESHOLD": 3, "BREAKER_RESET": 60,
+        })
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_retries_then_circuit_breaker_fails_fast(self):
+        request = pipeline.food_request("data:,")
+        with self.assertRaises(openai.InternalServerError):
+            llm.sync_client().chat.completions.create(**request)
+        self.assertEqual(self.server.request_count, 3)
+
+        response = self.client.post("/api/verify-menu/", {"lang": "en", "menu": "rice", "image": image_upload()})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "60")
+        self.assertEqual(self.server.request_count, 3)
+
+        # After the reset period one probe goes through; its success closes the circuit.
+        self.server.error_rate = 0.0
+        llm.guard().breaker.opened_at -= 60
+        llm.sync_client().chat.completions.create(**request)
+        self.assertEqual(llm.stats()["breaker"], "closed")
+
+    def test_cancelled_half_open_probe_does_not_wedge_the_breaker(self):
+        guard = llm.Guard({**llm.options(), "MAX_CONCURRENCY": 1})
+        guard.breaker.opened_at = time.monotonic() - 61
+
+        async def create(**kwargs):
+            return "ok"
+
+        async def scenario():
+            semaphore = guard.loop_semaphore()
+            await semaphore.acquire()
+            probe = asyncio.ensure_future(guard.acall(create, {}))
+            await asyncio.sleep(0.01)
+            self.assertTrue(guard.breaker.probing)
+            probe.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await probe
+            semaphore.release()
+            return await guard.acall(create, {})
+
+        self.assertEqual(asyncio.run(scenario()), "ok")
+        self.assertEqual(guard.breaker.state, "closed")
+
+    def test_token_bucket_spaces_out_bursts(self):
+        bucket = llm.TokenBucket(rate_per_second=10, burst=2)
+        waits = [bucket.reserve() for _ in range(4)]
+        self.assertEqual(waits[:2], [0.0, 0.0])
+        self.assertAlmostEqual(waits[3], 0.2, places=2)
+        with self.assertRaises(llm.QueueFull):
+            bucket.reserve(max_wait=0.1)
+
+
+class ImagePreprocessingTests(SimpleTestCase):
+
+    def test_downscale_fits_low_detail_size_and_applies_orientation(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # rotated 90 degrees clockwise
+        exif[0x010F] = "PhoneMaker"
+        raw = jpeg_bytes((2000, 1000), exif)
+
+        with Image.open(io.BytesIO(images.downscale(raw, 512, 80))) as img:
+            self.assertEqual(img.size, (256, 512))
+            self.assertEqual(len(img.getexif()), 0)
+
+    def test_decompression_bomb_is_rejected(self):
+        # A few dozen bytes declaring a 50000 x 50000 pixel PNG.
+        header = struct.pack(">IIBBBBB", 50000, 50000, 8, 2, 0, 0, 0)
+        chunk = struct.pack(">I", len(header)) + b"IHDR" + header + struct.pack(">I", zlib.crc32(b"IHDR" + header))
+        with self.assertRaises(images.ImageRejected):
+            images.downscale(b"\x89PNG\r\n\x1a\n" + chunk)
+
+    def test_prepare_replaces_raw_bytes_with_data_url(self):
+        image = mock.Mock(data_url=None, raw=jpeg_bytes((1600, 1200)))
+        data_url = images.prepare(image)
+        self.assertTrue(data_url.startswith("data:image/jpeg;base64,"))
+        self.assertIsNone(image.raw)
+        self.assertLess(len(base64.b64decode(data_url.split(",", 1)[1])), 64 * 1024)
+
+
+class TeacherListTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Teacher.objects.bulk_create([Teacher(username_en=f"Teacher {n}", username_gu=f"શિક્ષક {n}") for n in range(5)])
+
+    def setUp(self):
+        teacher_cache.invalidate()
+
+    def test_keyset_pages_follow_link_header(self):
+        response = self.client.get("/api/teachers/", {"lang": "gu", "page_size": 2})
+        self.assertEqual([row["username"] for row in response.json()], ["શિક્ષક 0", "શિક્ષક 1"])
+
+        seen = []
+        url = "/api/teachers/?lang=en&page_size=2"
+        while url:
+            response = self.client.get(url)
+            seen += response.json()
+            url = response.get("Link", "").partition("<")[2].partition(">")[0]
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(seen[-1]["username"], "Teacher 4")
+
+    def test_stream_exports_every_row(self):
+        response = self.client.get("/api/teachers/", {"lang": "en", "stream": "1"})
+        self.assertTrue(response.streaming)
+        rows = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0], {"id": rows[0]["id"], "username": "Teacher 0"})
+
+    async def test_stream_under_asgi_sends_rows_before_reading_them_all(self):
+        read, read_at_first_row, body = [], [], []
+
+        def counting_stream(rows, to_item):
+            def counted():
+                for row in rows:
+                    read.append(row)
+                    yield row
+            return json_array_stream(counted(), to_item, batch_size=1)
+
+        async def receive():
+            if not body:
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.Event().wait()
+
+        async def send(message):
+            chunk = message.get("body", b"")
+            if chunk not in (b"", b"[") and not read_at_first_row:
+                read_at_first_row.append(len(read))
+            body.append(chunk)
+
+        scope = {
+            "type": "http", "method": "GET", "path": "/api/teachers/", "query_string": b"lang=en&stream=1",
+            "headers": [(b"host", b"localhost")],
+        }
+        request_finished.disconnect(close_old_connections)
+        self.addCleanup(request_finished.connect, close_old_connections)
+        with mock.patch("myapp.views.json_array_stream", counting_stream):
+            await ASGIHandler()(scope, receive, send)
+        self.assertEqual(read_at_first_row, [1])
+        self.assertEqual(len(json.loads(b"".join(body))), 5)
+
+    def test_cached_reads_and_conditional_gets_do_no_queries(self):
+        first = self.client.get("/api/teachers/", {"lang": "en"})
+        teacher_id = first.json()[0]["id"]
+        detail = self.client.get(f"/api/teachers/{teacher_id}/", {"lang": "gu"})
+
+        with self.assertNumQueries(0):
+            again = self.client.get("/api/teachers/", {"lang": "en"})
+            not_modified = self.client.get("/api/teachers/", {"lang": "en"}, HTTP_IF_NONE_MATCH=first["ETag"])
+            detail_not_modified = self.client.get(
+                f"/api/teachers/{teacher_id}/", {"lang": "gu"}, HTTP_IF_NONE_MATCH=detail["ETag"],
+            )
+        self.assertEqual(again.content, first.content)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(detail_not_modified.status_code, 304)
+        self.assertGreaterEqual(teacher_cache.stats()["hits"], 3)
+
+    def test_create_invalidates_cached_pages(self):
+        first = self.client.get("/api/teachers/", {"lang": "en", "page_size": 10})
+        self.client.post("/api/teachers/create/?lang=en")
+        second = self.client.get("/api/teachers/", {"lang": "en", "page_size": 10}, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(len(second.json()), 6)
+
+    def test_other_workers_see_writes_within_the_cache_timeout(self):
+        def worker(name):
+            return override_settings(CACHES={**settings.CACHES, "teachers": {**settings.CACHES["teachers"], "LOCATION": name}})
+
+        with worker("worker-b"):
+            caches["teachers"].clear()
+            self.assertEqual(len(self.client.get("/api/teachers/", {"lang": "en"}).json()), 5)
+        with worker("worker-a"):
+            self.client.post("/api/teachers/create/?lang=en")
+        with worker("worker-b"):
+            self.assertEqual(len(self.client.get("/api/teachers/", {"lang": "en"}).json()), 5)
+            # Each worker's cache is its own; entries live a few seconds.
+            with mock.patch("django.core.cache.backends.locmem.time.time", return_value=time.time() + 6):
+                self.assertEqual(len(self.client.get("/api/teachers/", {"lang": "en"}).json()), 6)
+
+
+class TeacherSearchTests(TestCase):
+
+    def setUp(self):
+        teacher_cache.invalidate()
+        Teacher.objects.bulk_create([
+            Teacher(username_en="Vaishaliben Patel", username_gu="વૈશાલીબેન પટેલ"),
+            Teacher(username_en="Parulben Shah", username_gu="પારૂલબેન શાહ"),
+            Teacher(username_en="Hetal Vaishnav", username_gu="હેતલ વૈષ્ણવ"),
+        ])
+
+    def search(self, q, **params):
+        response = self.client.get("/api/teachers/search/", {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row["username"] for row in response.json()]
+
+    def test_prefix_and_partial_matches_in_both_scripts(self):
+        self.assertEqual(self.search("vaish"), ["Vaishaliben Patel", "Hetal Vaishnav"])
+        self.assertEqual(self.search("shali"), ["Vaishaliben Patel"])
+        self.assertEqual(self.search("PATEL vai"), ["Vaishaliben Patel"])
+        self.assertCountEqual(self.search("બેન", lang="gu"), ["વૈશાલીબેન પટેલ", "પારૂલબેન શાહ"])
+        self.assertEqual(len(self.search("ben", limit=1)), 1)
+        self.assertEqual(self.client.get("/api/teachers/search/", {"q": "va"}).status_code, 400)
+
+    def test_index_follows_bulk_and_single_writes(self):
+        self.assertEqual(self.search("kinjal"), [])
+        Teacher.objects.bulk_create([Teacher(username_en="Kinjal Joshi", username_gu="કિંજલ જોશી")])
+        teacher_cache.invalidate()  # bulk_create sends no signals; the index triggers still ran
+        self.assertEqual(self.search("kinjal"), ["Kinjal Joshi"])
+
+        teacher = Teacher.objects.get(username_en="Parulben Shah")
+        teacher.username_en = "Parul Mehta"
+        teacher.save()
+        self.assertEqual(self.search("mehta"), ["Parul Mehta"])
+        self.assertEqual(self.search("shah"), [])
+        teacher.delete()
+        self.assertEqual(self.search("parul"), [])
+
+    def test_missing_index_falls_back_to_icontains(self):
+        migration = importlib.import_module("myapp.migrations.0005_teacher_search")
+        with connection.cursor() as cursor:
+            for statement in migration.DROP:
+                cursor.execute(statement)
+        with mock.patch.dict(teacher_search._index_exists, clear=True):
+            self.assertEqual(self.search("vaish"), ["Vaishaliben Patel", "Hetal Vaishnav"])
+            self.assertEqual(self.search("પટેલ", lang="gu"), ["વૈશાલીબેન પટેલ"])
+
+
+class TeacherBulkCreateTests(TestCase):
+
+    def test_json_and_csv_rows_are_created(self):
+        rows = [{"username_en": f"Teacher {n}", "username_gu": f"શિક્ષક {n}"} for n in range(3)]
+        response = self.client.post("/api/teachers/bulk/", rows, content_type="application/json")
+        self.assertEqual(response.json(), {"created": 3})
+
+        csv_body = "username_en,username_gu\nAsha Patel,આશા પટેલ\nRina Shah,રીના શાહ\n".encode("utf-8")
+        response = self.client.post("/api/teachers/bulk/", csv_body, content_type="text/csv")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Teacher.objects.count(), 5)
+        self.assertTrue(Teacher.objects.filter(username_gu="રીના શાહ").exists())
+
+    def test_invalid_row_rejects_the_whole_import(self):
+        rows = [{"username_en": "Asha Patel", "username_gu": "આશા પટેલ"}, {"username_en": "No Gujarati"}]
+        response = self.client.post("/api/teachers/bulk/", rows, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("1", response.json()["errors"])
+        self.assertFalse(Teacher.objects.exists())
+
+    def test_concurrent_imports_wait_for_the_write_lock(self):
+        # Each chunk reads before it writes, like bulk_create does; with a
+        # deferred BEGIN all but one of these would fail with "database is locked".
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = type(connections["default"])
+            settings_dict = {**connection.settings_dict, "NAME": os.path.join(directory, "db.sqlite3")}
+            setup = wrapper(settings_dict)
+            with setup.schema_editor() as editor:
+                editor.create_model(Teacher)
+            setup.close()
+            start = threading.Barrier(4)
+            errors = []
+
+            def import_chunk(n):
+                connections["concurrent"] = wrapper(settings_dict, alias="concurrent")
+                start.wait()
+                try:
+                    with transaction.atomic(using="concurrent"):
+                        Teacher.objects.using("concurrent").count()
+                        time.sleep(0.05)
+                        Teacher.objects.using("concurrent").bulk_create(
+                            [Teacher(username_en=f"Teacher {n}", username_gu=f"શિક્ષક {n}")]
+                        )
+                except DatabaseError as error:
+                    errors.append(error)
+                finally:
+                    connections["concurrent"].close()
+
+            threads = [threading.Thread(target=import_chunk, args=(n,)) for n in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+            check = wrapper(settings_dict)
+            with check.cursor() as cursor:
+                cursor.execute("SELECT COUNT(*) FROM myapp_teacher")
+                self.assertEqual(cursor.fetchone()[0], 4)
+            check.close()
+
+
+class SurveyTests(SimpleTestCase):
+
+    def test_precompressed_variants_and_conditional_get(self):
+        plain = self.client.get("/api/survey/gu/")
+        self.assertEqual(plain.json()["questions"][0]["id"], "q1")
+        self.assertIn("max-age=", plain["Cache-Control"])
+
+        gzipped = self.client.get("/api/survey/gu/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(gzipped["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(gzipped.content), plain.content)
+        self.assertNotEqual(gzipped["ETag"], plain["ETag"])
+
+        not_modified = self.client.get("/api/survey/?lang=gu", HTTP_IF_NONE_MATCH=plain["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(self.client.get("/api/survey/fr/").status_code, 400)
+
+    def test_invalid_survey_file_fails_at_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            Path(directory, "en.json").write_text(json.dumps({"surveyTitle": "Survey", "questions": []}))
+            with self.assertRaises(ImproperlyConfigured):
+                surveys.load(directory)
+        self.assertIn("gu", surveys.languages())
+
+
+class SurveyResponseTests(TestCase):
+
+    def test_responses_update_counters_and_summary(self):
+        options = surveys.get("gu").survey.questions[0].options
+        body = [
+            {"school": "s1", "date": "2024-01-01", "answers": {"q1": 0, "q2": 1}},
+            {"school": "s1", "date": "2024-01-02", "lang": "gu", "answers": {"q1": options[0]}},
+            {"school": "s2", "date": "2024-01-01", "answers": {"q1": 1}},
+        ]
+        response = self.client.post("/api/survey/responses/", body, content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {"recorded": 3})
+        self.assertEqual(SurveyResponse.objects.count(), 3)
+
+        self.client.post("/api/survey/responses/", body[0], content_type="application/json")
+        self.assertEqual(SurveyAnswerCount.objects.get(school="s1", date="2024-01-01", question_id="q1", option=0).count, 2)
+
+        summary = self.client.get("/api/survey/summary/", {
+            "school": "s1", "from": "2024-01-01", "to": "2024-01-31", "lang": "gu",
+        }).json()
+        q1 = summary["questions"][0]
+        self.assertEqual(q1["responses"], 3)
+        self.assertEqual(q1["options"][0], {"text": options[0], "count": 3})
+        self.assertEqual(summary["questions"][1]["options"][1]["count"], 2)
+
+    def test_invalid_answers_are_rejected(self):
+        for answers in ({"q1": 99}, {"nope": 0}, {"q1": "not an option"}):
+            response = self.client.post(
+                "/api/survey/responses/", {"school": "s1", "answers": answers}, content_type="application/json",
+            )
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(SurveyAnswerCount.objects.exists())
+        self.assertEqual(self.client.get("/api/survey/summary/").status_code, 400)
+
+
+class VerificationReportTests(TestCase):
+
+    def setUp(self):
+        def stored(school, day, menu, missing):
+            return {
+                "school": school, "teacher_id": None, "date": date.fromisoformat(day), "lang": "en", "menu": menu,
+                "detected_items": [], "found_items": [item for item in menu if item not in missing],
+                "missing_items": missing, "nutritions": {},
+            }
+
+        history.write([
+            stored("s1", "2024-01-01", ["rice", "dal"], ["dal"]),
+            stored("s1", "2024-01-02", ["rice", "dal"], []),
+            stored("s2", "2024-01-01", ["rice", "dal", "salad", "roti"], ["dal", "salad", "roti"]),
+        ])
+        history.write([stored("s1", "2024-01-01", ["rice", "dal"], ["dal"])])
+
+    def report(self, **params):
+        response = self.client.get("/api/verify-menu/report/", {"from": "2024-01-01", "to": "2024-01-31", **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["rows"]
+
+    def test_reports_aggregate_the_rollups(self):
+        self.assertEqual(VerificationDailyCount.objects.count(), 3)
+        self.assertEqual(MissingItemCount.objects.get(school="s1", item="dal").count, 2)
+
+        self.assertEqual(self.report(by="day"), [
+            {"date": "2024-01-01", "verifications": 3, "menu_items": 8, "missing_items": 5, "missing_rate": 0.625},
+            {"date": "2024-01-02", "verifications": 1, "menu_items": 2, "missing_items": 0, "missing_rate": 0.0},
+        ])
+        self.assertEqual([row["school"] for row in self.report(by="school")], ["s2", "s1"])
+        self.assertEqual(self.report(by="school", school="s1")[0]["missing_rate"], round(2 / 6, 4))
+        self.assertEqual(self.report(by="item", limit=1), [{"item": "dal", "missing": 3}])
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in ({"by": "week"}, {"from": "2024-02-01", "to": "2024-01-01"}, {"from": "2020-01-01"},
+                       {"limit": "0"}, {"to": "soon"}):
+            response = self.client.get("/api/verify-menu/report/", {"to": "2024-01-31", **params})
+            self.assertEqual(response.status_code, 400, params)
+
+
+class VerificationWriterTests(SimpleTestCase):
+
+    def test_writes_in_batches_and_inline_when_the_queue_is_full(self):
+        written = []
+        release = threading.Event()
+
+        def slow_write(batch):
+            release.wait(5)
+            written.append(list(batch))
+
+        with mock.patch.object(history, "write", side_effect=slow_write):
+            writer = history.Writer(max_queue=2, batch_size=10)
+            queued = 0
+            while writer.put(queued):
+                queued += 1
+            with mock.patch.object(history, "_writer", writer), \
+                    override_settings(VERIFY_MENU_HISTORY={"ASYNC": True}):
+                release.set()
+                history.record("overflow")
+                history.flush()
+
+        self.assertIn(["overflow"], written)
+        self.assertEqual(sorted(item for batch in written for item in batch if item != "overflow"), list(range(queued)))
+        self.assertLess(len(written), queued + 1)
+
+    async def test_a_failed_inline_write_is_logged_and_dropped(self):
+        with mock.patch.object(history, "write", side_effect=DatabaseError("database is locked")), \
+                override_settings(VERIFY_MENU_HISTORY={"ASYNC": False}):
+            with self.assertLogs("myapp.history", "ERROR"):
+                history.record("entry")
+            with self.assertLogs("myapp.history", "ERROR"):
+                await history.arecord("entry")
+
+
+def admission_settings(**overrides):
+    return override_settings(VERIFY_MENU_ADMISSION={
+        **admission.DEFAULTS, "CACHE": "admission", "QUEUE_TIMEOUT": 0.05, "POLL_INTERVAL": 0.01, **overrides,
+    })
+
+
+class AdmissionTests(TestCase):
+
+    def setUp(self):
+        caches["admission"].clear()
+        self.addCleanup(caches["admission"].clear)
+
+    @admission_settings(RATE=1.0, BURST=2)
+    def test_clients_over_their_rate_get_429(self):
+        # Admitted requests reach the view, which refuses the empty form.
+        statuses = [self.client.post("/api/verify-menu/", {"lang": "en"}).status_code for _ in range(3)]
+        self.assertEqual(statuses, [400, 400, 429])
+        response = self.client.post("/api/verify-menu/", {"lang": "en"}, REMOTE_ADDR="10.0.0.2")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post("/api/verify-menu/", {"lang": "en"})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "1")
+
+    @admission_settings(MAX_IN_FLIGHT=1, MAX_QUEUE=1)
+    def test_saturated_verify_menu_sheds_load_but_cheap_routes_keep_working(self):
+        slot = admission.admission().try_acquire()
+        self.assertIsNotNone(slot)
+
+        # One request waits its turn and times out; with the queue full the next is refused at once.
+        response = self.client.post("/api/verify-menu/", {"lang": "en"})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "5")
+        controller = admission.admission()
+        controller.join_queue()
+        response = self.client.post("/api/verify-menu/", {"lang": "en"})
+        self.assertEqual(response.json()["error"], "Verification queue is full")
+        controller.leave_queue()
+
+        self.assertEqual(self.client.get("/api/survey/en/").status_code, 200)
+        self.assertEqual(self.client.get("/api/teachers/").status_code, 200)
+
+        controller.release(slot)
+        self.assertEqual(self.client.post("/api/verify-menu/", {"lang": "en"}).status_code, 400)
+        self.assertEqual(controller.stats(), {"in_flight": 0, "waiting": 0})
+
+    @admission_settings(MAX_IN_FLIGHT=2)
+    def test_workers_sharing_a_cache_share_the_in_flight_cap(self):
+        first, second = admission.Admission(admission.options()), admission.Admission(admission.options())
+        self.assertIsNotNone(first.try_acquire())
+        self.assertIsNotNone(second.try_acquire())
+        self.assertIsNone(first.try_acquire())
+        self.assertIsNone(second.try_acquire())
+
+    @admission_settings(CACHE="verify_menu", RATE=1.0, BURST=1)
+    async def test_async_views_with_a_database_cache(self):
+        await caches["verify_menu"].aclear()
+        statuses = [(await self.async_client.post(url, {"lang": "en"})).status_code for url in (
+            "/api/verify-menu/async/", "/api/verify-menu/batch/",
+        )]
+        self.assertEqual(statuses, [400, 429])
+        self.assertEqual(admission.stats(), {"in_flight": 0, "waiting": 0})
+
+
+class JSONRenderingTests(SimpleTestCase):
+
+    DATA = {
+        "name": "વૈશાલીબેન પટેલ",
+        "at": datetime(2024, 1, 2, 3, 4, 5, 678000, tzinfo=dt_timezone.utc),
+        "day": date(2024, 1, 2),
+        "amount": Decimal("1.5"),
+        1: [True, None, 2.5],
+    }
+
+    def test_utf8_output_matches_drf_with_and_without_orjson(self):
+        body = renderers.dumps(self.DATA)
+        self.assertIn("વૈશાલીબેન".encode("utf-8"), body)
+        self.assertEqual(json.loads(body), {
+            "name": "વૈશાલીબેન પટેલ", "at": "2024-01-02T03:04:05.678000Z", "day": "2024-01-02", "amount": 1.5,
+            "1": [True, None, 2.5],
+        })
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertEqual(renderers.dumps(self.DATA), body)
+
+    @override_settings(JSON_RESPONSES={"GZIP_MIN_BYTES": 100})
+    def test_large_bodies_are_gzipped_when_accepted(self):
+        factory = RequestFactory()
+        data = {"items": ["ભાત"] * 100}
+        response = renderers.JSONResponse(data, request=factory.get("/", HTTP_ACCEPT_ENCODING="gzip, br"))
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(response.content)), data)
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+
+        self.assertFalse(renderers.JSONResponse(data, request=factory.get("/")).has_header("Content-Encoding"))
+        small = renderers.JSONResponse({"ok": 1}, request=factory.get("/", HTTP_ACCEPT_ENCODING="gzip"))
+        self.assertEqual(small.content, b'{"ok":1}')
+
+
+class LoadTestTests(SimpleTestCase):
+
+    def test_every_url_has_a_scenario(self):
+        self.assertEqual(loadtest.unrouted(), [])
+
+    def test_fake_server_answers_malformed_bodies_with_400(self):
+        server = FakeOpenAIServer(latency=0).start()
+        self.addCleanup(server.stop)
+        url = f"{server.base_url}/chat/completions"
+        for body in (b"", b'{"model": "gpt-4o"}', b'{"messages": []}', b'{"messages": [{"role": "us'):
+            response = httpx.post(url, content=body, headers={"Content-Type": "application/json"})
+            self.assertEqual(response.status_code, 400, body)
+            self.assertEqual(response.json()["error"]["type"], "invalid_request_error")
+        self.assertEqual(server.request_count, 0)
+
+    def test_compare_flags_regressions_beyond_tolerance_and_noise(self):
+        def report(p95_ms, rps, error_rate=0.0):
+            stats = {"p50_ms": 1.0, "p95_ms": p95_ms, "p99_ms": p95_ms, "rps": rps, "error_rate": error_rate, "peak_rss_mb": 80.0}
+            return {"servers": {"wsgi": {"routes": {"verify-menu": stats}}}}
+
+        baseline = report(p95_ms=100.0, rps=50.0)
+        self.assertEqual(loadtest.compare(report(p95_ms=115.0, rps=45.0), baseline, 0.2), [])
+        self.assertEqual(loadtest.compare(report(p95_ms=1.5, rps=50.0), report(p95_ms=1.0, rps=50.0), 0.2), [])
+        regressions = loadtest.compare(report(p95_ms=130.0, rps=30.0, error_rate=0.1), baseline, 0.2)
+        self.assertEqual(
+            [(metric, before, after) for _, _, metric, before, after in regressions],
+            [("p95_ms", 100.0, 130.0), ("p99_ms", 100.0, 130.0), ("rps", 50.0, 30.0), ("error_rate", 0.0, 0.1)],
+        )
+
+
+def production_profile():
+    with mock.patch.dict(os.environ, {"DJANGO_SECRET_KEY": "test"}):
+        production = importlib.import_module("root.settings_production")
+    return override_settings(**{
+        name: getattr(production, name)
+        for name in ("DEBUG", "MIDDLEWARE", "API_PATH_PREFIXES", "BROWSER_MIDDLEWARE", "REST_FRAMEWORK")
+    })
+
+
+def form_view(request):
+    return HttpResponse("saved")
+
+
+# For tests that need a browser view with no csrf_protect of its own.
+urlpatterns = [
+    path("form/", form_view),
+    path("", include("root.urls")),
+]
+
+
+class ProductionProfileTests(TestCase):
+
+    def test_api_skips_browser_middleware_but_admin_keeps_it(self):
+        Teacher.objects.create(username_en="A", username_gu="અ")
+        with production_profile():
+            response = self.client.get("/api/teachers/", {"lang": "en"}, HTTP_ACCEPT="text/html")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["Content-Type"], "application/json")
+            self.assertNotIn("X-Frame-Options", response)
+            self.assertNotIn("Cookie", response.get("Vary", ""))
+
+            response = self.client.get("/admin/login/")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["X-Frame-Options"], "DENY")
+            self.assertIn("csrftoken", response.cookies)
+
+    @override_settings(ROOT_URLCONF="myapp.tests")
+    def test_browser_posts_without_a_csrf_token_are_refused(self):
+        client = Client(enforce_csrf_checks=True)
+        with production_profile():
+            self.assertEqual(client.post("/form/", {"name": "Asha"}).status_code, 403)
+            response = client.post("/api/verify-menu/jobs/", {"lang": "en", "menu": "Rice"})
+            self.assertEqual(response.status_code, 400)
+
+    def test_uploads_still_parse_forms(self):
+        with production_profile():
+            response = self.client.post("/api/verify-menu/jobs/", {"lang": "en", "menu": "Rice"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Missing menu or image"})
+
+
+class OpenAPISchemaTests(SimpleTestCase):
+
+    def setUp(self):
+        openapi.clear()
+        self.addCleanup(openapi.clear)
+
+    def test_document_is_generated_once_with_etag(self):
+        with mock.patch.object(openapi, "generate", wraps=openapi.generate) as generate:
+            response = self.client.get("/swagger.json/")
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("/teachers/", response.json()["paths"])
+            self.assertEqual(self.client.get("/swagger.yaml/")["Content-Type"], "application/yaml")
+            cached = self.client.get("/swagger.json/", HTTP_IF_NONE_MATCH=response["ETag"])
+            self.assertEqual(cached.status_code, 304)
+        self.assertEqual(generate.call_count, 1)
+
+    def test_pre_generated_file_is_served_without_generating(self):
+        with tempfile.TemporaryDirectory() as directory:
+            call_command("generate_openapi", "--output-dir", directory, stdout=io.StringIO())
+            openapi.clear()
+            with override_settings(OPENAPI_SCHEMA_DIR=directory), \
+                    mock.patch.object(openapi, "generate", side_effect=AssertionError("generated")):
+                response = self.client.get("/swagger.json/")
+                self.assertEqual(response.content, (Path(directory) / "swagger.json").read_bytes())
@@ -0,0 +1,174 @@
+"""
+Bilingual dish and label dictionary for verify-menu results.
+
+The vision calls always run in English: Gujarati script costs several times
+as many tokens as the same English text, so Gujarati replies were slower,
+dearer and hit ``max_tokens`` sooner.  Results for ``lang=gu`` are rendered
+here instead, from an in-memory dictionary keyed by the menu matcher's
+canonical key:
+
+* dish names from ``NutritionFact`` (``name_gu`` for ``name_en`` and its
+  aliases) and from ``Translation`` rows, which take precedence;
+* nutrient and unit labels from ``LABELS``, overridden by ``Translation``
+  rows of kind "label".
+
+Names the dictionary does not have are translated by the model in one small
+text-only call (``pipeline.translate``) and stored as ``Translation`` rows,
+so each one is asked about once; correct them in the admin.  Like
+``nutrition_kb``, lookups never touch the database and ``refresh()``
+reloads the dictionary when it changed or is older than ``RELOAD_INTERVAL``.
+"""
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .matching import canonical_key
+from .nutrition_kb import UNITS
+
+DEFAULTS = {
+    "TRANSLATE_UNKNOWN": True,
+    "RELOAD_INTERVAL": 300,
+}
+
+# Languages results can be rendered in, by the name the model knows them by.
+LANGUAGES = {"gu": "Gujarati"}
+
+LABELS = {
+    "gu": {
+        "calories": "કૅલરી",
+        "protein": "પ્રોટીન",
+        "fat": "ચરબી",
+        "carbs": "કાર્બોહાઇડ્રેટ",
+        "kcal": "કિ.કૅલરી",
+        "g": "ગ્રામ",
+    },
+}
+LABEL_KEYS = [*UNITS, *dict.fromkeys(UNITS.values())]
+
+_lock = threading.Lock()
+_dishes = {}
+_labels = {}
+_loaded_at = None
+counters = {"hits": 0, "misses": 0, "translated": 0}
+
+
+def options():
+    return {**DEFAULTS, **getattr(settings, "VERIFY_MENU_TRANSLATIONS", {})}
+
+
+def load():
+    """Rebuild the in-memory dictionary from the database."""
+    from .models import NutritionFact, Translation
+
+    dishes = {lang: {} for lang in LANGUAGES}
+    labels = {lang: dict(LABELS.get(lang, {})) for lang in LANGUAGES}
+    for fact in NutritionFact.objects.exclude(name_gu="").only("name_en", "name_gu", "aliases"):
+        for name in (fact.name_en, *fact.aliases.split("|")):
+            key = canonical_key(name)
+            if key:
+                dishes["gu"].setdefault(key, fact.name_gu)
+    for row in Translation.objects.filter(lang__in=list(LANGUAGES)):
+        if row.kind == Translation.LABEL:
+            labels[row.lang][row.name_en] = row.name
+        elif canonical_key(row.name_en):
+            dishes[row.lang][canonical_key(row.name_en)] = row.name
+
+    global _dishes, _labels, _loaded_at
+    with _lock:
+        _dishes, _labels, _loaded_at = dishes, labels, time.monotonic()
+    return dishes
+
+
+def invalidate():
+    global _loaded_at
+    with _lock:
+        _loaded_at = None
+
+
+def stale():
+    return _loaded_at is None or time.monotonic() - _loaded_at > options()["RELOAD_INTERVAL"]
+
+
+def refresh():
+    if stale():
+        load()
+
+
+async def arefresh():
+    if stale():
+        await sync_to_async(load)()
+
+
+def localized(lang):
+    """Whether results in ``lang`` are rendered from the dictionary (anything but English)."""
+    return lang in LANGUAGES
+
+
+def unknown(lang, names):
+    """``names`` (without duplicates) the dictionary has no ``lang`` entry for."""
+    if not localized(lang):
+        return []
+    table = _dishes.get(lang, {})
+    return [name for name in dict.fromkeys(names) if canonical_key(name) and canonical_key(name) not in table]
+
+
+def names_in(lang, names):
+    """``{name: local name}`` for the ``names`` the dictionary knows; updates the counters."""
+    if not localized(lang):
+        return {}
+    table = _dishes.get(lang, {})
+    names = list(dict.fromkeys(names))
+    local = {}
+    for name in names:
+        translated = table.get(canonical_key(name))
+        if translated:
+            local[name] = translated
+    with _lock:
+        counters["hits"] += len(local)
+        counters["misses"] += len(names) - len(local)
+    return local
+
+
+def labels(lang):
+    if not localized(lang):
+        return {}
+    table = _labels.get(lang) or LABELS.get(lang, {})
+    return {key: table[key] for key in LABEL_KEYS if key in table}
+
+
+def store(lang, translations):
+    """
+    Keep ``{name_en: local name}`` pairs the model translated, without
+    overwriting entries already in the table (an admin may have fixed them).
+    """
+    from .models import Translation
+
+    rows = [
+        Translation(kind=Translation.DISH, lang=lang, name_en=name[:100], name=local[:100], source=Translation.MODEL)
+        for name, local in translations.items()
+        if canonical_key(name) and local
+    ]
+    if not rows:
+        return 0
+    Translation.objects.bulk_create(rows, ignore_conflicts=True)
+    with _lock:
+        table = _dishes.setdefault(lang, {})
+        for row in rows:
+            table.setdefault(canonical_key(row.name_en), row.name)
+        counters["translated"] += len(rows)
+    return len(rows)
+
+
+async def astore(lang, translations):
+    return await sync_to_async(store)(lang, translations)
+
+
+def stats():
+    with _lock:
+        snapshot = dict(counters)
+        snapshot["entries"] = sum(len(table) for table in _dishes.values())
+    lookups = snapshot["hits"] + snapshot["misses"]
+    snapshot["hit_rate"] = round(snapshot["hits"] / lookups, 4) if lookups else 0.0
+    return snapshot
@@ -0,0 +1,143 @@
+"""
+Streaming upload handling for verify-menu images.
+
+``ImageUploadHandler`` is installed as the only upload handler for the
+verify-menu views.  It hashes the ``image`` part as Django's multipart parser
+reads it and never writes it to disk.  When images are downscaled before the
+vision call (see ``myapp.images``) the raw bytes are collected in one buffer
+for Pillow; otherwise they are base64-encoded chunk by chunk into a single
+buffer that already starts with the ``data:`` URL prefix, so the raw image is
+never held in memory as a whole.
+
+Oversized uploads are refused from the ``Content-Length`` header before any
+of the body is read, and non-image uploads from the part's content type and
+its first bytes.  With ``skip_invalid`` (the batch endpoint) a bad file is
+skipped and recorded in ``file_errors`` instead of stopping the upload.
+"""
+import base64
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopUpload
+from django.http import QueryDict
+from django.utils.datastructures import MultiValueDict
+
+# Room for the lang/menu fields and multipart boundaries on top of the image.
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+
+def sniff_image_type(head):
+    """Return the image MIME type for the leading bytes of a file, or ``None``."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head.startswith(b"RIFF") and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    return None
+
+
+class EncodedImage(UploadedFile):
+    """
+    An uploaded image kept in memory with its SHA-256.
+
+    Holds either the ``raw`` bytes (to be downscaled) or the base64
+    ``data_url``; the data URL is built once and shared by every LLM call
+    for the request.
+    """
+
+    def __init__(self, name, content_type, size, digest, data_url=None, raw=None):
+        super().__init__(file=None, name=name, content_type=content_type, size=size)
+        self.digest = digest
+        self.data_url = data_url
+        self.raw = raw
+
+    def close(self):
+        pass
+
+
+class ImageUploadHandler(FileUploadHandler):
+    # A multiple of 3 keeps most chunks free of base64 padding carry-over.
+    chunk_size = 64 * 1023
+
+    def __init__(self, field_names=("image",), max_bytes=None, keep_raw=False, skip_invalid=False):
+        # Deliberately not holding on to the request: request -> handler ->
+        # request would be a cycle keeping the whole image alive until the
+        # next full garbage collection.
+        super().__init__(None)
+        self.field_names = frozenset(field_names)
+        self.max_bytes = max_bytes or settings.VERIFY_MENU_MAX_IMAGE_BYTES
+        self.keep_raw = keep_raw
+        self.skip_invalid = skip_invalid
+        self.error = None
+        self.file_errors = {}
+
+    def reject(self, message, status):
+        """Refuse the whole upload."""
+        self.error = (message, status)
+        raise StopUpload(connection_reset=True)
+
+    def reject_file(self, message, status):
+        """Refuse the current file; with ``skip_invalid`` the rest of the upload is still parsed."""
+        if not self.skip_invalid:
+            self.reject(message, status)
+        self.file_errors[self.field_name] = (message, status)
+        self.buffer = None
+        raise SkipFile()
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length > self.max_bytes * len(self.field_names) + FORM_OVERHEAD_BYTES:
+            # Django calls this outside its StopUpload handling: record the
+            # error and hand back an empty form instead of raising.
+            self.error = (f"Upload too large. Maximum size is {self.max_bytes} bytes per image", 413)
+            return QueryDict(), MultiValueDict()
+        return None
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.buffer = None
+        if field_name not in self.field_names:
+            raise SkipFile()
+        if content_type and not content_type.startswith("image/"):
+            self.reject_file("Upload must be an image", 415)
+        self.carry = b""
+        self.size = 0
+        self.hasher = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.buffer is None:
+            image_type = sniff_image_type(raw_data[:12])
+            if image_type is None:
+                self.reject_file("Upload must be a JPEG, PNG, WebP or GIF image", 415)
+            self.content_type = image_type
+            self.buffer = bytearray() if self.keep_raw else bytearray(f"data:{image_type};base64,".encode("ascii"))
+
+        self.size += len(raw_data)
+        if self.size > self.max_bytes:
+            self.reject_file(f"Image too large. Maximum size is {self.max_bytes} bytes", 413)
+
+        self.hasher.update(raw_data)
+        if self.keep_raw:
+            self.buffer += raw_data
+            return None
+
+        data = self.carry + raw_data if self.carry else raw_data
+        usable = len(data) - len(data) % 3
+        self.buffer += base64.b64encode(data[:usable])
+        self.carry = data[usable:]
+        return None
+
+    def file_complete(self, file_size):
+        if self.buffer is None:
+            return None
+        if self.keep_raw:
+            raw, self.buffer = self.buffer, None
+            return EncodedImage(self.file_name, self.content_type, file_size, self.hasher.hexdigest(), raw=raw)
+
+        self.buffer += base64.b64encode(self.carry)
+        data_url = self.buffer.decode("ascii")
+        self.buffer = None
+        return EncodedImage(self.file_name, self.content_type, file_size, self.hasher.hexdigest(), data_url)
@@ -1,23 +1,45 @@
 from django.urls import path
+from .admission import admission_controlled
 from .views import (
     TeacherCreateAPIView,
+    TeacherBulkCreateAPIView,
     TeacherListAPIView,
+    TeacherSearchAPIView,
     TeacherDetailAPIView,
     SurveyAPIView,
+    SurveyResponseCreateAPIView,
+    SurveySummaryAPIView,
     UploadImage,
+    AsyncUploadImage,
+    BatchUploadImage,
+    VerifyJobSubmitAPIView,
+    VerifyJobStatusView,
+    VerificationReportAPIView,
+    MetricsView,
 )
 
 urlpatterns = [
     # Teacher APIs
     path('api/teachers/', TeacherListAPIView.as_view(), name='teacher-list'),
     path('api/teachers/create/', TeacherCreateAPIView.as_view(), name='teacher-create'),
+    path('api/teachers/bulk/', TeacherBulkCreateAPIView.as_view(), name='teacher-bulk-create'),
+    path('api/teachers/search/', TeacherSearchAPIView.as_view(), name='teacher-search'),
     path('api/teachers/<int:pk>/', TeacherDetailAPIView.as_view(), name='teacher-detail'),
 
     # Survey API
     path('api/survey/', SurveyAPIView.as_view(), name='get-survey'),
+    path('api/survey/responses/', SurveyResponseCreateAPIView.as_view(), name='survey-response-create'),
+    path('api/survey/summary/', SurveySummaryAPIView.as_view(), name='survey-summary'),
     path('api/survey/<str:lang>/', SurveyAPIView.as_view(), name='get-survey-lang'),
 
     # Image Menu Verification
-    path('api/verify-menu/', UploadImage.as_view(), name='verify-menu'),
+    path('api/verify-menu/', admission_controlled(UploadImage.as_view()), name='verify-menu'),
+    path('api/verify-menu/async/', admission_controlled(AsyncUploadImage.as_view()), name='verify-menu-async'),
+    path('api/verify-menu/batch/', admission_controlled(BatchUploadImage.as_view()), name='verify-menu-batch'),
+    path('api/verify-menu/jobs/', VerifyJobSubmitAPIView.as_view(), name='verify-menu-job-submit'),
+    path('api/verify-menu/jobs/<uuid:job_id>/', VerifyJobStatusView.as_view(), name='verify-menu-job'),
+    path('api/verify-menu/report/', VerificationReportAPIView.as_view(), name='verify-menu-report'),
 
+    # Monitoring
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 ]
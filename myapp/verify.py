@@ -0,0 +1,88 @@
+"""
+End-to-end verification of uploaded plate photos.
+
+Ties together the result cache, image preprocessing and the GPT pipeline so
+the single-image views and the batch endpoint go through the same steps.
+"""
+import asyncio
+import weakref
+
+from django.conf import settings
+
+from . import images, metrics, nutrition_kb, pipeline, translations
+from .result_cache import result_cache
+
+BATCH_DEFAULTS = {
+    "MAX_ITEMS": 20,
+    "CONCURRENCY": 8,
+}
+
+
+def batch_options():
+    return {**BATCH_DEFAULTS, **getattr(settings, "VERIFY_MENU_BATCH", {})}
+
+
+def verify(client, image, lang, menu_list):
+    """
+    Verify one image with the sequential pipeline; returns ``(result, cache_hit)``.
+    The model's (English) answer is cached for every language.
+    """
+    nutrition_kb.refresh()
+    translations.refresh()
+    cache_key = result_cache.make_key(image.digest)
+    with metrics.stage("cache"):
+        cached = result_cache.get(cache_key)
+    if cached is not None:
+        return pipeline.render(client, lang, menu_list, cached["items_food"], cached["nutritions"]), True
+
+    with metrics.stage("image_prep"):
+        image_url = images.prepare_in_pool(image)
+    detected_items, nutritions = pipeline.detect(client, image_url)
+    result_cache.set(cache_key, {"items_food": detected_items, "nutritions": nutritions})
+    return pipeline.render(client, lang, menu_list, detected_items, nutritions), False
+
+
+async def averify(client, image, lang, menu_list, mode="parallel"):
+    """Async counterpart of ``verify`` for an ``AsyncOpenAI`` client."""
+    await nutrition_kb.arefresh()
+    await translations.arefresh()
+    cache_key = result_cache.make_key(image.digest, mode)
+    with metrics.stage("cache"):
+        cached = await result_cache.aget(cache_key)
+    if cached is not None:
+        return await pipeline.arender(client, lang, menu_list, cached["items_food"], cached["nutritions"]), True
+
+    with metrics.stage("image_prep"):
+        image_url = await images.aprepare(image)
+    detected_items, nutritions = await pipeline.adetect(client, image_url, mode=mode)
+    await result_cache.aset(cache_key, {"items_food": detected_items, "nutritions": nutritions})
+    return await pipeline.arender(client, lang, menu_list, detected_items, nutritions), False
+
+
+# One semaphore per event loop, shared by every batch request the loop serves,
+# so the total number of images in flight stays at VERIFY_MENU_BATCH["CONCURRENCY"].
+_batch_pools = weakref.WeakKeyDictionary()
+
+
+def batch_pool():
+    loop = asyncio.get_running_loop()
+    semaphore = _batch_pools.get(loop)
+    if semaphore is None:
+        semaphore = _batch_pools[loop] = asyncio.Semaphore(batch_options()["CONCURRENCY"])
+    return semaphore
+
+
+async def averify_batch(client, items, lang, mode="parallel", pool=None):
+    """
+    Verify ``items`` (``(image, menu_list)`` pairs) through a bounded pool.
+
+    Returns one outcome per item, in order: a ``(result, cache_hit)`` tuple or
+    the exception that item raised.
+    """
+    pool = pool or batch_pool()
+
+    async def one(image, menu_list):
+        async with pool:
+            return await averify(client, image, lang, menu_list, mode=mode)
+
+    return await asyncio.gather(*(one(image, menu_list) for image, menu_list in items), return_exceptions=True)
@@ -1,19 +1,31 @@
-import base64
-import os
+import asyncio
+import hashlib
+import math
 import random
-import re
-import tempfile
-from http import client
-from django.utils.regex_helper import normalize
+import time
+from datetime import date
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views import View
 from django.views.decorators.csrf import csrf_exempt
-from openai import OpenAI
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Teacher
-from .serializers import TeacherSerializer
-
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from .models import Teacher, VerifyJob
+from .parsers import CSVParser
+from .renderers import JSONResponse
+from .serializers import SurveyResponseSerializer, TeacherSerializer
+from . import history, images, jobs, llm, metrics, openapi, pipeline, survey_stats, surveys, teacher_cache, teacher_search
+from .streaming import aiter_chunks, json_array_stream
+from .uploads import ImageUploadHandler
+from .verify import averify, averify_batch, batch_options, verify
 
 class TeacherCreateAPIView(APIView):
     def post(self, request):
@@ -46,257 +58,559 @@ class TeacherCreateAPIView(APIView):
         return Response(TeacherSerializer(teacher).data, status=status.HTTP_201_CREATED)
 
 
+class TeacherBulkCreateAPIView(APIView):
+    """
+    Create many teachers at once from a JSON array or a CSV file.
+
+    Rows need ``username_en`` and ``username_gu``.  Everything is validated
+    first; on success the rows are written with ``bulk_create`` in
+    transactions of ``TEACHERS_BULK_CHUNK_SIZE`` rows.
+    """
+    parser_classes = [JSONParser, CSVParser]
+
+    def post(self, request):
+        rows = request.data
+        if not isinstance(rows, list) or not rows:
+            return Response({'error': 'Expected a non-empty JSON array or CSV file'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > settings.TEACHERS_BULK_MAX_ROWS:
+            return Response(
+                {'error': f'Too many rows. Maximum is {settings.TEACHERS_BULK_MAX_ROWS} per request'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = TeacherSerializer(data=rows, many=True)
+        if not serializer.is_valid():
+            errors = {index: error for index, error in enumerate(serializer.errors) if error}
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        teachers = [Teacher(**row) for row in serializer.validated_data]
+        chunk_size = settings.TEACHERS_BULK_CHUNK_SIZE
+        for start in range(0, len(teachers), chunk_size):
+            with transaction.atomic():
+                Teacher.objects.bulk_create(teachers[start:start + chunk_size])
+        # bulk_create sends no post_save signals.
+        teacher_cache.invalidate()
+
+        return Response({'created': len(teachers)}, status=status.HTTP_201_CREATED)
+
+
 class TeacherListAPIView(APIView):
+    """
+    Teachers ordered by id, one page at a time.
+
+    ``?after=<id>`` continues from the last id of the previous page (keyset
+    pagination) and ``?page_size=`` picks the page length, up to
+    ``TEACHERS_MAX_PAGE_SIZE``.  When there are more rows the response has a
+    ``Link: <...>; rel="next"`` header.  ``?stream=1`` returns the full list
+    instead, encoded row by row as it is read from the database.
+    """
+
     def get(self, request):
         lang = request.query_params.get('lang', 'en')
         if lang not in ['en', 'gu']:
             return Response({'error': 'Invalid language'}, status=status.HTTP_400_BAD_REQUEST)
 
-        teachers = Teacher.objects.all()
-        data = []
-        for teacher in teachers:
-            data.append({
-                "id": teacher.id,
-                "username": teacher.username_en if lang == 'en' else teacher.username_gu
-            })
-        return Response(data, status=status.HTTP_200_OK)
+        rows = Teacher.objects.order_by('id').values_list('id', 'username_en' if lang == 'en' else 'username_gu')
 
-class TeacherDetailAPIView(APIView):
-    def get(self, request, pk):
+        if request.query_params.get('stream') in ('1', 'true'):
+            chunks = json_array_stream(rows.iterator(chunk_size=2000), lambda row: {"id": row[0], "username": row[1]})
+            if isinstance(request._request, ASGIRequest):
+                chunks = aiter_chunks(chunks)
+            return StreamingHttpResponse(chunks, content_type='application/json')
+
+        try:
+            after = int(request.query_params.get('after', 0))
+            page_size = int(request.query_params.get('page_size', settings.TEACHERS_PAGE_SIZE))
+        except ValueError:
+            return Response({'error': "'after' and 'page_size' must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+        page_size = min(max(page_size, 1), settings.TEACHERS_MAX_PAGE_SIZE)
+
+        key = teacher_cache.make_key('list', lang, after, page_size)
+        with metrics.stage('cache'):
+            entry = teacher_cache.get(key)
+        if entry is None:
+            with metrics.stage('db'):
+                page = list(rows.filter(id__gt=after)[:page_size + 1])
+            data = [{"id": teacher_id, "username": username} for teacher_id, username in page[:page_size]]
+            headers = {}
+            if len(page) > page_size:
+                query = urlencode({'lang': lang, 'after': data[-1]['id'], 'page_size': page_size})
+                headers['Link'] = f'<{request.build_absolute_uri(request.path)}?{query}>; rel="next"'
+            entry = teacher_cache.store(key, data, headers)
+        return teacher_cache.respond(request, entry)
+
+class TeacherSearchAPIView(APIView):
+    """
+    Teachers whose English or Gujarati name contains every word of ``?q=``
+    (three characters or more), best matches first; see ``myapp.teacher_search``.
+
+    ``?limit=`` caps the results (default ``TEACHERS_SEARCH_RESULTS``, at most
+    ``TEACHERS_SEARCH_MAX_RESULTS``).  Results are cached like the list pages.
+    """
 
+    def get(self, request):
         lang = request.query_params.get('lang', 'en')
         if lang not in ['en', 'gu']:
             return Response({'error': 'Invalid language'}, status=status.HTTP_400_BAD_REQUEST)
 
+        words = teacher_search.terms(request.query_params.get('q', ''))
+        if not words:
+            return Response(
+                {'error': f"'q' needs a word of at least {teacher_search.MIN_TERM_LENGTH} characters"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         try:
-            teacher = Teacher.objects.get(pk=pk)
-        except Teacher.DoesNotExist:
-            return Response({'error': 'Teacher not found'}, status=status.HTTP_404_NOT_FOUND)
+            limit = int(request.query_params.get('limit', settings.TEACHERS_SEARCH_RESULTS))
+        except ValueError:
+            return Response({'error': "'limit' must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        limit = min(max(limit, 1), settings.TEACHERS_SEARCH_MAX_RESULTS)
+
+        digest = hashlib.sha256(' '.join(words).casefold().encode('utf-8')).hexdigest()[:32]
+        key = teacher_cache.make_key('search', lang, limit, digest)
+        with metrics.stage('cache'):
+            entry = teacher_cache.get(key)
+        if entry is None:
+            with metrics.stage('db'):
+                rows = teacher_search.search(words, limit)
+            data = [
+                {"id": teacher_id, "username": username_en if lang == 'en' else username_gu}
+                for teacher_id, username_en, username_gu in rows
+            ]
+            entry = teacher_cache.store(key, data)
+        return teacher_cache.respond(request, entry)
+
+
+class TeacherDetailAPIView(APIView):
+    def get(self, request, pk):
+
+        lang = request.query_params.get('lang', 'en')
+        if lang not in ['en', 'gu']:
+            return Response({'error': 'Invalid language'}, status=status.HTTP_400_BAD_REQUEST)
 
-        data = {
-            "id": teacher.id,
-            "username": teacher.username_en if lang == 'en' else teacher.username_gu
-        }
-        return Response(data, status=status.HTTP_200_OK)
+        key = teacher_cache.make_key('detail', lang, pk)
+        with metrics.stage('cache'):
+            entry = teacher_cache.get(key)
+        if entry is None:
+            try:
+                with metrics.stage('db'):
+                    teacher = Teacher.objects.get(pk=pk)
+            except Teacher.DoesNotExist:
+                return Response({'error': 'Teacher not found'}, status=status.HTTP_404_NOT_FOUND)
+
+            data = {
+                "id": teacher.id,
+                "username": teacher.username_en if lang == 'en' else teacher.username_gu
+            }
+            entry = teacher_cache.store(key, data)
+        return teacher_cache.respond(request, entry)
 
-from django.http import JsonResponse
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 
 class SurveyAPIView(APIView):
+    """
+    The food service survey for a language, from ``myapp/survey_data``.
+
+    Bodies are pre-encoded at startup (see ``myapp.surveys``) and served
+    with an ETag, ``Cache-Control`` and gzip/brotli when accepted.
+    """
     permission_classes = [AllowAny]  # Optional: allows public access
 
     def get(self, request, lang=None):
         lang = lang or request.query_params.get('lang', 'en')
-        if lang not in ['en', 'gu']:
-            return JsonResponse({'error': 'Invalid language'}, status=400)
-
-        # [Rest of the survey dictionary logic as above]
-
-    # def get(self, request):
-    #     lang = request.query_params.get('lang', 'en')
-    #     if lang not in ['en', 'gu']:
-    #         return JsonResponse({'error': 'Invalid language'}, status=400)
-
-        if lang == 'gu':
-            survey = {
-                "surveyTitle": "ઝડપી ખોરાક સેવા સર્વે",
-                "description": "આજની નાસ્તાની સેવાઓ વિશેના કેટલાક ઝડપી પ્રશ્નોના જવાબ આપો.",
-                "questions": [
-                    {
-                        "id": "q1",
-                        "text": "શું તમામ વિદ્યાર્થીઓને સમયસર ભોજન આપવામાં આવ્યું?",
-                        "options": ["હા, બધાને", "હા, પરંતુ મોડું", "ના", "આંશિક"]
-                    },
-                    {
-                        "id": "q2",
-                        "text": "ખોરાકની તાજગી કેવી હતી?",
-                        "options": ["ખૂબ તાજું", "તાજું", "ઠીકઠાક", "તાજું નહોતું"]
-                    },
-                    {
-                        "id": "q3",
-                        "text": "શું ભોજનની માત્રા તમામ વિદ્યાર્થીઓ માટે પૂરતી હતી?",
-                        "options": ["ગણીએ એટલું વધારે", "પુરતું", "ઘટતું", "સૌ માટે પૂરતું નહતું"]
-                    },
-                    {
-                        "id": "q4",
-                        "text": "શુ ભોજન વિતરણ દરમ્યાન સ્વચ્છતા જાળવવામાં આવી?",
-                        "options": ["ઉત્કૃષ્ટ", "સારી", "સારું છે પણ સુધારો જોઈએ", "ખરાબ"]
-                    },
-                    {
-                        "id": "q5",
-                        "text": "આજની નાસ્તાની સેવા તમે કેટલી પ્રમાણમાં રેટ કરો?",
-                        "options": ["ઉત્કૃષ્ટ", "સારી", "સરેરાશ", "ખરાબ"]
-                    }
-                ]
-            }
-        else:  # English
-            survey = {
-                "surveyTitle": "Quick Food Service Survey",
-                "description": "Please answer these quick questions about today's breakfast service.",
-                "questions": [
-                    {
-                        "id": "q1",
-                        "text": "Was the meal served to all students on time?",
-                        "options": ["Yes, to all", "Yes, but late", "No", "Partial"]
-                    },
-                    {
-                        "id": "q2",
-                        "text": "How was the freshness of the food?",
-                        "options": ["Very Fresh", "Fresh", "Okay", "Not Fresh"]
-                    },
-                    {
-                        "id": "q3",
-                        "text": "Was the food quantity sufficient for all students?",
-                        "options": ["More than enough", "Just enough", "Less than required", "Not sufficient at all"]
-                    },
-                    {
-                        "id": "q4",
-                        "text": "Was hygiene maintained during food distribution?",
-                        "options": ["Excellent hygiene", "Good hygiene", "Acceptable but needs improvement", "Poor hygiene"]
-                    },
-                    {
-                        "id": "q5",
-                        "text": "Overall, how would you rate the breakfast service today?",
-                        "options": ["Excellent", "Good", "Average", "Poor"]
-                    }
-                ]
-            }
+        encoded = surveys.get(lang)
+        if encoded is None:
+            return JSONResponse({'error': 'Invalid language'}, status=400)
+
+        return surveys.respond(request, encoded)
+
+
+class SurveyResponseCreateAPIView(APIView):
+    """
+    Submit one survey response, or a JSON array of up to
+    ``SURVEY_RESPONSES_MAX_BATCH`` of them, written in a single batch.
+    """
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        rows = request.data if isinstance(request.data, list) else [request.data]
+        if len(rows) > settings.SURVEY_RESPONSES_MAX_BATCH:
+            return Response(
+                {'error': f'Too many responses. Maximum is {settings.SURVEY_RESPONSES_MAX_BATCH} per request'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        serializer = SurveyResponseSerializer(data=rows, many=True)
+        if not serializer.is_valid():
+            errors = {index: error for index, error in enumerate(serializer.errors) if error}
+            return Response({'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        with metrics.stage('db'):
+            recorded = survey_stats.record(serializer.validated_data)
+        return Response({'recorded': recorded}, status=status.HTTP_201_CREATED)
+
+
+class SurveySummaryAPIView(APIView):
+    """
+    Per-question option counts for a school, read from the running counters.
+
+    ``?school=`` is required; ``?date=`` picks one day (default today), or
+    ``?from=``/``?to=`` a range.  Labels follow ``?lang=``.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        school = request.query_params.get('school')
+        if not school:
+            return Response({'error': "Missing 'school' parameter"}, status=status.HTTP_400_BAD_REQUEST)
+
+        lang = request.query_params.get('lang', 'en')
+        if surveys.get(lang) is None:
+            return Response({'error': 'Invalid language'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            day = request.query_params.get('date')
+            date_from = date.fromisoformat(request.query_params.get('from') or day or timezone.localdate().isoformat())
+            date_to = date.fromisoformat(request.query_params.get('to') or day or date_from.isoformat())
+        except ValueError:
+            return Response({'error': 'Dates must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+
+        with metrics.stage('db'):
+            summary = survey_stats.summary(school, date_from, date_to, lang)
+        return Response(summary, status=status.HTTP_200_OK)
+
+
+class VerificationReportAPIView(APIView):
+    """
+    Missing-item report over the stored verifications (see ``myapp.history``).
+
+    ``?by=day`` (default) gives one row per day, ``?by=school`` one row per
+    school, highest missing rate first, and ``?by=item`` the items most often
+    missing.  ``?from=``/``?to=`` pick the dates (default today, at most
+    ``VERIFY_MENU_HISTORY["REPORT_MAX_DAYS"]`` apart), ``?school=`` narrows
+    to one school and ``?limit=`` caps the rows.
+    """
+    permission_classes = [AllowAny]
 
-        return JsonResponse(survey, safe=False)
+    def get(self, request):
+        group = request.query_params.get('by', 'day')
+        if group not in history.GROUPS:
+            return Response(
+                {'error': f"Invalid 'by'. Use one of: {', '.join(history.GROUPS)}"}, status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            date_to = date.fromisoformat(request.query_params.get('to') or timezone.localdate().isoformat())
+            date_from = date.fromisoformat(request.query_params.get('from') or date_to.isoformat())
+        except ValueError:
+            return Response({'error': 'Dates must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        max_days = history.options()['REPORT_MAX_DAYS']
+        if not 0 <= (date_to - date_from).days < max_days:
+            return Response(
+                {'error': f"'from' must be on or before 'to', at most {max_days} days earlier"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        limit = request.query_params.get('limit')
+        if limit is not None:
+            if not limit.isdigit() or int(limit) < 1:
+                return Response({'error': "'limit' must be a positive integer"}, status=status.HTTP_400_BAD_REQUEST)
+            limit = int(limit)
+
+        with metrics.stage('db'):
+            rows = history.report(group, date_from, date_to, request.query_params.get('school'), limit)
+        return Response(
+            {'by': group, 'from': date_from.isoformat(), 'to': date_to.isoformat(), 'rows': rows},
+            status=status.HTTP_200_OK,
+        )
+
+
+def parse_upload(request, keep_raw=None):
+    """
+    Validate a verify-menu form post.
+
+    The image is streamed through ``ImageUploadHandler``, so the returned
+    ``image`` is an in-memory ``EncodedImage`` with its SHA-256 digest
+    rather than a file; ``myapp.images`` turns it into a data URL.  Returns
+    ``(error_response, lang, menu_list, image)``; ``error_response`` is
+    ``None`` when the request is usable.  ``keep_raw`` forces the raw bytes
+    to be kept (for queued jobs) even when images are not downscaled.
+    """
+    if keep_raw is None:
+        keep_raw = images.enabled()
+    upload_handler = ImageUploadHandler(keep_raw=keep_raw)
+    request.upload_handlers = [upload_handler]
+
+    with metrics.stage("upload"):
+        lang = request.POST.get("lang")
+    if upload_handler.error:
+        message, status_code = upload_handler.error
+        return JSONResponse({"error": message}, status=status_code), None, None, None
+
+    if not lang:
+        return JSONResponse({"error": "Missing 'lang' parameter"}, status=400), None, None, None
+
+    if lang not in ["en", "gu"]:
+        return JSONResponse({"error": "Invalid language. Use 'en' or 'gu'"}, status=400), None, None, None
+
+    menu_items = request.POST.get("menu", "")
+    image = request.FILES.get("image")
+
+    if not menu_items or not image:
+        return JSONResponse({"error": "Missing menu or image"}, status=400), None, None, None
+
+    return None, lang, parse_menu(menu_items), image
+
+
+def parse_history_fields(request):
+    """
+    The optional ``school`` and ``teacher`` (id) form fields stored with each
+    verification; returns ``(error_response, school, teacher_id)``.
+    """
+    school = request.POST.get("school", "").strip()
+    if len(school) > 64:
+        return JSONResponse({"error": "'school' must be at most 64 characters"}, status=400), None, None
+    teacher = request.POST.get("teacher", "").strip()
+    if teacher and not teacher.isdigit():
+        return JSONResponse({"error": "'teacher' must be a teacher id"}, status=400), None, None
+    return None, school, int(teacher) if teacher else None
+
+
+def unavailable(error):
+    response = JSONResponse({"error": str(error)}, status=503)
+    response["Retry-After"] = str(math.ceil(error.retry_after))
+    return response
+
+
+def parse_menu(menu_items):
+    return [item.strip().lower() for item in menu_items.split(",") if item.strip()]
 
 
 class UploadImage(APIView):
+    parser_classes = [MultiPartParser, FormParser]
 
     @csrf_exempt
     def post(self, request):
         if request.method != "POST":
-            return JsonResponse({"error": "Only POST method allowed"}, status=405)
+            return JSONResponse({"error": "Only POST method allowed"}, status=405)
 
-        lang = request.POST.get("lang")
-        if not lang:
-            return JsonResponse({"error": "Missing 'lang' parameter"}, status=400)
+        error, lang, menu_list, image = parse_upload(request)
+        if error:
+            return error
+        error, school, teacher_id = parse_history_fields(request)
+        if error:
+            return error
 
-        if lang not in ["en", "gu"]:
-            return JsonResponse({"error": "Invalid language. Use 'en' or 'gu'"}, status=400)
+        try:
+            result, cache_hit = verify(llm.sync_client(), image, lang, menu_list)
+            history.record(history.entry(result, lang, school, teacher_id))
+            response = JSONResponse(result, request=request)
+            response["X-Cache"] = "HIT" if cache_hit else "MISS"
+            return response
+
+        except images.ImageRejected as e:
+            return JSONResponse({"error": str(e)}, status=400)
+
+        except llm.Unavailable as e:
+            return unavailable(e)
+
+        except pipeline.InvalidReply as e:
+            return JSONResponse({"error": str(e)}, status=502)
+
+        except Exception as e:
+            return JSONResponse({"error": str(e)}, status=500)
 
-        menu_items = request.POST.get("menu", "")
-        image_file = request.FILES.get("image")
 
-        if not menu_items or not image_file:
-            return JsonResponse({"error": "Missing menu or image"}, status=400)
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncUploadImage(View):
+    """
+    Async variant of ``UploadImage`` for the ASGI entry point (``root.asgi``).
 
-        menu_list = [item.strip().lower() for item in menu_items.split(",") if item.strip()]
+    Both GPT calls are sent at once through ``AsyncOpenAI``. Post
+    ``mode=combined`` (or set ``VERIFY_MENU_MODE``) to ask for the food list
+    and nutrition in a single structured call instead.
+    """
+    http_method_names = ["post"]
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as temp_img:
-            for chunk in image_file.chunks():
-                temp_img.write(chunk)
-            image_path = temp_img.name
+    async def post(self, request):
+        error, lang, menu_list, image = parse_upload(request)
+        if error:
+            return error
+        error, school, teacher_id = parse_history_fields(request)
+        if error:
+            return error
+
+        mode = request.POST.get("mode") or settings.VERIFY_MENU_MODE
+        if mode not in pipeline.MODES:
+            return JSONResponse({"error": f"Invalid mode. Use one of: {', '.join(pipeline.MODES)}"}, status=400)
 
         try:
-            with open(image_path, "rb") as img_file:
-                image_bytes = img_file.read()
-                image_base64 = base64.b64encode(image_bytes).decode("utf-8")
-
-            # Prompts for language
-            if lang == "gu":
-                prompt_food = "આ છબીમાં તમે કયા ખોરાક વસ્તુઓ જોઈ શકો છો? ફક્ત યાદી આપો."
-                prompt_nutrition = "તમે આ છબીમાં કયા ખોરાક જોઈ શકો છો? દરેક વસ્તુ માટે અંદાજિત પોષણ માહિતી (કૅલોરીઝ, પ્રોટીન, ફેટ, કાર્બસ) આપો."
+            result, cache_hit = await averify(llm.async_client(), image, lang, menu_list, mode=mode)
+            await history.arecord(history.entry(result, lang, school, teacher_id))
+            response = JSONResponse(result, request=request)
+            response["X-Cache"] = "HIT" if cache_hit else "MISS"
+            return response
+
+        except images.ImageRejected as e:
+            return JSONResponse({"error": str(e)}, status=400)
+
+        except llm.Unavailable as e:
+            return unavailable(e)
+
+        except pipeline.InvalidReply as e:
+            return JSONResponse({"error": str(e)}, status=502)
+
+        except Exception as e:
+            return JSONResponse({"error": str(e)}, status=500)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class BatchUploadImage(View):
+    """
+    Verify several plates in one request.
+
+    Post ``lang`` plus ``image_0``/``menu_0``, ``image_1``/``menu_1`` and so
+    on (up to ``VERIFY_MENU_BATCH["MAX_ITEMS"]``).  Images are fanned out
+    through a pool of ``VERIFY_MENU_BATCH["CONCURRENCY"]`` and each item
+    reports its own ``status`` with either the usual verify-menu ``result``
+    or an ``error``, so one bad image does not fail the batch.
+    """
+    http_method_names = ["post"]
+
+    async def post(self, request):
+        max_items = batch_options()["MAX_ITEMS"]
+        upload_handler = ImageUploadHandler(
+            field_names=[f"image_{index}" for index in range(max_items)],
+            keep_raw=images.enabled(),
+            skip_invalid=True,
+        )
+        request.upload_handlers = [upload_handler]
+
+        with metrics.stage("upload"):
+            lang = request.POST.get("lang")
+        if upload_handler.error:
+            message, status_code = upload_handler.error
+            return JSONResponse({"error": message}, status=status_code)
+
+        if lang not in ["en", "gu"]:
+            return JSONResponse({"error": "Invalid language. Use 'en' or 'gu'"}, status=400)
+        error, school, teacher_id = parse_history_fields(request)
+        if error:
+            return error
+
+        mode = request.POST.get("mode") or settings.VERIFY_MENU_MODE
+        if mode not in pipeline.MODES:
+            return JSONResponse({"error": f"Invalid mode. Use one of: {', '.join(pipeline.MODES)}"}, status=400)
+
+        indexes = sorted({
+            int(name.split("_", 1)[1])
+            for name in [*request.POST.keys(), *request.FILES.keys(), *upload_handler.file_errors]
+            if name.startswith(("image_", "menu_")) and name.split("_", 1)[1].isdigit()
+        })
+        if not indexes:
+            return JSONResponse({"error": "Missing images. Post image_0/menu_0, image_1/menu_1, ..."}, status=400)
+        if len(indexes) > max_items or indexes[-1] >= max_items:
+            return JSONResponse({"error": f"Too many images. Maximum is {max_items} per batch"}, status=400)
+
+        results = {}
+        pending = []
+        for index in indexes:
+            image = request.FILES.get(f"image_{index}")
+            menu_list = parse_menu(request.POST.get(f"menu_{index}", ""))
+            if f"image_{index}" in upload_handler.file_errors:
+                message, status_code = upload_handler.file_errors[f"image_{index}"]
+                results[index] = {"index": index, "status": status_code, "error": message}
+            elif not image or not menu_list:
+                results[index] = {"index": index, "status": 400, "error": "Missing menu or image"}
             else:
-                prompt_food = "What food items do you see in this image? Just list them."
-                prompt_nutrition = "What food items do you see in this image? Also, for each item, provide its approximate nutritional information such as calories, protein, fat, and carbs."
-
-            system_prompt = "You are a food image detection expert. Identify all food items visible in the image."
-
-            # GPT call: Detected food items
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt_food},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{image_base64}",
-                                    "detail": "low"
-                                }
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=150,
-                temperature=1
-            )
+                pending.append((index, image, menu_list))
 
-            # GPT call: Nutrition
-            responseNutrition = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": prompt_nutrition},
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{image_base64}",
-                                    "detail": "low"
-                                }
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=300
-            )
+        outcomes = await averify_batch(
+            llm.async_client(), [(image, menu_list) for _, image, menu_list in pending], lang, mode=mode,
+        )
+        for (index, _, _), outcome in zip(pending, outcomes):
+            if isinstance(outcome, images.ImageRejected):
+                results[index] = {"index": index, "status": 400, "error": str(outcome)}
+            elif isinstance(outcome, llm.Unavailable):
+                results[index] = {"index": index, "status": 503, "error": str(outcome)}
+            elif isinstance(outcome, pipeline.InvalidReply):
+                results[index] = {"index": index, "status": 502, "error": str(outcome)}
+            elif isinstance(outcome, Exception):
+                results[index] = {"index": index, "status": 500, "error": str(outcome)}
+            else:
+                result, cache_hit = outcome
+                await history.arecord(history.entry(result, lang, school, teacher_id))
+                results[index] = {"index": index, "status": 200, "cache": "HIT" if cache_hit else "MISS", "result": result}
 
-            gpt_reply = response.choices[0].message.content.strip().lower()
-            gpt_reply_Nutrition = responseNutrition.choices[0].message.content.strip().lower()
+        items = [results[index] for index in indexes]
+        failed = sum(1 for item in items if item["status"] != 200)
+        return JSONResponse({"succeeded": len(items) - failed, "failed": failed, "items": items}, request=request)
 
-            detected_items = [
-                item.strip("- ").strip()
-                for item in gpt_reply.split("\n")
-                if item.strip()
-            ]
 
-            found_items = [
-                item for item in menu_list
-                if any(normalize(item) == normalize(d) for d in detected_items)
-            ]
+class VerifyJobSubmitAPIView(APIView):
+    """
+    Queue a verify-menu request (same form as ``UploadImage``).
 
-            missing_items = [item for item in menu_list if item not in found_items]
-
-            nutritions = {}
-            current_item = None
-
-            for line in gpt_reply_Nutrition.split("\n"):
-                line = line.strip()
-                if not line:
-                    continue
-
-                item_match = re.match(r"^\d+\.\s+\*{0,2}(.+?)\*{0,2}$", line)
-                if item_match:
-                    current_item = item_match.group(1).strip()
-                    nutritions[current_item] = {}
-                    continue
-
-                if current_item:
-                    nutrition_match = re.match(r"[-*]?\s*\*{0,2}([\w\s]+)\*{0,2}:\s*(.+)", line)
-                    if nutrition_match:
-                        key = nutrition_match.group(1).strip().lower()
-                        value = nutrition_match.group(2).strip()
-                        nutritions[current_item][key] = value
-
-            return JsonResponse({
-                "items_food": detected_items,
-                "input_menu": menu_list,
-                "found_items": found_items,
-                "missing_items": missing_items,
-                "nutritions": nutritions
-            })
+    Returns 202 with the job id and its ``status_url`` straight away; the
+    work is done by ``manage.py verify_menu_worker``.
+    """
+    parser_classes = [MultiPartParser, FormParser]
 
-        except Exception as e:
-            return JsonResponse({"error": str(e)}, status=500)
+    def post(self, request):
+        error, lang, menu_list, image = parse_upload(request, keep_raw=True)
+        if error:
+            return error
+        error, school, teacher_id = parse_history_fields(request)
+        if error:
+            return error
+
+        job = jobs.submit(image, lang, menu_list, school, teacher_id)
+        status_url = request.build_absolute_uri(reverse("verify-menu-job", args=[job.id]))
+        response = JSONResponse({**jobs.job_payload(job), "status_url": status_url}, status=202)
+        response["Location"] = status_url
+        return response
+
+
+class VerifyJobStatusView(View):
+    """
+    Status of a queued verify-menu job.
+
+    ``?wait=<seconds>`` long-polls until the job finishes or the wait
+    (capped at ``VERIFY_MENU_JOBS["LONG_POLL_MAX"]``) runs out.
+    """
+    http_method_names = ["get"]
+
+    async def get(self, request, job_id):
+        options = jobs.options()
+        try:
+            wait = min(max(float(request.GET.get("wait", 0)), 0), options["LONG_POLL_MAX"])
+        except ValueError:
+            return JSONResponse({"error": "Invalid 'wait' parameter"}, status=400)
+
+        deadline = time.monotonic() + wait
+        while True:
+            job = await VerifyJob.objects.defer("image").filter(pk=job_id).afirst()
+            if job is None:
+                return JSONResponse({"error": "Job not found"}, status=404)
+            if job.status in (VerifyJob.DONE, VerifyJob.FAILED) or time.monotonic() >= deadline:
+                return JSONResponse(jobs.job_payload(job), request=request)
+            await asyncio.sleep(min(options["POLL_INTERVAL"], max(deadline - time.monotonic(), 0)))
+
+
+class MetricsView(View):
+    """Request latencies, stage timings, token counts and cache counters in the Prometheus text format."""
+    http_method_names = ["get"]
+
+    def get(self, request):
+        return HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+class OpenAPISchemaView(View):
+    """The OpenAPI document as ``.json`` or ``.yaml``, generated once per process (see ``myapp.openapi``)."""
+    http_method_names = ["get"]
+
+    def get(self, request, format):
+        fmt = format.lstrip(".")
+        if fmt not in openapi.CODECS:
+            return JSONResponse({"error": f"Unknown format. Use one of: {', '.join(openapi.CODECS)}"}, status=404)
+        return openapi.respond(request, openapi.document(fmt))
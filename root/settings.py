@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'myapp.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -78,11 +79,66 @@ WSGI_APPLICATION = 'root.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # django.db.backends.sqlite3 plus Django 5.1's transaction_mode option.
+        'ENGINE': 'myapp.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections open between requests instead of reconnecting each time.
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Seconds a writer waits for the database lock (SQLite busy timeout).
+            'timeout': 20,
+            # Take the write lock at BEGIN, so concurrent writers wait for the
+            # timeout above instead of failing with "database is locked".
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# Applied to every new SQLite connection (see myapp.signals). WAL lets readers
+# carry on while a bulk import is writing; synchronous=NORMAL is durable in
+# WAL mode except for the last transactions on power loss.
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'temp_store': 'MEMORY',
+    'cache_size': -20000,
+}
+
+
+# Caches
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# The verify_menu_cache table is created by migration myapp 0008; another
+# DatabaseCache LOCATION needs `python manage.py createcachetable`.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Teacher list/detail responses, per process: a write invalidates the
+    # worker that handled it at once and every other worker within TIMEOUT
+    # seconds. A shared backend (Redis, memcached) makes it immediate everywhere.
+    'teachers': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'teachers',
+        'TIMEOUT': 5,
+    },
+    'verify_menu': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'verify_menu_cache',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+    # Verify-menu admission control (per-client buckets, in-flight slots). Per
+    # process as is; point it at Redis or Memcached -- or, locally, the database
+    # cache -- to share the limits between workers. Never let it cull slots.
+    'admission': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'admission',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -124,3 +180,190 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Teacher list pagination (keyset on id)
+
+TEACHERS_PAGE_SIZE = 100
+TEACHERS_MAX_PAGE_SIZE = 1000
+
+# Teacher name search (FTS5 trigram index): default and largest result count
+
+TEACHERS_SEARCH_RESULTS = 20
+TEACHERS_SEARCH_MAX_RESULTS = 100
+
+# Bulk teacher import: most rows per request, rows per write transaction
+
+TEACHERS_BULK_MAX_ROWS = 50000
+TEACHERS_BULK_CHUNK_SIZE = 1000
+
+
+# Surveys are static between deploys; let clients and proxies keep them.
+
+SURVEY_CACHE_MAX_AGE = 60 * 60
+
+# Most survey responses accepted in one submission
+
+SURVEY_RESPONSES_MAX_BATCH = 1000
+
+
+# OpenAI client (myapp/llm.py): connection pool and timeouts, a process-wide
+# rate limit sized to the API quota (requests/minute with a burst), a cap on
+# calls in flight, retries with jittered backoff and a circuit breaker that
+# fails fast (503) while the API keeps erroring. API_KEY and BASE_URL default
+# to the OPENAI_API_KEY and OPENAI_BASE_URL environment variables.
+
+OPENAI_CLIENT = {
+    'TIMEOUT': 60.0,
+    'CONNECT_TIMEOUT': 5.0,
+    'MAX_CONNECTIONS': 50,
+    'MAX_KEEPALIVE': 20,
+    'RATE_PER_MINUTE': 500,
+    'BURST': 20,
+    'MAX_CONCURRENCY': 16,
+    'MAX_WAIT': 30.0,
+    'MAX_RETRIES': 3,
+    'BREAKER_THRESHOLD': 5,
+    'BREAKER_RESET': 30.0,
+}
+
+# OpenAPI document (myapp/openapi.py): built once per process, or read from
+# OPENAPI_SCHEMA_DIR when `python manage.py generate_openapi` wrote it there.
+# The Swagger UI and ReDoc pages load it from the schema-json URL.
+
+OPENAPI_SCHEMA_DIR = None
+
+# One JSON encoder for every myapp response (myapp/renderers.py): orjson when
+# installed, UTF-8 without \u escapes. JSONResponse bodies of GZIP_MIN_BYTES or
+# more are gzipped for clients that accept it (None turns that off).
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'myapp.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+JSON_RESPONSES = {
+    'GZIP_MIN_BYTES': 2048,
+    'GZIP_LEVEL': 6,
+}
+
+SWAGGER_SETTINGS = {
+    'SPEC_URL': ('schema-json', {'format': '.json'}),
+}
+
+REDOC_SETTINGS = {
+    'SPEC_URL': ('schema-json', {'format': '.json'}),
+}
+
+# Verify-menu pipeline
+# "parallel" sends the food-list and nutrition calls at once from the async
+# view; "combined" merges them into one structured call.
+
+VERIFY_MENU_MODE = 'parallel'
+
+# Largest image verify-menu accepts; bigger uploads are refused with a 413
+# from the Content-Length header, before the body is read.
+
+VERIFY_MENU_MAX_IMAGE_BYTES = 10 * 1024 * 1024
+
+# Uploads are shrunk to the vision model's low-detail size and re-encoded
+# (EXIF stripped, orientation applied) on a small thread pool before the
+# GPT calls. Needs Pillow; set ENABLED to False to send originals.
+
+VERIFY_MENU_IMAGE = {
+    'ENABLED': True,
+    'MAX_SIDE': 512,
+    'QUALITY': 80,
+    'WORKERS': 4,
+}
+
+# Result cache for verify-menu: in-process LRU size, then the persistent
+# cache alias and how long its entries live (seconds).
+
+VERIFY_MENU_CACHE = {
+    'MAX_ENTRIES': 512,
+    'ALIAS': 'verify_menu',
+    'TIMEOUT': 7 * 24 * 60 * 60,
+}
+
+# Menu matching: how close (trigram Dice score, 0-1) a detected dish name must
+# be to a menu item when neither the normalized names nor their words agree.
+
+VERIFY_MENU_MATCH = {
+    'FUZZY_THRESHOLD': 0.7,
+}
+
+# Local nutrition table (NutritionFact, `manage.py import_nutrition`): detected
+# dishes found there skip the nutrition GPT call. Each process reloads the
+# table after RELOAD_INTERVAL seconds to pick up changes made elsewhere.
+
+VERIFY_MENU_NUTRITION = {
+    'KB_ENABLED': True,
+    'RELOAD_INTERVAL': 300,
+}
+
+# Gujarati results (myapp/translations.py): the model always answers in
+# English and dish names and labels are rendered from NutritionFact.name_gu
+# and Translation rows. Names missing from both are translated by the model
+# once and stored (TRANSLATE_UNKNOWN off leaves them in English).
+
+VERIFY_MENU_TRANSLATIONS = {
+    'TRANSLATE_UNKNOWN': True,
+    'RELOAD_INTERVAL': 300,
+}
+
+# Batch verify-menu: most images per request, and how many images one worker
+# process sends through the pipeline at once (keep within the API rate limit).
+
+VERIFY_MENU_BATCH = {
+    'MAX_ITEMS': 20,
+    'CONCURRENCY': 8,
+}
+
+# Queued verify-menu jobs (run `python manage.py verify_menu_worker`): how
+# often idle workers and long-polls check the table, the longest long-poll,
+# when a running job counts as abandoned, how often it is retried, and the
+# first retry delay in seconds (doubled for each further attempt).
+
+VERIFY_MENU_JOBS = {
+    'POLL_INTERVAL': 0.5,
+    'LONG_POLL_MAX': 30,
+    'TIMEOUT': 300,
+    'MAX_ATTEMPTS': 3,
+    'RETRY_BACKOFF': 5,
+}
+
+# Verification history (myapp/history.py): results are queued and written by
+# a background thread in batches (ASYNC off writes them during the request),
+# and the longest date range the report endpoint accepts.
+
+VERIFY_MENU_HISTORY = {
+    'ENABLED': True,
+    'ASYNC': True,
+    'BATCH_SIZE': 200,
+    'MAX_QUEUE': 10000,
+    'REPORT_MAX_DAYS': 366,
+}
+
+# Admission control for the verify-menu views (myapp/admission.py): a token
+# bucket per client (RATE per second, BURST; CLIENT_HEADER names a header set
+# by a trusted proxy, e.g. 'HTTP_X_FORWARDED_FOR'), at most MAX_IN_FLIGHT
+# verifications at once and MAX_QUEUE more waiting up to QUEUE_TIMEOUT seconds.
+# Anything beyond gets a 429 or 503 with Retry-After. Keep MAX_IN_FLIGHT +
+# MAX_QUEUE below the server's threads so cheap requests always find one.
+
+VERIFY_MENU_ADMISSION = {
+    'ENABLED': True,
+    'CACHE': 'admission',
+    'CLIENT_HEADER': None,
+    'RATE': 1.0,
+    'BURST': 10,
+    'MAX_IN_FLIGHT': 8,
+    'MAX_QUEUE': 8,
+    'QUEUE_TIMEOUT': 2.0,
+    'POLL_INTERVAL': 0.05,
+    'SLOT_TIMEOUT': 300,
+    'RETRY_AFTER': 5,
+}
@@ -0,0 +1,34 @@
+"""
+Settings for the servers started by `python manage.py loadtest`.
+
+The settings named by LOADTEST_BASE_SETTINGS (default root.settings) with a
+scratch database and an OpenAI client limited only by the fake server: the
+real quota would otherwise cap every run at RATE_PER_MINUTE. All requests
+come from one client, so the per-client verify-menu rate limit is off too.
+"""
+
+import os
+from importlib import import_module
+
+_base = import_module(os.environ.get('LOADTEST_BASE_SETTINGS', 'root.settings'))
+globals().update({name: value for name, value in vars(_base).items() if name.isupper()})
+
+ALLOWED_HOSTS = ['127.0.0.1', 'localhost']
+
+DATABASES = {
+    **DATABASES,
+    'default': {**DATABASES['default'], 'NAME': os.environ['LOADTEST_DATABASE']},
+}
+
+OPENAI_CLIENT = {
+    **OPENAI_CLIENT,
+    'RATE_PER_MINUTE': 1_000_000,
+    'BURST': 10_000,
+    'MAX_CONCURRENCY': 256,
+    'MAX_WAIT': 60.0,
+}
+
+VERIFY_MENU_ADMISSION = {
+    **VERIFY_MENU_ADMISSION,
+    'RATE': None,
+}
@@ -0,0 +1,61 @@
+"""
+Production settings: DJANGO_SETTINGS_MODULE=root.settings_production.
+
+Everything from root.settings, plus DEBUG off (no per-query logging), a
+JSON-only REST framework and a short middleware stack for the API: the
+session, CSRF, auth, messages and clickjacking middleware only run outside
+API_PATH_PREFIXES, so /admin/ keeps them. Needs DJANGO_SECRET_KEY; run
+`python manage.py collectstatic` (admin and schema pages) and
+`python manage.py generate_openapi` when deploying.
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+DEBUG = False
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+ALLOWED_HOSTS = os.environ.get('DJANGO_ALLOWED_HOSTS', 'localhost').split(',')
+
+MIDDLEWARE = [
+    'myapp.middleware.ServerTimingMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'myapp.middleware.BrowserMiddleware',
+]
+
+# Run by myapp.middleware.BrowserMiddleware for every path not under
+# API_PATH_PREFIXES (admin, schema pages).
+
+API_PATH_PREFIXES = ['/api/', '/metrics/']
+
+BROWSER_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+# The admin checks look for these in MIDDLEWARE; they are in BROWSER_MIDDLEWARE.
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
+
+# The API has no logins: no browsable API, form parsing only where views ask
+# for it (uploads), and no authentication or user lookup per request.
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': ['myapp.renderers.FastJSONRenderer'],
+    'DEFAULT_PARSER_CLASSES': ['rest_framework.parsers.JSONParser'],
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.AllowAny'],
+    'UNAUTHENTICATED_USER': None,
+}
+
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Written at deploy time by `python manage.py generate_openapi`.
+
+OPENAPI_SCHEMA_DIR = BASE_DIR / 'openapi'
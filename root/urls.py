@@ -18,19 +18,15 @@ from django.contrib import admin
 from django.urls import path, include, re_path
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
 
-# Schema view for Swagger
+from myapp.openapi import INFO
+from myapp.views import OpenAPISchemaView
+
+# The UI pages fetch the document from schema-json (SWAGGER_SETTINGS and
+# REDOC_SETTINGS), which serves it pre-generated instead of rebuilding it.
 try:
     schema_view = get_schema_view(
-        openapi.Info(
-            title="Your API",
-            default_version='v1',
-            description="API documentation",
-            terms_of_service="https://www.yourapp.com/terms/",
-            contact=openapi.Contact(email="contact@yourapp.com"),
-            license=openapi.License(name="Your License"),
-        ),
+        INFO,
         public=True,
         permission_classes=(permissions.AllowAny,),
     )
@@ -43,7 +39,7 @@ urlpatterns = [
     path('', include('myapp.urls')),
     
     # Swagger URLs
-    path('swagger<format>/', schema_view.without_ui(cache_timeout=0), name='schema-json'),
+    path('swagger<format>/', OpenAPISchemaView.as_view(), name='schema-json'),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
 ]